@@ -4,15 +4,19 @@
 from utils_area import (
     __area_init,
     area_init_attr,
-    area_get_attr,
-    area_set_attr,
+    area_get_attr_at,
+    area_set_attr_at,
     area_count_attr,
     area_set_all_attr,
+    area_get_points,
+    area_get_index_map,
+    area_get_attr_list,
     area_count_blocks,
     area_move_to_nearest_corner,
     area_move_to_point,
     area_process_begin,
     area_process_end,
+    area_get_traverse_path,
 )
 from utils_farming import (
     farming_create_init_hook,
@@ -44,34 +48,30 @@ def cactus_area(size, allocator=None):
     area_init_attr(a, "harvestable", False)
     area_init_attr(a, "measure", None)
 
-    # measure 分组（用于排序收获）
+    # measure 分组（存属性下标，用于排序收获）
     a["measure_groups"] = {}
     a["measure_groups"][None] = set()
-
-    y, x, h, w = rect
-    for dy in range(h):
-        for dx in range(w):
-            block = (y + dy, x + dx)
-            a["measure_groups"][None].add(block)
+    for i in range(area_count_blocks(a)):
+        a["measure_groups"][None].add(i)
 
     return a
 
 
-def __cactus_update_measure(area, block, value):
-    # 更新 measure 并维护分组
-    old_value = area_get_attr(area, "measure", block)
+def __cactus_update_measure(area, index, value):
+    # 更新 measure 并维护分组（index 为属性下标）
+    old_value = area_get_attr_at(area, "measure", index)
 
     if old_value == value:
         return
 
     measure_groups = area["measure_groups"]
-    measure_groups[old_value].remove(block)
+    measure_groups[old_value].remove(index)
 
     if value not in measure_groups:
         measure_groups[value] = set()
-    measure_groups[value].add(block)
+    measure_groups[value].add(index)
 
-    area_set_attr(area, "measure", block, value)
+    area_set_attr_at(area, "measure", index, value)
 
 
 def __cactus_swap_and_move(S_dict, sy, sx, dy, dx):
@@ -114,18 +114,20 @@ def __cactus_area_init(area):
 
     # 使用通用 init hook，并在种植后立刻测量（measure 在下次种植前不变）
     base_hook = farming_create_init_hook(entity_type)
+    index_map = area_get_index_map(area)
 
     def hook(point, arg):
         base_hook(point, arg)
-        __cactus_update_measure(area, point, measure())
+        __cactus_update_measure(area, index_map[point], measure())
 
-    route = area["corner_paths"][(get_pos_y(), get_pos_x())]
+    route = area_get_traverse_path(area, (get_pos_y(), get_pos_x()))
     route_move_along_with_hook(route, hook, None, True)
 
 
 def __cactus_area_harvest(area, do_harvest):
     # 按 measure 排序，使用 swap 重新排列后统一收获
     measure_groups = area["measure_groups"]
+    points = area_get_points(area)
     S_dict = {}
 
     y, x, h, w = area["rect"]
@@ -138,10 +140,10 @@ def __cactus_area_harvest(area, do_harvest):
             continue
 
         blocks = measure_groups[k]
-        for block in blocks:
+        for index in blocks:
             target_y = y + i
             target_x = x + j
-            S_dict[block] = (target_y, target_x)
+            S_dict[points[index]] = (target_y, target_x)
 
             j += 1
             if j == w:
@@ -160,7 +162,7 @@ def __cactus_area_harvest(area, do_harvest):
 
             if dy != 0 or dx != 0:
                 # 移动到源位置
-                area_move_to_point((sy, sx))
+                area_move_to_point((sy, sx), False)
 
                 __cactus_swap_and_move(S_dict, sy, sx, dy, dx)
                 have_swapped = True
@@ -180,6 +182,10 @@ def __cactus_area_process(area):
     # 处理实现
     entity_type = area["entity_type"]
     total_blocks = area_count_blocks(area)
+    # 热循环按下标读属性：每格一次点 -> 下标查找，读列表不再经过函数调用
+    index_map = area_get_index_map(area)
+    measures = area_get_attr_list(area, "measure")
+    harvestable = area_get_attr_list(area, "harvestable")
 
     # 单次 process：等待全成熟 -> 完整收获一次 -> 重播种并立刻测量 -> 返回（回到初始状态）
     while True:
@@ -189,10 +195,11 @@ def __cactus_area_process(area):
             area_move_to_nearest_corner(area)
 
             def __measure_only_hook(point, arg):
-                if area_get_attr(area, "measure", point) == None:
-                    __cactus_update_measure(area, point, measure())
+                i = index_map[point]
+                if measures[i] == None:
+                    __cactus_update_measure(area, i, measure())
 
-            route = area["corner_paths"][(get_pos_y(), get_pos_x())]
+            route = area_get_traverse_path(area, (get_pos_y(), get_pos_x()))
             route_move_along_with_hook(route, __measure_only_hook, None, True)
 
         harvestable_count = area_count_attr(area, "harvestable", True)
@@ -203,12 +210,13 @@ def __cactus_area_process(area):
             area_move_to_nearest_corner(area)
 
             def __mark_hook(point, arg):
-                if not area_get_attr(area, "harvestable", point):
+                i = index_map[point]
+                if not harvestable[i]:
                     if can_harvest():
-                        area_set_attr(area, "harvestable", point, True)
+                        area_set_attr_at(area, "harvestable", i, True)
                         progress["v"] = True
 
-            route = area["corner_paths"][(get_pos_y(), get_pos_x())]
+            route = area_get_traverse_path(area, (get_pos_y(), get_pos_x()))
             route_move_along_with_hook(route, __mark_hook, None, True)
             if not progress["v"]:
                 pass
@@ -225,10 +233,9 @@ def __cactus_area_process(area):
         measure_groups = {}
         measure_groups[None] = set()
         area["measure_groups"] = measure_groups
-        y, x, h, w = area["rect"]
-        for dy in range(h):
-            for dx in range(w):
-                measure_groups[None].add((y + dy, x + dx))
+        unknown = measure_groups[None]
+        for i in range(total_blocks):
+            unknown.add(i)
 
         # 重新种植并立刻测量
         area_move_to_nearest_corner(area)
@@ -236,9 +243,9 @@ def __cactus_area_process(area):
 
         def __replant_and_measure(point, arg):
             base_hook(point, arg)
-            __cactus_update_measure(area, point, measure())
+            __cactus_update_measure(area, index_map[point], measure())
 
-        route = area["corner_paths"][(get_pos_y(), get_pos_x())]
+        route = area_get_traverse_path(area, (get_pos_y(), get_pos_x()))
         route_move_along_with_hook(route, __replant_and_measure, None, True)
         break
 
@@ -8,6 +8,7 @@ from utils_area import (
     area_visit_points,
     area_process_begin,
     area_process_end,
+    area_get_traverse_path,
 )
 from utils_farming import (
     farming_create_init_hook,
@@ -16,7 +17,7 @@ from utils_farming import (
 )
 from utils_move import route_move_along_with_hook
 from utils_rect import rectangle_contains_point
-from utils_route import rect_get_hamiltonian_path
+from utils_route import rect_get_hamiltonian_route_cached
 from utils_list import list_random_choice
 
 
@@ -64,7 +65,7 @@ def __companion_area_init(area):
 
     # 使用基于 target_entity 的 init hook
     hook = farming_create_init_hook(target_entity)
-    route = area["corner_paths"][(get_pos_y(), get_pos_x())]
+    route = area_get_traverse_path(area, (get_pos_y(), get_pos_x()))
     route_move_along_with_hook(route, hook, None, True)
 
 
@@ -102,7 +103,8 @@ def __companion_area_process(area):
     slave_pending = {}
 
     # 1) 填充 slave：中心向外螺旋，按顺序即时处理
-    spiral_route = rect_get_hamiltonian_path(rect, (0, 0), "spiral_outward_cw")
+    # outward 螺旋与起点无关，以左下角为起点，同尺寸的区域共用缓存
+    spiral_route = rect_get_hamiltonian_route_cached(rect, (rect[0], rect[1]), "spiral_outward_cw")
 
     def spiral_hook(master_point, arg):
         # 只对“主作物格子”调用 get_companion
@@ -142,11 +144,11 @@ def __companion_area_process(area):
         if slave_point in slave_to_master:
             slave_pending[slave_point] = (master_point, plant_type)
             master_to_slave[master_point] = (slave_point, plant_type)
-            area_move_to_point(master_point)
+            area_move_to_point(master_point, False)
             return
 
         # 种植/排队 slave
-        area_move_to_point(slave_point)
+        area_move_to_point(slave_point, False)
         # 直接清理/覆盖为 slave（不等待成熟）
         was_target = get_entity_type() == target_entity
         farming_overwrite_here(plant_type, None, False, do_harvest)
@@ -163,7 +165,7 @@ def __companion_area_process(area):
         slave_to_master[slave_point] = master_point
 
         # 回到 master 点继续螺旋（保证遍历器的内部坐标不被 detour 破坏）
-        area_move_to_point(master_point)
+        area_move_to_point(master_point, False)
 
     route_move_along_with_hook(spiral_route, spiral_hook, None, True)
 
@@ -203,7 +205,7 @@ def __companion_area_process(area):
                 slave_to_master.pop(slave_point)
 
             # 覆盖为 slave
-            area_move_to_point(slave_point)
+            area_move_to_point(slave_point, False)
             # pending 阶段：如果目标格子是核心作物 target_entity，则等待成熟再 harvest（保护产量）
             farming_overwrite_here(plant_type, target_entity, True, do_harvest)
 
@@ -218,7 +220,7 @@ def __companion_area_process(area):
     if master_to_slave:
 
         def visit_master_point(master_point):
-            area_move_to_point(master_point)
+            area_move_to_point(master_point, False)
             current = get_entity_type()
             if current != target_entity:
                 # master 点被覆盖成了 slave：按约定应当已从 master_to_slave 移除，这里做兜底恢复
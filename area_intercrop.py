@@ -7,6 +7,7 @@ from utils_area import (
     area_move_to_nearest_corner,
     area_process_begin,
     area_process_end,
+    area_get_traverse_path,
 )
 from utils_farming import (
     farming_create_init_hook_with_selector,
@@ -55,7 +56,7 @@ def __intercrop_area_init(area):
 
     # 使用通用 init hook（带 selector）
     hook = farming_create_init_hook_with_selector(area["entity_selector"])
-    route = area["corner_paths"][(get_pos_y(), get_pos_x())]
+    route = area_get_traverse_path(area, (get_pos_y(), get_pos_x()))
     route_move_along_with_hook(route, hook, None, True)
 
 
@@ -70,6 +71,6 @@ def __intercrop_area_process(area):
 
     # 使用通用 intercrop process hook
     hook = farming_create_intercrop_process_hook(area["entity_selector"], do_harvest)
-    route = area["corner_paths"][(get_pos_y(), get_pos_x())]
+    route = area_get_traverse_path(area, (get_pos_y(), get_pos_x()))
     route_move_along_with_hook(route, hook, None, True)
     area_process_end(area, start_tick)
@@ -6,6 +6,8 @@ from utils_area import (
     area_init_attr,
     area_get_attr,
     area_set_attr,
+    area_reset_attr,
+    area_replace_all_attr,
     area_move_to_point,
     area_process_begin,
     area_process_end,
@@ -18,9 +20,6 @@ from utils_maze import (
     maze_get_path,
     maze_search,
 )
-from utils_point import point_subtract
-from utils_route import vector_get_path
-from utils_move import path_move_along
 from utils_direction import direction_negate
 from utils_farming import farming_create_do_harvest
 
@@ -58,11 +57,11 @@ def maze_area(size, times, allocator=None):
 
 
 def __init_round_temp_attrs(area):
-    # 初始化临时属性（每轮重置）
-    area_init_attr(area, "probed_this_round", False)
+    # 初始化临时属性（每轮原地重置）
+    area_reset_attr(area, "probed_this_round", False)
     for d in DIRECTIONS:
         attr_name = "forbidden_heuristic_" + str(d)
-        area_init_attr(area, attr_name, False)
+        area_reset_attr(area, attr_name, False)
 
 
 def __try_shortcut(area, start_point, target_point):
@@ -216,10 +215,7 @@ def __maze_area_init(area):
         return
 
     # 移动到中心
-    current_pos = (get_pos_y(), get_pos_x())
-    vec = point_subtract(center, current_pos)
-    path = vector_get_path(vec)
-    path_move_along(path)
+    area_move_to_point(center)
 
     # 创建迷宫
     entity_type = get_entity_type()
@@ -304,14 +300,9 @@ def __maze_area_process(area):
         else:
             use_item(Items.Weird_Substance, area["cost"])
 
-            # 重置墙的状态（墙可能被拆）
-            y, x, h, w = area["rect"]
-            for dy in range(h):
-                for dx in range(w):
-                    block = (y + dy, x + dx)
-                    for d in DIRECTIONS:
-                        if area_get_attr(area, d, block) == False:
-                            area_set_attr(area, d, block, None)
+            # 重置墙的状态（墙可能被拆）：已知的墙改回未知，已知的路保留
+            for d in DIRECTIONS:
+                area_replace_all_attr(area, d, False, None)
 
     # 理论上不会走到这里（times==0 会在上面 end），但保持一致
     area_process_end(area, start_tick)
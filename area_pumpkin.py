@@ -4,13 +4,14 @@
 from utils_area import (
     __area_init,
     area_init_attr,
-    area_get_attr,
-    area_set_attr,
+    area_set_attr_at,
+    area_get_index_map,
     area_count_blocks,
     area_move_to_nearest_corner,
     area_move_to_point,
     area_process_begin,
     area_process_end,
+    area_get_traverse_path,
 )
 from utils_farming import (
     farming_create_init_hook,
@@ -51,7 +52,7 @@ def __pumpkin_area_init(area):
 
     # 使用通用 init hook（最后所有格子都种上南瓜）
     hook = farming_create_init_hook(entity_type)
-    route = area["corner_paths"][(get_pos_y(), get_pos_x())]
+    route = area_get_traverse_path(area, (get_pos_y(), get_pos_x()))
     route_move_along_with_hook(route, hook, None, True)
 
 
@@ -66,6 +67,8 @@ def __pumpkin_area_process(area):
 
     # 创建局部 pending_check 集合
     pending_check = set()
+    # 标记成熟按下标写，每格一次点 -> 下标查找
+    index_map = area_get_index_map(area)
 
     # 第一次扫描：移动到左下角
     area_move_to_nearest_corner(area)
@@ -83,7 +86,7 @@ def __pumpkin_area_process(area):
             # 是南瓜
             if can_harvest():
                 # 成熟南瓜：标记
-                area_set_attr(area, "harvestable", point, True)
+                area_set_attr_at(area, "harvestable", index_map[point], True)
             else:
                 # 未成熟南瓜：加入 pending_check
                 pending_check.add(point)
@@ -95,7 +98,7 @@ def __pumpkin_area_process(area):
             farming_plant_if_needed(entity_type)
             pending_check.add(point)
 
-    route = area["corner_paths"][(get_pos_y(), get_pos_x())]
+    route = area_get_traverse_path(area, (get_pos_y(), get_pos_x()))
     route_move_along_with_hook(route, __first_scan_hook, None, True)
 
     # 持续扫描 pending_check 直到全部成熟
@@ -110,14 +113,14 @@ def __pumpkin_area_process(area):
             break
 
         # 移动到第一个点
-        area_move_to_point(first_point)
+        area_move_to_point(first_point, False)
 
         # 遍历 pending_check 中的格子
         checked_points = []
 
         for point in pending_check:
             # 移动到目标格子
-            area_move_to_point(point)
+            area_move_to_point(point, False)
 
             # 检查当前实体
             current_entity = get_entity_type()
@@ -129,7 +132,7 @@ def __pumpkin_area_process(area):
             elif current_entity == entity_type:
                 # 是南瓜：检查是否成熟
                 if can_harvest():
-                    area_set_attr(area, "harvestable", point, True)
+                    area_set_attr_at(area, "harvestable", index_map[point], True)
                     checked_points.append(point)
             else:
                 # 其他情况：清理并种植，保留在 pending_check
@@ -156,7 +159,7 @@ def __pumpkin_area_process(area):
         def __replant_hook(point, arg):
             farming_plant_if_needed(entity_type)
 
-        route = area["corner_paths"][(get_pos_y(), get_pos_x())]
+        route = area_get_traverse_path(area, (get_pos_y(), get_pos_x()))
         route_move_along_with_hook(route, __replant_hook, None, True)
 
     area_process_end(area, start_tick)
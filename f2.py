@@ -1,4 +1,4 @@
-from utils_route import rect_get_hamiltonian_path
+from utils_route import rect_get_hamiltonian_route
 from utils_move import route_move_along_with_hook
 from utils_user import move_to
 
@@ -13,6 +13,6 @@ def f(p, ha):
 
 
 rect = (cy, cx, 10, 10)
-route = rect_get_hamiltonian_path(rect, (cy, cx), "spiral_outward_ccw")
+route = rect_get_hamiltonian_route(rect, (cy, cx), "spiral_outward_ccw")
 
 route_move_along_with_hook(route, f)
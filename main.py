@@ -2,6 +2,7 @@ from utils_rect_allocator import (
     rect_allocator_instance_initialize,
     rect_allocator_instance_get,
     rect_allocator_enable_debug,
+    rect_allocator_free,
 )
 from utils_drone import spawn_area_drone, spawn_maze_drone, area_step, run_maze_inline
 from area_pumpkin import pumpkin_area
@@ -84,6 +85,8 @@ if maze != None:
         # 没有无人机能力：主线程直接跑完一次 maze
         run_maze_inline(maze)
         # 约定：迷宫完成后再生成一个迷宫（同样不做错误检查）
+        # 先释放上一局的矩形，新迷宫复用同一块地，分配器不会越用越碎
+        rect_allocator_free(maze["allocator"], maze["rect_id"])
         maze = maze_area(MAZE_SIZE, MAZE_TIMES)
         if maze != None:
             maze_drone = spawn_maze_drone(maze)
@@ -107,6 +110,7 @@ while True:
     if maze_drone != None:
         if has_finished(maze_drone):
             wait_for(maze_drone)
+            rect_allocator_free(maze["allocator"], maze["rect_id"])
             maze = maze_area(MAZE_SIZE, MAZE_TIMES)
             if maze != None:
                 maze_drone = spawn_maze_drone(maze)
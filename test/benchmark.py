@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+工具函数 tick 开销基准
+运行 framework/benchmark.py 中的用例，与基线 benchmark_baseline.json 比较，
+tick 或宿主机耗时超过阈值时以非零状态退出
+
+示例：
+    python benchmark.py                     # 与基线比较
+    python benchmark.py --filter maze       # 只跑名称包含 maze 的用例
+    python benchmark.py --update            # 重新生成基线（有意改变开销后）
+    python benchmark.py --ticks-only        # 只比较 tick（耗时受机器影响时）
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from framework.benchmark import (
+    DEFAULT_BASELINE,
+    DEFAULT_TICK_THRESHOLD,
+    DEFAULT_WALL_THRESHOLD,
+    DEFAULT_WALL_SLACK,
+    select_cases,
+    run_benchmarks,
+    load_baseline,
+    save_baseline,
+    compare_results,
+    find_regressions,
+    format_rows,
+)
+
+
+def make_parser():
+    parser = argparse.ArgumentParser(description="工具函数 tick 开销基准")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="基线 JSON 路径")
+    parser.add_argument("--update", action="store_true", help="把本次结果写为新基线")
+    parser.add_argument("--filter", default=None, help="只运行名称包含该子串的用例")
+    parser.add_argument("--repeat", type=int, default=5, help="每个用例重复次数（耗时取最小值）")
+    parser.add_argument(
+        "--tick-threshold",
+        type=float,
+        default=DEFAULT_TICK_THRESHOLD,
+        help="tick 允许的相对增长（默认 0，任何增长都算回归）",
+    )
+    parser.add_argument(
+        "--wall-threshold",
+        type=float,
+        default=DEFAULT_WALL_THRESHOLD,
+        help="耗时允许的相对增长（默认 0.5）",
+    )
+    parser.add_argument(
+        "--wall-slack",
+        type=float,
+        default=DEFAULT_WALL_SLACK,
+        help="耗时允许的绝对增长（秒，默认 0.002）",
+    )
+    parser.add_argument("--ticks-only", action="store_true", help="不比较宿主机耗时")
+    parser.add_argument(
+        "--tick-backend",
+        choices=("ast", "monitoring"),
+        default="ast",
+        help="tick 计数后端（monitoring 需要 Python 3.12+）",
+    )
+    return parser
+
+
+def main(argv=None):
+    args = make_parser().parse_args(argv)
+
+    from framework.scenario import setup_simulator
+
+    setup_simulator(tick_backend=args.tick_backend)
+    from framework.game_builtins import reset_world, set_output_enabled
+
+    reset_world(seed=0)
+
+    cases = select_cases(args.filter)
+    if not cases:
+        print("没有匹配的用例")
+        return 1
+    # 项目代码的输出（例如分配失败的诊断）不混进结果表格
+    set_output_enabled(False)
+    try:
+        results = run_benchmarks(cases, args.repeat)
+    finally:
+        set_output_enabled(True)
+
+    if args.update:
+        baseline = load_baseline(args.baseline) or {"cases": {}}
+        # 只运行了部分用例时保留其它用例的基线
+        merged = dict(baseline["cases"])
+        merged.update(results)
+        save_baseline(merged, args.baseline)
+        print("基线已写入 %s（%d 个用例）" % (args.baseline, len(merged)))
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print("基线 %s 不存在，请先运行 --update" % args.baseline)
+    rows = compare_results(
+        results,
+        baseline,
+        args.tick_threshold,
+        args.wall_threshold,
+        args.wall_slack,
+        check_wall=not args.ticks_only,
+    )
+    print(format_rows(rows))
+
+    regressions = find_regressions(rows)
+    if regressions:
+        print()
+        print("❌ %d 个用例回归" % len(regressions))
+        return 1
+    print()
+    print("✅ 没有回归")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
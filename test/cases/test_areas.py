@@ -169,5 +169,168 @@ class TestMazeArea:
         assert "paths" in area or "start_point" in area or "rect" in area
 
 
+class TestAreaAttrs:
+    """测试区域属性（扁平列表存储）"""
+
+    def _area(self):
+        from utils_area import area, area_init_attr
+
+        a = area(0, (10, 20, 3, 4))
+        area_init_attr(a, "flag", False)
+        return a
+
+    def test_index_mapping(self):
+        """下标按行优先：(py - y) * w + (px - x)"""
+        from utils_area import area_point_to_index, area_index_to_point
+
+        a = self._area()
+        assert area_point_to_index(a, (10, 20)) == 0
+        assert area_point_to_index(a, (10, 23)) == 3
+        assert area_point_to_index(a, (12, 21)) == 9
+        for i in range(12):
+            assert area_point_to_index(a, area_index_to_point(a, i)) == i
+
+    def test_point_and_index_access_agree(self):
+        from utils_area import area_get_attr, area_set_attr, area_get_attr_at, area_set_attr_at, area_count_attr
+
+        a = self._area()
+        area_set_attr(a, "flag", (11, 22), True)
+        assert area_get_attr_at(a, "flag", 6) is True
+        area_set_attr_at(a, "flag", 11, True)
+        assert area_get_attr(a, "flag", (12, 23)) is True
+        assert area_count_attr(a, "flag", True) == 2
+        assert area_count_attr(a, "flag", False) == 10
+
+    def test_set_all_resets_counts(self):
+        from utils_area import area_set_attr_at, area_set_all_attr, area_count_attr, area_get_attr_at
+
+        a = self._area()
+        area_set_attr_at(a, "flag", 0, True)
+        area_set_all_attr(a, "flag", None)
+        assert area_count_attr(a, "flag", None) == 12
+        assert area_count_attr(a, "flag", True) == 0
+        assert all(area_get_attr_at(a, "flag", i) is None for i in range(12))
+
+    def test_replace_all(self):
+        """只改 old_value 的方块，value_counts 同步更新"""
+        from utils_area import area_set_attr_at, area_replace_all_attr, area_count_attr, area_get_attr_at
+
+        a = self._area()
+        area_set_attr_at(a, "flag", 2, True)
+        area_set_attr_at(a, "flag", 7, True)
+        area_replace_all_attr(a, "flag", False, None)
+        assert area_count_attr(a, "flag", False) == 0
+        assert area_count_attr(a, "flag", None) == 10
+        assert area_count_attr(a, "flag", True) == 2
+        assert [i for i in range(12) if area_get_attr_at(a, "flag", i) is True] == [2, 7]
+        # 没有 old_value 时不改动
+        area_replace_all_attr(a, "flag", False, True)
+        assert area_count_attr(a, "flag", True) == 2
+
+    def test_reset_attr_reuses_storage(self):
+        from utils_area import area_reset_attr, area_set_attr_at, area_count_attr
+
+        a = self._area()
+        data = a["attrs"]["flag"]
+        area_set_attr_at(a, "flag", 0, True)
+        area_reset_attr(a, "flag", False)
+        assert a["attrs"]["flag"] is data
+        assert area_count_attr(a, "flag", False) == 12
+        area_reset_attr(a, "new", None)
+        assert area_count_attr(a, "new", None) == 12
+
+    def test_reset_attr_is_count_driven(self):
+        """已全部为 value 时不扫描；混有多种值时全部改回 value"""
+        from framework.tick_system import get_tick
+        from utils_area import area_reset_attr, area_set_attr_at, area_count_attr, area_get_attr_at
+
+        a = self._area()
+        area_set_attr_at(a, "flag", 3, True)
+        area_set_attr_at(a, "flag", 8, None)
+        area_reset_attr(a, "flag", False)
+        assert [area_get_attr_at(a, "flag", i) for i in range(12)] == [False] * 12
+        assert area_count_attr(a, "flag", False) == 12
+        assert area_count_attr(a, "flag", True) == 0
+
+        start = get_tick()
+        area_reset_attr(a, "flag", False)
+        clean_cost = get_tick() - start
+        area_set_attr_at(a, "flag", 0, True)
+        start = get_tick()
+        area_reset_attr(a, "flag", False)
+        assert get_tick() - start < clean_cost + 12
+
+    def test_points_in_index_order(self):
+        from utils_area import area_get_points, area_point_to_index
+
+        a = self._area()
+        points = area_get_points(a)
+        assert len(points) == 12
+        assert [area_point_to_index(a, p) for p in points] == list(range(12))
+
+    def test_index_map_and_attr_list(self):
+        """热循环的读法：下标映射 + 属性列表，与按点读一致；写入与整体重置后列表仍然有效"""
+        from utils_area import (
+            area_get_index_map,
+            area_get_attr_list,
+            area_get_attr,
+            area_set_attr_at,
+            area_set_all_attr,
+        )
+
+        a = self._area()
+        index_map = area_get_index_map(a)
+        flags = area_get_attr_list(a, "flag")
+        area_set_attr_at(a, "flag", index_map[(12, 23)], True)
+        assert flags[index_map[(12, 23)]] is area_get_attr(a, "flag", (12, 23)) is True
+        area_set_all_attr(a, "flag", None)
+        assert area_get_attr_list(a, "flag") is flags
+        assert flags[index_map[(12, 23)]] is None
+
+
+class TestAreaMovement:
+    """测试区域内移动不越过世界边界"""
+
+    def _track(self, monkeypatch):
+        import builtins
+
+        from framework.game_builtins import reset_world
+
+        reset_world(world_size=10)
+        visited = []
+        original_move = builtins.move
+
+        def move(direction):
+            result = original_move(direction)
+            visited.append((get_pos_y(), get_pos_x()))
+            return result
+
+        monkeypatch.setattr(builtins, "move", move)
+        return visited
+
+    def test_moves_inside_rect_at_world_edge(self, monkeypatch):
+        """8x8 区域贴着 10x10 世界的边界：对角移动越界只要 6 步，但会穿出区域"""
+        from utils_area import area, area_contains_point, area_move_to_corner, area_visit_points
+
+        visited = self._track(monkeypatch)
+        a = area(0, (0, 0, 8, 8))
+        assert area_move_to_corner(a, "top_right") == (7, 7)
+        area_move_to_corner(a, "bottom_left")
+        area_visit_points(a, {(7, 7): True, (0, 0): True}, lambda p: None)
+        assert len(visited) == 3 * 14
+        assert all(area_contains_point(a, p) for p in visited)
+
+    def test_commute_still_wraps(self, monkeypatch):
+        """从区域外赶来时仍按环面取最短"""
+        from framework.game_builtins import _world_state
+        from utils_area import area, area_move_to_corner
+
+        visited = self._track(monkeypatch)
+        _world_state["pos_y"] = 9
+        _world_state["pos_x"] = 9
+        area_move_to_corner(area(0, (0, 0, 8, 8)), "bottom_left")
+        assert visited == [(0, 9), (0, 0)]
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
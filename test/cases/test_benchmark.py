@@ -0,0 +1,53 @@
+from framework.benchmark import (
+    BENCHMARK_CASES,
+    run_benchmarks,
+    load_baseline,
+    compare_results,
+    find_regressions,
+    format_rows,
+)
+
+
+class TestBenchmarkCompare:
+    """测试基线比较规则"""
+
+    BASELINE = {"cases": {"a": {"ticks": 100, "wall": 0.010}, "b": {"ticks": 100, "wall": 0.010}}}
+
+    def test_tick_regression(self):
+        """tick 默认不允许任何增长"""
+        results = {"a": {"ticks": 101, "wall": 0.010}, "b": {"ticks": 99, "wall": 0.010}}
+        rows = compare_results(results, self.BASELINE)
+        assert [row["status"] for row in rows] == ["tick regression", "faster"]
+        assert [row["name"] for row in find_regressions(rows)] == ["a"]
+
+    def test_tick_threshold(self):
+        results = {"a": {"ticks": 104, "wall": 0.010}}
+        rows = compare_results(results, self.BASELINE, tick_threshold=0.05)
+        assert rows[0]["status"] == "ok"
+
+    def test_wall_regression(self):
+        """耗时要同时超过相对阈值和绝对余量才算回归"""
+        results = {"a": {"ticks": 100, "wall": 0.016}, "b": {"ticks": 100, "wall": 0.018}}
+        rows = compare_results(results, self.BASELINE, wall_threshold=0.5, wall_slack=0.002)
+        assert [row["status"] for row in rows] == ["ok", "wall regression"]
+        rows = compare_results(results, self.BASELINE, check_wall=False)
+        assert find_regressions(rows) == []
+
+    def test_new_case(self):
+        rows = compare_results({"c": {"ticks": 1, "wall": 0.001}}, self.BASELINE)
+        assert rows[0]["status"] == "new"
+        assert "new" in format_rows(rows)
+
+
+class TestBenchmarkBaseline:
+    """用例的 tick 开销与提交的基线一致（有意改变开销时运行 benchmark.py --update）"""
+
+    def test_ticks_match_baseline(self):
+        baseline = load_baseline()
+        assert baseline is not None
+        names = [name for name, _ in BENCHMARK_CASES]
+        assert sorted(names) == sorted(baseline["cases"])
+
+        results = run_benchmarks(repeat=1)
+        rows = compare_results(results, baseline, check_wall=False)
+        assert find_regressions(rows) == [], format_rows(rows)
@@ -0,0 +1,119 @@
+import json
+
+import pytest
+
+from framework.costs import load_cost_table, merge_cost_table
+from framework.game_builtins import (
+    reset_world,
+    set_cost_table,
+    get_cost_table,
+    set_unlocked,
+    get_inventory,
+)
+from framework.tick_system import reset_tick, get_tick
+
+
+def _move_ticks():
+    start = get_tick()
+    move(North)
+    return get_tick() - start
+
+
+class TestCostTable:
+    """测试开销表的读取、合并与计费"""
+
+    def setup_method(self):
+        reset_world(seed=1, world_size=8)
+        reset_tick()
+
+    def test_default_table(self):
+        """默认表：动作 200 tick，读取类 API 不耗时"""
+        table = get_cost_table()
+        assert table["actions"]["move"] == 200
+        assert _move_ticks() == 200
+        measure()
+        can_harvest()
+        assert get_tick() == 200
+
+    def test_json_overrides(self, tmp_path):
+        """只写出要改的字段，其余取默认表；reset_world 恢复默认表"""
+        path = tmp_path / "costs.json"
+        path.write_text(json.dumps({"actions": {"move": 50, "measure": 3}}))
+        set_cost_table(str(path))
+        assert _move_ticks() == 50
+        measure()
+        assert get_tick() == 53
+        till()
+        assert get_tick() == 253
+
+        reset_world()
+        assert _move_ticks() == 200
+
+    def test_yaml(self, tmp_path):
+        pytest.importorskip("yaml")
+        path = tmp_path / "costs.yaml"
+        path.write_text("actions:\n  move: 70\npower:\n  speedup: 4\n")
+        table = load_cost_table(path)
+        assert table["actions"]["move"] == 70
+        assert table["power"]["speedup"] == 4
+        assert table["power"]["actions_per_power"] == 30
+
+    def test_invalid_tables(self):
+        with pytest.raises(ValueError):
+            merge_cost_table({"actions": {"teleport": 1}})
+        with pytest.raises(ValueError):
+            merge_cost_table({"actions": {"move": -1}})
+        with pytest.raises(ValueError):
+            merge_cost_table({"speed": 2})
+        with pytest.raises(ValueError):
+            set_cost_table({"unlocks": {"Teleport": [1, 2]}})
+
+    def test_unlock_speedup(self):
+        """解锁等级按表中的倍率加速，超出列表的等级取最后一项"""
+        set_cost_table({"unlocks": {"Speed": [1, 2, 4]}})
+        set_unlocked(Unlocks.Speed, 1)
+        assert _move_ticks() == 100
+        set_unlocked(Unlocks.Speed, 9)
+        assert _move_ticks() == 50
+
+    def test_power_speedup(self):
+        """有 Power 时动作加速，每 actions_per_power 次动作消耗 1 个 Power"""
+        reset_world(world_size=8, inventory={Items.Power: 1})
+        set_cost_table({"power": {"actions_per_power": 3}})
+        assert [_move_ticks() for _ in range(4)] == [100, 100, 100, 200]
+        assert get_inventory() == {Items.Power: 0}
+        # do_a_flip 不在 power.actions 中
+        reset_world(world_size=8, inventory={Items.Power: 1})
+        reset_tick()
+        do_a_flip()
+        assert get_tick() == 200
+
+    def test_spawn_drone_cost(self):
+        """生成无人机的耗时同样取开销表"""
+        from framework.drone_scheduler import DroneScheduler
+
+        set_cost_table({"actions": {"spawn_drone": 30}})
+        ticks = {}
+
+        def __main():
+            spawn_drone(lambda: None)
+            ticks["after_spawn"] = get_tick()
+
+        DroneScheduler(max_drones=2).run(__main)
+        assert ticks["after_spawn"] == 30
+
+    def test_operation_ticks(self):
+        """operation 改变变换后代码每个运算的 tick"""
+        import utils_pytest
+
+        set_cost_table({"operation": 3})
+        utils_pytest.op_add(1, 2)
+        assert get_tick() == 3
+        reset_world()
+        reset_tick()
+        utils_pytest.op_add(1, 2)
+        assert get_tick() == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,160 @@
+import pytest
+
+from framework.drone_scheduler import DroneScheduler
+from framework.game_builtins import reset_world, set_growth_ticks, get_inventory
+from framework.tick_system import reset_tick, get_tick
+
+
+def _walk(steps, direction):
+    def __walk():
+        for _ in range(steps):
+            move(direction)
+        return (get_pos_x(), get_pos_y())
+
+    return __walk
+
+
+class TestDroneScheduler:
+    """测试多无人机调度器"""
+
+    def setup_method(self):
+        reset_world(seed=1)
+        reset_tick()
+
+    def test_no_scheduler(self):
+        """没有调度器时 spawn_drone 失败，只有一架无人机"""
+        assert spawn_drone(_walk(1, North)) is None
+        assert max_drones() == 1
+        assert num_drones() == 1
+
+    def test_each_drone_has_own_position_and_clock(self):
+        """每架无人机独立的位置与 tick，wait_for 返回函数结果并同步时钟"""
+        results = {}
+
+        def __main():
+            d1 = spawn_drone(_walk(3, North))
+            d2 = spawn_drone(_walk(5, East))
+            results["main_pos"] = (get_pos_x(), get_pos_y())
+            results["d1"] = wait_for(d1)
+            results["d2"] = wait_for(d2)
+            results["tick"] = get_tick_count()
+            results["finished"] = has_finished(d2)
+
+        scheduler = DroneScheduler(max_drones=3)
+        scheduler.run(__main)
+
+        assert results["main_pos"] == (0, 0)
+        assert results["d1"] == (0, 3)
+        assert results["d2"] == (5, 0)
+        assert results["finished"]
+        # d2 在第 400 tick 生成，再走 5 步
+        assert results["tick"] == 400 + 5 * 200
+        assert scheduler.elapsed() == results["tick"]
+
+    def test_drone_cap(self):
+        """达到 max_drones 时 spawn_drone 返回 None"""
+        handles = []
+
+        def __main():
+            for _ in range(3):
+                handles.append(spawn_drone(_walk(2, North)))
+
+        DroneScheduler(max_drones=2).run(__main)
+        assert handles[0] is not None
+        assert handles[1] is None
+        assert handles[2] is None
+
+    def test_interleaving_by_tick(self):
+        """无人机按 tick 交错执行：后生成的无人机能看到先到达的世界状态"""
+        seen = []
+
+        def __planter():
+            move(North)
+            plant(Entities.Bush)
+
+        def __watcher():
+            # 生成时在 (0, 0)，比 planter 晚 200 tick 出发；先看一眼，再等一会儿看
+            move(North)
+            seen.append(get_entity_type())
+            do_a_flip()
+            seen.append(get_entity_type())
+
+        def __main():
+            a = spawn_drone(__planter)
+            b = spawn_drone(__watcher)
+            wait_for(a)
+            wait_for(b)
+
+        DroneScheduler(max_drones=3).run(__main)
+        assert seen == [None, Entities.Bush]
+
+    def test_budget_and_stats(self):
+        """tick 预算耗尽时停止无限循环的无人机，并统计利用率"""
+
+        def __busy():
+            while True:
+                move(North)
+
+        def __idle():
+            while True:
+                do_a_flip()
+
+        def __main():
+            spawn_drone(__busy)
+            spawn_drone(__idle)
+            while True:
+                do_a_flip()
+
+        scheduler = DroneScheduler(max_drones=3)
+        scheduler.run(__main, max_ticks=10000)
+
+        assert scheduler.elapsed() >= 10000
+        stats = scheduler.stats()
+        assert len(stats) == 3
+        assert stats[1]["utilization"] > 0.9
+        assert stats[2]["utilization"] < 0.1
+        assert 0 < scheduler.utilization() < 1
+        assert get_tick() == scheduler.elapsed()
+
+    def test_error_propagates(self):
+        """无人机内的异常在 run() 中重新抛出"""
+
+        def __bad():
+            move(North)
+            raise ValueError("boom")
+
+        def __main():
+            wait_for(spawn_drone(__bad))
+
+        with pytest.raises(ValueError):
+            DroneScheduler(max_drones=2).run(__main)
+
+    def test_spawn_area_drone(self):
+        """utils_drone.spawn_area_drone 在调度器中运行真实区域"""
+        from area_pumpkin import pumpkin_area
+        from utils_drone import spawn_area_drone
+
+        set_growth_ticks(Entities.Pumpkin, 500)
+        area = pumpkin_area((3, 3))
+        y, x, h, w = area["rect"]
+
+        def __main():
+            for dy in range(h):
+                for dx in range(w):
+                    from framework.game_builtins import _world_state
+
+                    _world_state["pos_x"] = x + dx
+                    _world_state["pos_y"] = y + dy
+                    till()
+            assert spawn_area_drone(area) is not None
+            while True:
+                do_a_flip()
+
+        scheduler = DroneScheduler(max_drones=2)
+        scheduler.run(__main, max_ticks=200000)
+        assert get_inventory().get(Items.Pumpkin, 0) > 0
+        assert "last_process_tick" in area
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
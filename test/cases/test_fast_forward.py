@@ -0,0 +1,179 @@
+import pytest
+
+from framework.drone_scheduler import DroneScheduler
+from framework.game_builtins import (
+    reset_world,
+    set_growth_ticks,
+    set_fast_forward,
+    get_fast_forwarded_ticks,
+    _world_state,
+)
+from framework.number_ast_transformer import transform_source
+from framework.number_wrapper import Number
+from framework.tick_system import (
+    get_tick,
+    reset_tick,
+    _add_ticks,
+    start_tick_profile,
+    stop_tick_profile,
+)
+
+
+SOURCE = """
+def wait_ready():
+    while not can_harvest():
+        pass
+    return get_tick_count()
+
+
+def wait_counting():
+    n = 0
+    while not can_harvest():
+        n = n + 1
+    return n
+
+
+def wait_deadline(deadline):
+    while not can_harvest() and get_tick_count() < deadline:
+        pass
+    return can_harvest()
+
+
+def scan(xs):
+    pending = list(xs)
+    while len(pending) > 0:
+        ready = []
+        for x in pending:
+            while get_pos_x() < x:
+                move(East)
+            while get_pos_x() > x:
+                move(West)
+            if can_harvest():
+                ready.append(x)
+        for x in ready:
+            pending.remove(x)
+    return get_tick_count()
+"""
+
+
+def _load():
+    """以白名单模块名执行变换后的代码，使轮询循环的 tick 正常计数"""
+    tree = transform_source(SOURCE, "<fast_forward>")
+    namespace = {"__name__": "utils_pytest", "Number": Number, "_add_ticks": _add_ticks}
+    exec(compile(tree, "<fast_forward>", "exec"), namespace)
+    return namespace
+
+
+def _run(enabled, func, *args, growth=(3000, 5000), inventory=None):
+    """在同一个世界里分别开关快进运行，返回 (结果, 结束 tick, 快进 tick 数)"""
+    reset_world(seed=1, world_size=8, inventory=inventory)
+    reset_tick()
+    set_fast_forward(enabled)
+    set_growth_ticks(Entities.Bush, *growth)
+    for x in (0, 3, 5):
+        _world_state["pos_x"] = x
+        plant(Entities.Bush)
+    _world_state["pos_x"] = 0
+    result = func(*args)
+    return result, get_tick(), get_fast_forwarded_ticks()
+
+
+class TestFastForward:
+    """测试空转等待的快进"""
+
+    def setup_method(self):
+        self.ns = _load()
+
+    def teardown_method(self):
+        set_fast_forward(True)
+
+    def test_spin_wait_is_skipped(self):
+        """while not can_harvest(): pass 直接跳到成熟，tick 与逐圈空转完全一致"""
+        slow = _run(False, self.ns["wait_ready"])
+        fast = _run(True, self.ns["wait_ready"])
+        assert fast[:2] == slow[:2]
+        assert slow[2] == 0
+        # 只有检测循环所需的前几圈真正执行
+        assert fast[2] > slow[1] - 3 * 200 - 50
+
+    def test_counting_loop_is_not_skipped(self):
+        """循环体改变了局部变量时不快进，计数结果保持正确"""
+        slow = _run(False, self.ns["wait_counting"])
+        fast = _run(True, self.ns["wait_counting"])
+        assert fast == slow
+        assert fast[0] > 0
+
+    def test_tick_count_breaks_spin(self):
+        """读取 get_tick_count 的循环可能因截止时间退出，不快进"""
+        fast = _run(True, self.ns["wait_deadline"], 1000)
+        assert fast[0] is False
+        assert fast[2] == 0
+
+    def test_scan_with_moves(self):
+        """来回移动扫描多个格子的轮询也能快进，且结果不变"""
+        # 每圈约 10 次移动，生长时间要足够跑满检测所需的几圈
+        slow = _run(False, self.ns["scan"], [0, 3, 5], growth=(20000, 30000))
+        fast = _run(True, self.ns["scan"], [0, 3, 5], growth=(20000, 30000))
+        assert fast[:2] == slow[:2]
+        assert fast[2] > 0
+
+    def test_scan_with_power(self):
+        """快进时按跳过的动作消耗 Power，Power 耗尽前停下，结果不变"""
+        runs = []
+        for enabled in (False, True):
+            run = _run(
+                enabled,
+                self.ns["scan"],
+                [0, 3, 5],
+                growth=(20000, 30000),
+                inventory={Items.Power: 3},
+            )
+            runs.append((run, num_items(Items.Power)))
+        assert runs[1][0][:2] == runs[0][0][:2]
+        assert runs[1][1] == runs[0][1] == 0
+        assert runs[1][0][2] > 0
+
+    def test_profile_is_exact(self):
+        """profiling 时不快进，每个 tick 都记到调用栈上"""
+        reset_world(seed=1, world_size=8)
+        reset_tick()
+        set_growth_ticks(Entities.Bush, 1000)
+        plant(Entities.Bush)
+        start_tick_profile()
+        self.ns["wait_ready"]()
+        profile = stop_tick_profile()
+        assert get_fast_forwarded_ticks() == 0
+        assert sum(profile.values()) == get_tick() - 200
+
+    def test_bounded_by_other_drones(self):
+        """多无人机时只快进到其它无人机的时钟，结果与逐圈空转一致"""
+
+        def __run(enabled):
+            results = {}
+
+            def __walker():
+                for _ in range(20):
+                    move(North)
+                    results.setdefault("walk", []).append(get_tick_count())
+
+            def __main():
+                drone = spawn_drone(__walker)
+                results["ready"] = self.ns["wait_ready"]()
+                wait_for(drone)
+
+            reset_world(seed=1, world_size=8)
+            reset_tick()
+            set_fast_forward(enabled)
+            set_growth_ticks(Entities.Bush, 3000)
+            plant(Entities.Bush)
+            DroneScheduler(max_drones=2).run(__main)
+            return results, get_fast_forwarded_ticks()
+
+        slow = __run(False)
+        fast = __run(True)
+        assert fast[0] == slow[0]
+        assert fast[1] > 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,75 @@
+import os
+
+import pytest
+
+from framework.fork_server import ForkServer, fork_available
+from framework.scenario import make_layout, run_layout
+
+pytestmark = pytest.mark.skipif(not fork_available(), reason="fork server 需要 os.fork")
+
+_parent_state = {"value": 0}
+
+
+def _set_state(value):
+    _parent_state["value"] = value
+    return os.getpid()
+
+
+def _square(n):
+    return n * n
+
+
+def _fail():
+    raise ValueError("boom")
+
+
+def _fail_odd(n):
+    if n % 2:
+        raise ValueError("odd")
+    return n
+
+
+class TestForkServer:
+    """测试预热后 fork 子进程运行"""
+
+    def test_run_returns_result(self):
+        server = ForkServer(jobs=1)
+        assert server.run(_square, 7) == 49
+
+    def test_child_state_does_not_leak(self):
+        """子进程里的修改不影响父进程"""
+        server = ForkServer(jobs=1)
+        child_pid = server.run(_set_state, 42)
+        assert child_pid != os.getpid()
+        assert _parent_state["value"] == 0
+
+    def test_error_propagates(self):
+        server = ForkServer(jobs=1)
+        with pytest.raises(RuntimeError, match="ValueError: boom"):
+            server.run(_fail)
+
+    def test_on_error_yields_result_per_job(self):
+        """给出 on_error 时失败的 job 产出错误结果，其余 job 照常完成"""
+        server = ForkServer(jobs=2)
+        jobs = [(n,) for n in range(4)]
+        results = server.imap_unordered(_fail_odd, jobs, on_error=lambda job, message: (job, message))
+        failed = sorted(r for r in results if isinstance(r, tuple))
+        assert [job for job, _ in failed] == [(1,), (3,)]
+        assert all("ValueError: odd" in message for _, message in failed)
+
+    def test_imap_unordered_covers_all_jobs(self):
+        server = ForkServer(jobs=3)
+        results = server.imap_unordered(_square, [(n,) for n in range(10)])
+        assert sorted(results) == [n * n for n in range(10)]
+
+    def test_run_layout_matches_in_process(self):
+        """fork 子进程中运行布局与在当前进程中运行结果相同"""
+        layout = make_layout(pumpkin=(4, 4), sunflower=None, cactus=None, companion=None, maze=None)
+        server = ForkServer(jobs=1)
+        forked = server.run(run_layout, layout, 5000, 4)
+        assert forked["error"] is None
+        assert forked == run_layout(layout, 5000, 4)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
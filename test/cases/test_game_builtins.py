@@ -0,0 +1,445 @@
+import sys
+
+import pytest
+
+from framework.game_builtins import (
+    reset_world,
+    set_growth_ticks,
+    set_unlocked,
+    get_inventory,
+    _world_state,
+    _tile_index,
+)
+from framework.tick_system import reset_tick, advance_ticks, get_tick
+
+
+def _goto(x, y):
+    """直接把无人机放到 (x, y)，测试里不关心移动耗时"""
+    _world_state["pos_x"] = x
+    _world_state["pos_y"] = y
+
+
+class TestFarming:
+    """测试种植与收获"""
+
+    def setup_method(self):
+        reset_world(seed=1)
+        reset_tick()
+
+    def test_grass_grows_and_harvests(self):
+        """草需要时间生长，成熟后收获得到干草"""
+        set_growth_ticks(Entities.Grass, 100)
+        assert plant(Entities.Grass)
+        assert get_entity_type() == Entities.Grass
+        assert not can_harvest()
+
+        advance_ticks(100)
+        assert can_harvest()
+        assert harvest()
+        assert get_entity_type() is None
+        assert num_items(Items.Hay) >= 1
+
+    def test_harvest_growing_plant_destroys_it(self):
+        """收获未成熟作物会把作物铲掉并返回 False"""
+        plant(Entities.Bush)
+        assert not harvest()
+        assert get_entity_type() is None
+        assert get_inventory() == {}
+
+    def test_soil_required(self):
+        """胡萝卜等作物只能种在土壤上"""
+        assert not plant(Entities.Carrot)
+        till()
+        assert get_ground_type() == Grounds.Soil
+        assert plant(Entities.Carrot)
+        # 已有作物的格子不能再种
+        assert not plant(Entities.Carrot)
+
+    def test_companion(self):
+        """伴生作物满足时产量翻倍"""
+        set_growth_ticks(Entities.Bush, 10)
+        plant(Entities.Bush)
+        plant_type, (cx, cy) = get_companion()
+        assert plant_type != Entities.Bush
+        assert abs(cx) + abs(cy) <= 3
+
+        set_growth_ticks(plant_type, 10)
+        _goto(cx, cy)
+        if plant_type == Entities.Carrot:
+            till()
+        assert plant(plant_type)
+
+        advance_ticks(10)
+        _goto(0, 0)
+        assert harvest()
+        assert num_items(Items.Wood) == 5
+
+
+class TestPumpkin:
+    """测试南瓜合并与枯死"""
+
+    def setup_method(self):
+        reset_world(seed=2)
+        reset_tick()
+        set_growth_ticks(Entities.Pumpkin, 10)
+
+    def _plant_square(self, k):
+        for x in range(k):
+            for y in range(k):
+                _goto(x, y)
+                till()
+                plant(Entities.Pumpkin)
+                _world_state["dead"][_tile_index(x, y)] = 0
+
+    def test_giant_pumpkin(self):
+        """成熟的 k*k 南瓜合并，收获得到 k*k*min(k, 6)"""
+        self._plant_square(3)
+        advance_ticks(10)
+        _goto(1, 1)
+        assert harvest()
+        assert num_items(Items.Pumpkin) == 27
+        for x in range(3):
+            for y in range(3):
+                assert _world_state["entity"][_tile_index(x, y)] == 0
+
+    def test_dead_pumpkin(self):
+        """枯死的南瓜成熟后显示为 Dead_Pumpkin 且无法收获"""
+        till()
+        plant(Entities.Pumpkin)
+        _world_state["dead"][_tile_index(0, 0)] = 1
+        assert get_entity_type() == Entities.Pumpkin
+        advance_ticks(10)
+        assert get_entity_type() == Entities.Dead_Pumpkin
+        assert not can_harvest()
+        assert plant(Entities.Pumpkin) is False
+        assert not harvest()
+        assert get_entity_type() is None
+
+
+class TestCactusAndSunflower:
+    """测试仙人掌和向日葵的特殊收获规则"""
+
+    def setup_method(self):
+        reset_world(seed=3)
+        reset_tick()
+
+    def test_sorted_cactus_chain(self):
+        """排好序的仙人掌一起收获，n 个得到 n*n"""
+        set_growth_ticks(Entities.Cactus, 1)
+        for x in range(3):
+            _goto(x, 0)
+            till()
+            plant(Entities.Cactus)
+            _world_state["measure"][_tile_index(x, 0)] = x
+        advance_ticks(1)
+        _goto(0, 0)
+        assert measure() == 0
+        assert measure(East) == 1
+        assert harvest()
+        assert num_items(Items.Cactus) == 9
+
+    def test_swap(self):
+        """swap 交换相邻两格的作物"""
+        set_growth_ticks(Entities.Cactus, 1)
+        for x in range(2):
+            _goto(x, 0)
+            till()
+            plant(Entities.Cactus)
+            _world_state["measure"][_tile_index(x, 0)] = 5 - x
+        _goto(0, 0)
+        swap(East)
+        assert measure() == 4
+        assert measure(East) == 5
+
+    def test_sunflower_bonus(self):
+        """花瓣最多的向日葵在至少 10 株时产出 5 倍能量"""
+        set_growth_ticks(Entities.Sunflower, 1)
+        for x in range(10):
+            _goto(x, 0)
+            till()
+            plant(Entities.Sunflower)
+        advance_ticks(1)
+        best = max(range(10), key=lambda x: _world_state["measure"][_tile_index(x, 0)])
+        _goto(best, 0)
+        assert harvest()
+        assert num_items(Items.Power) == 5
+
+
+class TestLazyGrowth:
+    """测试按时间戳惰性计算的生长：推进时钟与已种格子数无关"""
+
+    def _clock_cost(self, planted):
+        """种下 planted 格灌木后，推进时钟所执行的 Python 行数"""
+        reset_world(seed=3, world_size=20)
+        reset_tick()
+        set_growth_ticks(Entities.Bush, 1000)
+        for i in range(planted):
+            _goto(i % 20, i // 20)
+            assert plant(Entities.Bush)
+        _goto(0, 0)
+
+        lines = {"n": 0}
+
+        def tracer(frame, event, arg):
+            if event == "line":
+                lines["n"] += 1
+            return tracer
+
+        sys.settrace(tracer)
+        try:
+            advance_ticks(100000)
+            do_a_flip()
+        finally:
+            sys.settrace(None)
+        assert can_harvest()
+        return lines["n"]
+
+    def test_clock_cost_independent_of_planted_tiles(self):
+        assert self._clock_cost(1) == self._clock_cost(400)
+
+
+class TestMaze:
+    """测试迷宫生成、墙体与宝箱"""
+
+    def setup_method(self):
+        reset_world(seed=5, world_size=12, inventory={Items.Weird_Substance: 100})
+        reset_tick()
+
+    def _make_maze(self, size):
+        _goto(4, 4)
+        plant(Entities.Bush)
+        assert use_item(Items.Weird_Substance, size // 2)  # 未解锁时 size = n * 2
+        return _world_state["maze"]
+
+    def _open_edges(self, maze):
+        """迷宫内部连通的边数（每条边两侧各记一次）"""
+        count = 0
+        for y in range(maze["y0"], maze["y0"] + maze["size"]):
+            for x in range(maze["x0"], maze["x0"] + maze["size"]):
+                _goto(x, y)
+                count += sum(1 for d in (North, South, East, West) if can_move(d))
+        return count // 2
+
+    def test_perfect_maze(self):
+        """n*n 的完美迷宫：全是树篱和一个宝箱，恰好 n*n-1 条通道，边界不可穿出"""
+        maze = self._make_maze(6)
+        assert maze["size"] == 6
+        assert (maze["x0"], maze["y0"]) == (1, 1)
+        assert num_items(Items.Weird_Substance) == 97
+
+        entities = []
+        for y in range(1, 7):
+            for x in range(1, 7):
+                _goto(x, y)
+                entities.append(get_entity_type())
+                assert measure() == maze["treasure"]
+        assert entities.count(Entities.Treasure) == 1
+        assert entities.count(Entities.Hedge) == 35
+        assert self._open_edges(maze) == 35
+
+        _goto(1, 1)
+        assert not can_move(West)
+        assert not can_move(South)
+        assert not move(West)
+        assert (get_pos_x(), get_pos_y()) == (1, 1)
+
+    def test_seeded_maze(self):
+        walls = bytes(self._make_maze(6)["walls"])
+        self.setup_method()
+        assert bytes(self._make_maze(6)["walls"]) == walls
+
+    def test_reuse_and_harvest(self):
+        """在宝箱上再次使用会移动宝箱并拆墙，收获宝箱得到金币且迷宫消失"""
+        maze = self._make_maze(6)
+        old = maze["treasure"]
+        edges = self._open_edges(maze)
+        _goto(*old)
+        assert get_entity_type() == Entities.Treasure
+        assert use_item(Items.Weird_Substance, 3)
+        assert maze["treasure"] != old
+        assert self._open_edges(maze) == edges + 1
+        _goto(*old)
+        assert get_entity_type() == Entities.Hedge
+        assert not use_item(Items.Weird_Substance, 3)
+        assert not harvest()
+
+        _goto(*maze["treasure"])
+        assert harvest()
+        assert num_items(Items.Gold) == 6 * 6 * 2
+        assert _world_state["maze"] is None
+        assert get_entity_type() is None
+        assert can_move(West)
+
+
+class TestDinosaur:
+    """测试恐龙帽：苹果、尾巴与骨头"""
+
+    def setup_method(self):
+        reset_world(seed=8, world_size=6)
+        reset_tick()
+
+    def test_apple_and_tail(self):
+        """戴帽时脚下生成苹果，离开苹果格尾巴变长，之后撞上尾巴的移动失败"""
+        _goto(2, 2)
+        change_hat(Hats.Dinosaur_Hat)
+        assert get_entity_type() == Entities.Apple
+        next_x, next_y = measure()
+        assert (next_x, next_y) != (2, 2)
+        assert measure() == (next_x, next_y)
+
+        assert move(East)
+        assert (get_pos_x(), get_pos_y()) == (3, 2)
+        _goto(next_x, next_y)
+        assert get_entity_type() == Entities.Apple
+        _goto(3, 2)
+
+        # 尾巴长度 1：可以移回尾尖（尾巴同时跟上）
+        assert move(West)
+        assert (get_pos_x(), get_pos_y()) == (2, 2)
+        assert move(East)
+
+    def test_blocked_moves(self):
+        """不能越过农场边界，也不能在生长时撞上尾巴"""
+        _goto(0, 0)
+        change_hat(Hats.Dinosaur_Hat)
+        assert not move(West)
+        assert not move(South)
+        assert (get_pos_x(), get_pos_y()) == (0, 0)
+        assert move(North)
+        assert get_tick() == 3 * 200
+
+        _world_state["dinosaur"]["apple"] = (0, 1)
+        assert not move(South)  # 正在生长，尾尖不会让开
+
+    def test_bones(self):
+        """摘下帽子得到尾巴长度的平方个骨头"""
+        change_hat(Hats.Dinosaur_Hat)
+        for _ in range(3):
+            apple = _world_state["dinosaur"]["apple"]
+            _goto(*apple)
+            assert move(North) or move(East)
+        assert len(_world_state["dinosaur"]["tail"]) == 3
+        change_hat(Hats.Straw_Hat)
+        assert num_items(Items.Bone) == 9
+        assert _world_state["dinosaur"] is None
+
+    def _fill_tail(self, seed, free):
+        """3x3 农场，无人机站在 (1, 1) 的苹果上，除 free 之外的格子都是尾巴"""
+        reset_world(seed=seed, world_size=3)
+        _goto(1, 1)
+        change_hat(Hats.Dinosaur_Hat)
+        dino = _world_state["dinosaur"]
+        for x in range(3):
+            for y in range(3):
+                if (x, y) != (1, 1) and (x, y) not in free:
+                    dino["tail"].append((x, y))
+                    dino["cells"].add((x, y))
+        return dino
+
+    @pytest.mark.parametrize("seed", range(8))
+    def test_apple_avoids_new_head_and_tail(self, seed):
+        """新苹果不会生成在移动后的头部与尾巴上（只剩一个空格时必然落在那里）"""
+        dino = self._fill_tail(seed, {(2, 1), (2, 2)})
+        assert move(East)
+        assert dino["apple"] == (2, 2)
+
+        # measure() 预先掷出的苹果若落在移动后的头部，移动时重新掷
+        dino = self._fill_tail(seed, {(2, 1), (2, 2), (1, 2)})
+        dino["next_apple"] = (2, 1)
+        assert measure() == (2, 1)
+        assert move(East)
+        assert dino["apple"] in ((2, 2), (1, 2))
+
+    def test_no_apple_when_full(self):
+        """移动后没有空格时不再生成苹果"""
+        dino = self._fill_tail(0, {(2, 1)})
+        assert move(East)
+        assert dino["apple"] is None
+
+
+class TestAreaProcess:
+    """端到端运行区域处理器"""
+
+    def test_pumpkin_area_process(self):
+        """南瓜区域跑一轮后应收获合并南瓜，并记录耗时"""
+        from area_pumpkin import pumpkin_area
+        from utils_area import area_init, area_process
+
+        reset_world(seed=4)
+        reset_tick()
+        set_growth_ticks(Entities.Pumpkin, 500)
+
+        area = pumpkin_area((3, 3))
+        assert area is not None
+        y, x, h, w = area["rect"]
+        _goto(x, y)
+        for dy in range(h):
+            for dx in range(w):
+                _goto(x + dx, y + dy)
+                till()
+        _goto(x, y)
+
+        area_init(area)
+        area_process(area)
+
+        assert num_items(Items.Pumpkin) >= h * w * min(h, w, 6)
+        assert area["last_process_harvest"][Entities.Pumpkin] == 1
+        assert area["last_process_tick"] > 0
+
+    def test_maze_area_process(self):
+        """迷宫区域：建模、多轮寻宝，最后收获宝箱"""
+        from area_maze import maze_area
+        from utils_area import area_init, area_process
+
+        reset_world(seed=6, inventory={Items.Weird_Substance: 1000})
+        reset_tick()
+
+        area = maze_area((8, 8), 5)
+        assert area is not None
+        area_init(area)
+        assert get_entity_type() in (Entities.Hedge, Entities.Treasure)
+        area_process(area)
+
+        assert area["times"] == 0
+        assert num_items(Items.Gold) == 8 * 8 * 5
+        assert area["last_process_harvest"][Entities.Treasure] == 1
+
+    def test_dinosaur_run(self):
+        """恐龙区域跑到无路可走为止，骨头为尾巴长度的平方"""
+        from area_dinosaur import dinosaur_run
+
+        reset_world(seed=1, world_size=6)
+        reset_tick()
+        dinosaur_run()
+        assert get_inventory()[Items.Bone] == 7 * 7
+        assert _world_state["dinosaur"] is None
+
+
+class TestMisc:
+    """测试物品、解锁等杂项接口"""
+
+    def test_items_and_unlocks(self):
+        reset_world(inventory={Items.Water: 2})
+        assert num_items(Items.Water) == 2
+        assert use_item(Items.Water)
+        assert not use_item(Items.Water, 2)
+        assert num_unlocked(Unlocks.Mazes) == 0
+        set_unlocked(Unlocks.Mazes, 2)
+        assert num_unlocked(Unlocks.Mazes) == 2
+
+    def test_flip_advances_ticks(self):
+        reset_tick()
+        cur = get_tick_count()
+        do_a_flip()
+        assert get_tick_count() == cur + 200
+        assert get_tick() == get_tick_count()
+
+    def test_seeded_random(self):
+        reset_world(seed=7)
+        a = [random() for _ in range(3)]
+        reset_world(seed=7)
+        assert a == [random() for _ in range(3)]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
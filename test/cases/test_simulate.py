@@ -0,0 +1,122 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+TEST_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(TEST_DIR))
+
+import simulate
+from framework.scenario import run_script
+
+
+def _run(tmp_path, *args):
+    """在独立进程中运行 simulate.py（脚本会修改进程级的世界与模块状态）"""
+    out = tmp_path / "result.json"
+    proc = subprocess.run(
+        [sys.executable, str(TEST_DIR / "simulate.py"), *args, "--json", str(out)],
+        capture_output=True,
+        encoding="utf-8",
+    )
+    return proc, json.loads(out.read_text(encoding="utf-8"))
+
+
+class TestSimulate:
+    """测试顶层脚本的无界面运行"""
+
+    def test_needs_budget(self):
+        with pytest.raises(ValueError):
+            run_script(TEST_DIR.parent / "main.py")
+
+    def test_tick_budget(self, tmp_path):
+        """按 tick 预算运行 main.py：找到全部区域，收获归到区域内"""
+        proc, result = _run(tmp_path, "main.py", "--ticks", "200000", "--drones", "8")
+        assert proc.returncode == 0, proc.stderr
+        assert result["error"] is None
+        assert result["ticks"] >= 200000
+        types = [a["type"] for a in result["areas"]]
+        assert types.count("companion") == 3
+        assert "pumpkin" in types
+        pumpkin = result["areas"][types.index("pumpkin")]
+        assert pumpkin["items"].get("Pumpkin", 0) > 0
+        assert result["unattributed_items"] == {}
+        assert 0.0 < result["utilization"] <= 1.0
+        assert result["allocator"]["size"] == [100, 100]
+        assert "无人机利用率" in proc.stdout
+
+    def test_maze_and_cactus_produce(self, tmp_path):
+        """默认库存下 maze 与 cactus 都有收获，迷宫完成后复用同一块矩形"""
+        source = (TEST_DIR.parent / "main.py").read_text(encoding="utf-8")
+        for old, new in (
+            ("MAZE_SIZE = (16, 16)", "MAZE_SIZE = (6, 6)"),
+            ("MAZE_TIMES = 300", "MAZE_TIMES = 1"),
+            ("CACTUS_SIZE = (12, 12)", "CACTUS_SIZE = (6, 6)"),
+        ):
+            assert old in source
+            source = source.replace(old, new)
+        script = tmp_path / "main.py"
+        script.write_text(source, encoding="utf-8")
+
+        proc, result = _run(tmp_path, str(script), "--ticks", "400000")
+        assert proc.returncode == 0, proc.stderr
+        areas = {a["type"]: a for a in result["areas"]}
+        assert areas["maze"]["items"].get("Gold", 0) > 0
+        assert areas["cactus"]["items"].get("Cactus", 0) > 0
+        assert result["unattributed_items"] == {}
+        # 7 个区域的矩形，迷宫不会每局新占一块
+        assert len(result["allocator"]["allocated"]) == 7
+
+    def test_item_budget(self, tmp_path):
+        """达到物品预算时结束所有无人机"""
+        proc, result = _run(tmp_path, "main.py", "--items", "100", "--drones", "4")
+        assert proc.returncode == 0, proc.stderr
+        assert result["harvested"] >= 100
+        assert result["ticks"] < 1000000
+
+    def test_format_report(self):
+        result = {
+            "script": "main.py",
+            "ticks": 1000,
+            "harvested": 10,
+            "items_per_tick": 0.01,
+            "error": None,
+            "areas": [
+                {
+                    "rect_id": 2,
+                    "type": "pumpkin",
+                    "rect": (0, 0, 6, 6),
+                    "items": {"Pumpkin": 10},
+                    "items_per_tick": 0.01,
+                    "last_process_tick": 500,
+                }
+            ],
+            "unattributed_items": {},
+            "utilization": 0.5,
+            "drones": [
+                {
+                    "id": 0,
+                    "spawn_tick": 0,
+                    "end_tick": 1000,
+                    "busy_ticks": 500,
+                    "idle_ticks": 500,
+                    "utilization": 0.5,
+                }
+            ],
+            "allocator": {
+                "size": (10, 10),
+                "allocated": {2: (0, 0, 6, 6)},
+                "free_rects": [(0, 6, 10, 4), (6, 0, 4, 6)],
+                "utilization": 0.36,
+            },
+        }
+        text = simulate.format_report(result)
+        assert "items/tick=0.01000" in text
+        assert "pumpkin" in text and "Pumpkin=10" in text
+        assert "无人机利用率 50.0%" in text
+        assert "空闲 2 块: (0,6 10x4) (6,0 4x6)" in text
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,101 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+TEST_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(TEST_DIR))
+
+import sweep
+
+
+class TestSweep:
+    """测试布局扫描 CLI"""
+
+    def test_parse_sizes(self):
+        assert sweep.parse_sizes("6x6,8x10") == [(6, 6), (8, 10)]
+        assert sweep.parse_sizes("0") == [None]
+
+    def test_build_grid(self):
+        """网格为所有参数的笛卡尔积，未指定的参数取 main.py 的默认值"""
+        args = sweep.make_parser().parse_args(
+            ["--pumpkin", "6x6,8x8", "--maze", "0", "--order", "pumpkin,cactus", "--order", "cactus,pumpkin"]
+        )
+        layouts = sweep.build_grid(args)
+        assert len(layouts) == 4
+        assert {layout["pumpkin"] for layout in layouts} == {(6, 6), (8, 8)}
+        assert all(layout["maze"] is None for layout in layouts)
+        assert all(layout["cactus"] == (12, 12) for layout in layouts)
+
+    def test_format_table_ranked(self):
+        layout = sweep.make_layout()
+        results = [
+            {"layout": layout, "items_per_tick": 0.1, "utilization": 0.5, "failed_areas": [], "error": None},
+            {"layout": layout, "items_per_tick": 0.3, "utilization": 0.5, "failed_areas": [], "error": None},
+        ]
+        lines = sweep.format_table(results).splitlines()
+        assert "0.30000" in lines[2]
+        assert "0.10000" in lines[3]
+
+    def test_run_small_sweep(self, tmp_path):
+        """在工作进程中实际运行一个小配置"""
+        out = tmp_path / "result.json"
+        subprocess.run(
+            [
+                sys.executable,
+                str(TEST_DIR / "sweep.py"),
+                "--pumpkin", "4x4",
+                "--sunflower", "0",
+                "--cactus", "0",
+                "--companion", "0",
+                "--maze", "0",
+                "--ticks", "20000",
+                "--jobs", "1",
+                "--json", str(out),
+            ],
+            check=True,
+            capture_output=True,
+        )
+        results = json.loads(out.read_text(encoding="utf-8"))
+        assert len(results) == 1
+        assert results[0]["error"] is None
+        assert results[0]["ticks"] >= 20000
+
+    def test_maze_times_measured(self, tmp_path):
+        """有 Weird_Substance 库存时迷宫真正运行，不同的 maze_times 得到不同的结果"""
+        out = tmp_path / "result.json"
+        subprocess.run(
+            [
+                sys.executable,
+                str(TEST_DIR / "sweep.py"),
+                "--pumpkin", "0",
+                "--sunflower", "0",
+                "--cactus", "0",
+                "--companion", "0",
+                "--maze", "6x6",
+                "--maze-times", "1,3",
+                "--inventory", "Weird_Substance=100000",
+                "--ticks", "150000",
+                "--jobs", "2",
+                "--json", str(out),
+            ],
+            check=True,
+            capture_output=True,
+        )
+        results = json.loads(out.read_text(encoding="utf-8"))
+        by_times = {r["layout"]["maze_times"]: r for r in results}
+        assert set(by_times) == {1, 3}
+        assert all(r["error"] is None for r in results)
+        # 迷宫只产出金子：items/tick 就是金子的收获率，未用完的初始库存不计入
+        for r in results:
+            gold = r["harvested"].get("Gold", 0)
+            assert gold > 0
+            assert r["harvested"] == {"Gold": gold}
+            assert r["items_per_tick"] == float(gold) / r["ticks"]
+        assert by_times[3]["items_per_tick"] > by_times[1]["items_per_tick"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
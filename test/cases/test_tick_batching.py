@@ -0,0 +1,126 @@
+import ast
+
+import pytest
+
+from framework.number_ast_transformer import transform_source
+from framework.tick_system import get_tick, reset_tick, _add_ticks
+from framework.number_wrapper import Number
+
+
+SOURCE = """
+def straight(a, b):
+    c = a + b
+    d = c * 2
+    x, y = (c, d)
+    return x - y
+
+
+def branchy(a, b):
+    if a > 0 and b > 0:
+        return a + b
+    n = 0
+    while n < 3:
+        n = n + 1
+    return [v * 2 for v in range(n)]
+
+
+def chained(a, b, c):
+    return a < b < c
+
+
+def callee():
+    seen.append(get_tick_count())
+    return 1
+
+
+def call_first(y):
+    x = callee() + y[0] * y[1]
+    y[callee()] = x - 1
+    return x
+"""
+
+
+def _load(batch_ticks):
+    """以白名单模块名执行变换后的代码，使 tick 正常计数"""
+    tree = transform_source(SOURCE, "<batching>", {"batch_ticks": batch_ticks})
+    namespace = {
+        "__name__": "utils_pytest",
+        "Number": Number,
+        "_add_ticks": _add_ticks,
+        "get_tick_count": get_tick,
+        "seen": [],
+    }
+    exec(compile(tree, "<batching>", "exec"), namespace)
+    return tree, namespace
+
+
+def _ticks(func, *args):
+    reset_tick()
+    result = func(*args)
+    return get_tick(), result
+
+
+def _count_tick_calls(tree):
+    return sum(
+        1
+        for node in ast.walk(tree)
+        if isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Name)
+        and node.func.id == "_add_ticks"
+    )
+
+
+class TestTickBatching:
+    """测试按语句合并 tick 计数"""
+
+    @pytest.mark.parametrize(
+        "name,args",
+        [
+            ("straight", (1, 2)),
+            ("branchy", (1, 2)),
+            ("branchy", (-1, 2)),
+            ("branchy", (1, -2)),
+            ("chained", (1, 2, 3)),
+            ("chained", (3, 2, 1)),
+            ("call_first", ([1, 2],)),
+        ],
+    )
+    def test_same_ticks_as_unbatched(self, name, args):
+        """合并后 tick 总数与逐表达式计数完全相同"""
+        _, plain = _load(False)
+        _, batched = _load(True)
+        assert _ticks(batched[name], *args) == _ticks(plain[name], *args)
+
+    def test_fewer_tick_calls(self):
+        """合并后注入的 _add_ticks 调用明显减少"""
+        plain_tree, _ = _load(False)
+        batched_tree, _ = _load(True)
+        assert _count_tick_calls(batched_tree) < _count_tick_calls(plain_tree)
+
+    def test_straight_line_single_call(self):
+        """不含调用的直线代码只计数一次"""
+        tree, _ = _load(True)
+        func = tree.body[0]
+        tick_stmts = [
+            stmt
+            for stmt in func.body
+            if isinstance(stmt, ast.Expr)
+            and isinstance(stmt.value, ast.Call)
+            and stmt.value.func.id == "_add_ticks"
+        ]
+        assert len(tick_stmts) == 1
+        assert tick_stmts[0].value.args[0].value == 5
+
+    def test_callee_sees_same_tick(self):
+        """调用之后求值的包装不提前计数：被调用方读到的 get_tick_count() 与不合并时一致"""
+        _, plain = _load(False)
+        _, batched = _load(True)
+        plain_total, _ = _ticks(plain["call_first"], [1, 2])
+        batched_total, _ = _ticks(batched["call_first"], [1, 2])
+        assert batched["seen"] == plain["seen"]
+        assert len(plain["seen"]) == 2
+        assert batched_total == plain_total
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,160 @@
+import ast
+from pathlib import Path
+
+import pytest
+
+from framework import tick_monitoring
+from framework.number_ast_transformer import transform_source
+from framework.number_wrapper import Number
+from framework.tick_system import (
+    get_tick,
+    reset_tick,
+    _add_ticks,
+    start_tick_profile,
+    stop_tick_profile,
+)
+
+PROJECT_DIR = Path(__file__).parent.parent.parent
+
+SOURCE = """
+def straight(a, b):
+    c = a + b
+    d = c * 2
+    x, y = (c, d)
+    return x - y
+
+
+def branchy(a, b):
+    if a > 0 and b > 0:
+        return a + b
+    n = 0
+    while n < 3 and b > -5:
+        n = n + 1
+    return [v * 2 for v in range(n)]
+
+
+def chained(a, b, c):
+    return a < b < c
+
+
+def spin(items):
+    total = 0
+    try:
+        for i in range(len(items)):
+            total = total + items[i]
+            pass
+    finally:
+        total = total * 2
+    gen = sum(v + 1 for v in items)
+    return total + gen
+
+
+def bump(box):
+    box[0] = box[0] + 1
+    return box[0]
+
+
+def wait(n):
+    box = [0]
+    while bump(box) < n:
+        pass
+    return box
+"""
+
+requires_monitoring = pytest.mark.skipif(
+    not tick_monitoring.MONITORING_AVAILABLE, reason="sys.monitoring 需要 Python 3.12+"
+)
+
+
+def _load(source, backend, filename):
+    """以白名单模块名执行变换后的代码，使 tick 正常计数"""
+    tree = transform_source(source, filename, {"batch_ticks": True, "tick_backend": backend})
+    namespace = {"__name__": "utils_pytest", "Number": Number, "_add_ticks": _add_ticks}
+    if backend == "monitoring":
+        code, _ = tick_monitoring.compile_monitored(tree, filename, "utils_pytest")
+    else:
+        code = compile(tree, filename, "exec")
+    exec(code, namespace)
+    return namespace
+
+
+def _ticks(func, *args):
+    reset_tick()
+    result = func(*args)
+    return get_tick(), result
+
+
+class TestStripTickCalls:
+    """测试剥离注入的计数"""
+
+    def test_only_pass_keeps_calls(self):
+        tree = transform_source(SOURCE, "<strip>", {"batch_ticks": True})
+        tree, records = tick_monitoring.strip_tick_calls(tree)
+        calls = [
+            node
+            for node in ast.walk(tree)
+            if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "_add_ticks"
+        ]
+        # 只剩 wait 中单独的 pass 前的一次（spin 中的已合并到前一条语句）
+        assert len(calls) == 1
+        assert records
+        compile(tree, "<strip>", "exec")
+
+
+@requires_monitoring
+class TestMonitoringBackend:
+    """测试 sys.monitoring 后端与 AST 后端的 tick 一致"""
+
+    @pytest.mark.parametrize(
+        "name,args",
+        [
+            ("straight", (1, 2)),
+            ("branchy", (1, 2)),
+            ("branchy", (-1, 2)),
+            ("branchy", (1, -2)),
+            ("chained", (1, 2, 3)),
+            ("chained", (3, 2, 1)),
+            ("spin", ([1, 2, 3],)),
+            ("wait", (5,)),
+        ],
+    )
+    def test_same_ticks_as_ast(self, name, args):
+        ast_ns = _load(SOURCE, "ast", "<ast>")
+        monitored = _load(SOURCE, "monitoring", "<monitoring>")
+        assert _ticks(monitored[name], *args) == _ticks(ast_ns[name], *args)
+
+    @pytest.mark.parametrize(
+        "name,args",
+        [
+            ("op_pass", ()),
+            ("op_add", (3, 2)),
+            ("op_floordiv", (10, 3)),
+            ("op_pow", (2, 3)),
+            ("op_and", (True, False)),
+            ("op_or", (False, True)),
+            ("op_neg", (5,)),
+            ("op_not", (True,)),
+            ("op_subscript", ([1, 2, 3], 1)),
+            ("op_pack", (1, 2)),
+            ("op_unpack", ((1, 2),)),
+            ("op_chain_call", (Number(-3),)),
+        ],
+    )
+    def test_operation_cases(self, name, args):
+        """test_arithmetic_tick.py / test_operations_tick.py 中的运算在两个后端下 tick 相同"""
+        source = (PROJECT_DIR / "utils_pytest.py").read_text(encoding="utf-8")
+        ast_ns = _load(source, "ast", "<utils_pytest-ast>")
+        monitored = _load(source, "monitoring", "<utils_pytest-monitoring>")
+        assert _ticks(monitored[name], *args) == _ticks(ast_ns[name], *args)
+
+    def test_profile_labels(self):
+        """profiling 模式下计数仍记到项目调用栈上"""
+        monitored = _load(SOURCE, "monitoring", "<monitoring-profile>")
+        start_tick_profile()
+        monitored["straight"](1, 2)
+        profile = stop_tick_profile()
+        assert profile == {("utils_pytest.straight",): _ticks(monitored["straight"], 1, 2)[0]}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
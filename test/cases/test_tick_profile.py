@@ -0,0 +1,62 @@
+from framework.tick_system import (
+    reset_tick,
+    get_tick,
+    start_tick_profile,
+    stop_tick_profile,
+    format_collapsed_stacks,
+    summarize_tick_profile,
+    format_tick_table,
+)
+
+
+class TestTickProfile:
+    """测试 tick profiling 模式"""
+
+    def teardown_method(self):
+        stop_tick_profile()
+
+    def test_profile_attributes_to_call_stack(self):
+        """tick 记到项目调用栈上，且总数与 get_tick 一致"""
+        import utils_pytest
+
+        reset_tick()
+        start_tick_profile()
+        utils_pytest.op_add(1, 2)
+        utils_pytest.op_pass()
+        profile = stop_tick_profile()
+
+        assert profile[("utils_pytest.op_add",)] == 1
+        assert profile[("utils_pytest.op_pass",)] == 1
+        assert sum(profile.values()) == get_tick()
+
+    def test_untracked_ticks_not_recorded(self):
+        """测试代码直接调用 _add_ticks 既不计数也不记录"""
+        from framework.tick_system import _add_ticks
+
+        reset_tick()
+        start_tick_profile()
+        _add_ticks(5)
+        profile = stop_tick_profile()
+
+        assert profile == {}
+        assert get_tick() == 0
+
+    def test_game_api_leaf(self):
+        """模拟器推进的 tick 记在游戏 API 叶子上"""
+        reset_tick()
+        start_tick_profile()
+        move(North)
+        profile = stop_tick_profile()
+
+        assert profile == {("game_builtins.move",): 200}
+
+    def test_collapsed_and_table(self):
+        """collapsed-stack 输出与 self/total 统计"""
+        profile = {("a.f", "b.g"): 3, ("a.f",): 2, ("a.f", "b.g", "a.f"): 1}
+
+        assert format_collapsed_stacks(profile) == "a.f 2\na.f;b.g 3\na.f;b.g;a.f 1\n"
+
+        rows = summarize_tick_profile(profile)
+        assert rows == [("a.f", 3, 6), ("b.g", 3, 4)]
+        assert "b.g" in format_tick_table(profile)
+
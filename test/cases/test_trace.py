@@ -0,0 +1,148 @@
+import random as py_random
+
+from framework.game_builtins import reset_world, set_growth_ticks, get_inventory, _world_state
+from framework.tick_system import reset_tick, get_tick
+from framework.trace import (
+    TraceRecorder,
+    TraceReplayer,
+    read_trace,
+    _Encoder,
+    _Decoder,
+    _enum_registry,
+)
+
+
+def _farm(rounds=3):
+    """在 4x4 上种混合作物并收获，结果依赖世界随机数（生长时间、伴生需求、枯死南瓜）"""
+    for _ in range(rounds):
+        for y in range(4):
+            for x in range(4):
+                _world_state["pos_x"] = x
+                _world_state["pos_y"] = y
+                if get_ground_type() != Grounds.Soil:
+                    till()
+                if can_harvest():
+                    harvest()
+                elif get_entity_type() == Entities.Dead_Pumpkin:
+                    harvest()
+                if get_entity_type() is None:
+                    plant([Entities.Pumpkin, Entities.Carrot, Entities.Sunflower][(x + y) % 3])
+                get_companion()
+                measure()
+                if random() < 0.1:
+                    do_a_flip()
+
+
+def _setup(seed):
+    reset_world(seed=seed)
+    reset_tick()
+    set_growth_ticks(Entities.Pumpkin, 1000, 6000)
+    set_growth_ticks(Entities.Carrot, 1000, 6000)
+    set_growth_ticks(Entities.Sunflower, 1000, 6000)
+
+
+class TestTraceEncoding:
+    """测试二进制值编码"""
+
+    def test_value_roundtrip(self):
+        values = [None, True, False, 0, -7, 1 << 40, 0.25, Entities.Carrot, Entities.Carrot,
+                  (3, (North, -2.5)), "f0"]
+        out = bytearray()
+        encoder = _Encoder()
+        for value in values:
+            encoder.value(out, value)
+        decoder = _Decoder(_enum_registry())
+        pos = 0
+        decoded = []
+        for _ in values:
+            value, pos = decoder.value(out, pos)
+            decoded.append(value)
+        assert decoded == values
+        assert decoded[7] is Entities.Carrot
+        assert pos == len(out)
+
+
+class TestTraceRecordReplay:
+    """测试记录与回放"""
+
+    def test_record(self, tmp_path):
+        path = tmp_path / "run.trace"
+        _setup(1)
+        with TraceRecorder(path) as recorder:
+            _farm(1)
+        events = read_trace(path)
+        assert recorder.events == len(events)
+
+        plants = [e for e in events if e["api"] == "plant"]
+        assert len(plants) == 16
+        assert plants[0]["pos"] == (0, 0)
+        assert plants[0]["args"] == (Entities.Pumpkin,)
+        assert plants[0]["result"] is True
+        # 生长时间 + 是否枯死 + 伴生需求
+        assert [d[0] for d in plants[0]["draws"]][:2] == ["randint", "random"]
+        ticks = [e["tick"] for e in events]
+        assert ticks == sorted(ticks)
+        assert ticks[-1] <= get_tick()
+        # 记录结束后恢复原来的 API 与随机数
+        assert plant.__module__ == "framework.game_builtins"
+
+    def test_replay_reproduces_world_randomness(self, tmp_path):
+        """用另一个种子回放，结果与记录时完全一致"""
+        path = tmp_path / "run.trace"
+        _setup(1)
+        with TraceRecorder(path):
+            _farm()
+        expected = (get_inventory(), get_tick())
+
+        _setup(2)
+        _farm()
+        assert (get_inventory(), get_tick()) != expected
+
+        _setup(2)
+        with TraceReplayer(path) as replayer:
+            _farm()
+        assert (get_inventory(), get_tick()) == expected
+        assert replayer.stats()["fallback"] == 0
+
+    def test_replay_other_version(self, tmp_path):
+        """不同版本的代码：在同一格做同样的事时拿到相同的随机性，其余用 fallback"""
+        path = tmp_path / "run.trace"
+        _setup(1)
+        with TraceRecorder(path):
+            _farm(1)
+        planted = {e["pos"]: e["draws"][0][2] for e in read_trace(path) if e["api"] == "plant"}
+
+        _setup(3)
+        with TraceReplayer(path) as replayer:
+            for (x, y), grow_ticks in planted.items():
+                _world_state["pos_x"] = x
+                _world_state["pos_y"] = y
+                till()
+                plant(Entities.Bush if x == 0 else [Entities.Pumpkin, Entities.Carrot, Entities.Sunflower][(x + y) % 3])
+                i = y * _world_state["world_size"] + x
+                if x != 0:
+                    assert _world_state["grow_ticks"][i] == grow_ticks
+        stats = replayer.stats()
+        assert stats["matched"] > 0
+        assert stats["fallback"] > 0
+
+    def test_reset_world_while_recording(self, tmp_path):
+        """run_layout 等会在记录中途 reset_world，新的世界随机数也要被记录"""
+        path = tmp_path / "run.trace"
+        with TraceRecorder(path):
+            _setup(1)
+            till()
+            plant(Entities.Carrot)
+        events = read_trace(path)
+        assert events[-1]["api"] == "plant"
+        assert events[-1]["draws"]
+        assert isinstance(_world_state["world_rng"], py_random.Random)
+
+    def test_append_segments(self, tmp_path):
+        path = tmp_path / "run.trace"
+        _setup(1)
+        with TraceRecorder(path):
+            till()
+        with TraceRecorder(path):
+            move(North)
+        assert [e["api"] for e in read_trace(path)] == ["till", "move"]
@@ -0,0 +1,69 @@
+import pytest
+
+from framework import transform_cache
+
+
+class TestTransformCache:
+    """测试变换结果的磁盘缓存"""
+
+    def test_code_round_trip(self, tmp_path):
+        """写入后用相同键可以读回 code object"""
+        source_path = tmp_path / "mod.py"
+        source = "x = 1 + 2\n"
+        key = transform_cache.make_key(source, 1, "opts")
+        code = compile(source, str(source_path), "exec")
+
+        assert transform_cache.load_code(source_path, key) is None
+        transform_cache.store_code(source_path, key, code)
+
+        cached = transform_cache.load_code(source_path, key)
+        ns = {}
+        exec(cached, ns)
+        assert ns["x"] == 3
+
+    def test_key_mismatch_misses(self, tmp_path):
+        """源码、版本或选项变化都会使缓存失效"""
+        source_path = tmp_path / "mod.py"
+        key = transform_cache.make_key("x = 1\n", 1)
+        transform_cache.store_code(source_path, key, compile("x = 1\n", "mod", "exec"))
+
+        assert transform_cache.load_code(source_path, transform_cache.make_key("x = 2\n", 1)) is None
+        assert transform_cache.load_code(source_path, transform_cache.make_key("x = 1\n", 2)) is None
+
+    def test_disabled_by_env(self, tmp_path, monkeypatch):
+        """TICK_TRANSFORM_CACHE=0 时不读写缓存"""
+        monkeypatch.setenv("TICK_TRANSFORM_CACHE", "0")
+        source_path = tmp_path / "mod.py"
+        key = transform_cache.make_key("x = 1\n")
+        transform_cache.store_code(source_path, key, compile("x = 1\n", "mod", "exec"))
+        assert not (tmp_path / "__pycache__").exists()
+
+    def test_symbol_index_round_trip(self, tmp_path):
+        """函数名索引按版本缓存"""
+        files = {"utils_a.py": {"stat": [1, 2], "functions": ["a"]}}
+        transform_cache.store_symbol_index(tmp_path, 1, files)
+        assert transform_cache.load_symbol_index(tmp_path, 1) == files
+        assert transform_cache.load_symbol_index(tmp_path, 2) == {}
+
+
+    def test_sources_digest_tracks_edits(self, tmp_path):
+        """变换器源码改动后哈希随之改变（缓存键不依赖手动递增的版本号）"""
+        source = tmp_path / "transformer.py"
+        source.write_text("A = 1\n", encoding="utf-8")
+        before = transform_cache.sources_digest([source])
+        assert transform_cache.sources_digest([source]) == before
+        source.write_text("A = 2\n", encoding="utf-8")
+        assert transform_cache.sources_digest([source]) != before
+
+    def test_transformer_digest_covers_framework_sources(self):
+        from framework import number_ast_transformer
+
+        names = {path.name for path in number_ast_transformer._TRANSFORMER_SOURCES}
+        assert {"number_ast_transformer.py", "tick_monitoring.py", "transform_cache.py"} <= names
+        assert number_ast_transformer.TRANSFORMER_DIGEST == transform_cache.sources_digest(
+            number_ast_transformer._TRANSFORMER_SOURCES
+        )
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
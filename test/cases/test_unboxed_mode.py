@@ -0,0 +1,106 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from framework.number_ast_transformer import transform_source
+from framework.number_wrapper import Number
+from framework.tick_system import get_tick, reset_tick, _add_ticks
+
+
+SOURCE = """
+def pick(items, r):
+    n = len(items)
+    i = (r * n) // 1
+    return items[i]
+
+
+def mid(left, right):
+    return (left + right) // 2
+
+
+def total(a, b):
+    return a * 2 + b
+"""
+
+TEST_DIR = Path(__file__).parent.parent
+
+# 在新进程中按给定模式安装模拟器并运行一个布局（变换选项是进程级的）
+SCENARIO = """
+import json, sys
+sys.path.insert(0, sys.argv[2])
+from framework.scenario import setup_simulator, make_layout, run_layout
+setup_simulator(unboxed=sys.argv[1] == "1")
+import utils_math
+layout = make_layout(pumpkin=(4, 4), sunflower=None, cactus=None, companion=None, maze=None)
+result = run_layout(layout, 100000, 4)
+# run_layout 关闭了 print 输出，直接写 stdout
+sys.stdout.write(json.dumps({"literal": type(utils_math.sign(5)).__name__, "ticks": result["ticks"],
+                             "items": result["items"], "error": result["error"]}))
+"""
+
+
+def _run_scenario(unboxed):
+    output = subprocess.run(
+        [sys.executable, "-c", SCENARIO, "1" if unboxed else "0", str(TEST_DIR)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _load(unboxed):
+    tree = transform_source(SOURCE, "<unboxed>", {"batch_ticks": True, "unboxed": unboxed})
+    namespace = {"__name__": "utils_pytest", "Number": Number, "_add_ticks": _add_ticks}
+    exec(compile(tree, "<unboxed>", "exec"), namespace)
+    return namespace
+
+
+class TestUnboxedMode:
+    """测试 unboxed 数值模式"""
+
+    def test_plain_numbers(self):
+        """字面量保持原生 int，运算结果不再是 Number"""
+        ns = _load(True)
+        result = ns["total"](3, 4)
+        assert result == 10
+        assert type(result) is int
+
+    def test_floordiv_literal_stays_indexable(self):
+        """// 的字面量操作数仍装箱，浮点 // 1 的结果可以直接作为下标"""
+        ns = _load(True)
+        assert ns["pick"](["a", "b", "c"], 0.5) == "b"
+        assert "_NUMBER_CONST_0" in ns
+        assert isinstance(ns["_NUMBER_CONST_0"], Number)
+
+    @pytest.mark.parametrize("name,args", [("pick", (["a", "b"], 0.9)), ("mid", (3, 8)), ("total", (1, 2))])
+    def test_same_results_and_ticks(self, name, args):
+        """unboxed 与装箱模式的结果和 tick 数相同"""
+        boxed = _load(False)
+        unboxed = _load(True)
+
+        reset_tick()
+        expected = boxed[name](*args)
+        expected_ticks = get_tick()
+
+        reset_tick()
+        assert unboxed[name](*args) == expected
+        assert get_tick() == expected_ticks
+
+    def test_scenario_matches_boxed(self):
+        """unboxed 模式下运行南瓜布局，tick 与产量和装箱模式相同"""
+        boxed = _run_scenario(False)
+        unboxed = _run_scenario(True)
+        assert boxed["literal"] == "Number"
+        assert unboxed["literal"] == "int"
+        assert unboxed["error"] is None
+        assert unboxed["items"].get("Pumpkin", 0) > 0
+        assert unboxed["ticks"] == boxed["ticks"]
+        assert unboxed["items"] == boxed["items"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
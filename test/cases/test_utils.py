@@ -2,6 +2,19 @@ import pytest
 from utils_point import point, point_add, point_subtract
 from utils_rect import rectangle, rectangle_area, rectangle_contains_point
 from utils_math import clamp
+from utils_route import (
+    point_get_path,
+    rect_get_hamiltonian_path,
+    rect_get_hamiltonian_route,
+    rect_get_hamiltonian_route_cached,
+    route_cache_initialize,
+    route_cache_get,
+    route_get_path,
+)
+from utils_area import area, area_get_traverse_path
+from utils_move import route_move_along, route_move_along_with_hook
+from utils_user import move_to
+from framework.game_builtins import reset_world, get_pos_x, get_pos_y
 
 
 class TestPoint:
@@ -81,5 +94,125 @@ class TestMathUtils:
         assert clamp(5, 10, 0) == 10  # 标准行为：value > max_value 时返回 max_value
 
 
+class TestRoute:
+    """测试移动路径"""
+
+    def test_point_get_path_wraps(self):
+        """32 宽的世界从第 1 列到第 30 列，越过边界只需 3 步"""
+        reset_world(world_size=32)
+        assert point_get_path((0, 1), (0, 30)) == [West, West, West]
+        assert point_get_path((30, 0), (1, 0)) == [North, North, North]
+        assert point_get_path((0, 1), (0, 30), False) == [East] * 29
+
+    def test_point_get_path_short_distance_unchanged(self):
+        reset_world(world_size=32)
+        assert point_get_path((2, 3), (5, 1)) == [North, North, North, West, West]
+
+    def test_move_to_wraps(self):
+        reset_world(world_size=32)
+        move_to(31, 31)
+        assert (get_pos_y(), get_pos_x()) == (31, 31)
+        move_to(1, 2)
+        assert (get_pos_y(), get_pos_x()) == (1, 2)
+
+
+HAMILTONIAN_MODES = [
+    "snake_x",
+    "snake_y",
+    "spiral_outward_cw",
+    "spiral_outward_ccw",
+    "spiral_inward_cw",
+    "spiral_inward_ccw",
+]
+
+
+class TestRleRoute:
+    """测试 RLE route"""
+
+    @pytest.mark.parametrize("mode", HAMILTONIAN_MODES)
+    @pytest.mark.parametrize("size", [(1, 1), (1, 5), (5, 1), (4, 7), (6, 6)])
+    def test_route_matches_path(self, mode, size):
+        """展开后与逐格路径相同"""
+        rect = (2, 3, size[0], size[1])
+        path, path_start = rect_get_hamiltonian_path(rect, (2, 3), mode)
+        route = rect_get_hamiltonian_route(rect, (2, 3), mode)
+        assert route[2] == path_start
+        assert route_get_path(route) == path
+
+    def test_snake_route_is_compact(self):
+        """32x32 蛇形只有 63 段（逐格路径 1023 步）"""
+        tag, segments, _ = rect_get_hamiltonian_route((0, 0, 32, 32), (0, 0), "snake_y")
+        assert tag == "rle"
+        assert len(segments) == 63
+        assert sum(count for _, count in segments) == 1023
+
+    @pytest.mark.parametrize("mode", HAMILTONIAN_MODES)
+    def test_route_move_along_with_hook_visits_all(self, mode):
+        rect = (2, 3, 5, 6)
+        visited = []
+        route_move_along_with_hook(rect_get_hamiltonian_route(rect, (2, 3), mode), lambda p, arg: visited.append(p))
+        assert len(visited) == 30
+        assert set(visited) == {(y, x) for y in range(2, 7) for x in range(3, 9)}
+        assert visited[-1] == (get_pos_y(), get_pos_x())
+
+    def test_route_move_along_accepts_both_forms(self):
+        rect = (2, 3, 4, 4)
+        route_move_along(rect_get_hamiltonian_route(rect, (2, 3), "snake_x"))
+        end = (get_pos_y(), get_pos_x())
+        move_to(0, 0)
+        route_move_along(rect_get_hamiltonian_path(rect, (2, 3), "snake_x"))
+        assert (get_pos_y(), get_pos_x()) == end == (5, 3)
+
+    def test_plain_route_with_three_steps(self):
+        """3 步的普通 route 不会被当成 RLE（RLE 只由开头的 "rle" 标记区分）"""
+        route = ([North, East, North], (2, 3))
+        assert route_get_path(route) == [North, East, North]
+        visited = []
+        route_move_along_with_hook(route, lambda p, arg: visited.append(p))
+        assert visited == [(2, 3), (3, 3), (3, 4), (4, 4)]
+        move_to(0, 0)
+        route_move_along(route)
+        assert (get_pos_y(), get_pos_x()) == (4, 4)
+
+
+class TestRouteCache:
+    """测试平移不变的路径缓存"""
+
+    def test_same_shape_shares_segments(self):
+        """同尺寸、同相对起点的矩形共用 segments，起点随矩形平移"""
+        a = rect_get_hamiltonian_route_cached((2, 3, 6, 6), (2, 3), "snake_y")
+        b = rect_get_hamiltonian_route_cached((20, 30, 6, 6), (20, 30), "snake_y")
+        assert a[1] is b[1]
+        assert a[2] == (2, 3)
+        assert b[2] == (20, 30)
+        assert route_cache_get()["hits"] == 1
+        assert route_cache_get()["misses"] == 1
+
+    @pytest.mark.parametrize("mode", HAMILTONIAN_MODES)
+    @pytest.mark.parametrize("start", [(4, 5), (8, 10), (6, 7)])
+    def test_matches_uncached(self, mode, start):
+        rect = (4, 5, 5, 6)
+        assert rect_get_hamiltonian_route_cached(rect, start, mode) == rect_get_hamiltonian_route(rect, start, mode)
+
+    def test_lru_eviction(self):
+        route_cache_initialize(2)
+        rect_get_hamiltonian_route_cached((0, 0, 2, 2), (0, 0), "snake_y")
+        rect_get_hamiltonian_route_cached((0, 0, 3, 3), (0, 0), "snake_y")
+        # 命中 2x2，3x3 成为最久未使用
+        rect_get_hamiltonian_route_cached((0, 0, 2, 2), (0, 0), "snake_y")
+        rect_get_hamiltonian_route_cached((0, 0, 4, 4), (0, 0), "snake_y")
+        cache = route_cache_get()
+        assert cache["order"] == [(2, 2, 0, 0, "snake_y"), (4, 4, 0, 0, "snake_y")]
+        assert set(cache["entries"]) == set(cache["order"])
+
+    def test_area_builds_routes_lazily(self):
+        """创建区域不生成路径，首次遍历时才生成"""
+        a = area(0, (10, 10, 6, 6))
+        assert len(route_cache_get()["entries"]) == 0
+        route = area_get_traverse_path(a, (15, 10))
+        assert route[2] == (15, 10)
+        assert len(route_cache_get()["entries"]) == 1
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,66 @@
+import pytest
+
+from framework.game_builtins import _world_state, get_inventory, reset_world
+from framework.tick_system import get_tick
+from framework.world_context import WorldContext
+from utils_rect_allocator import rect_allocator_instance_get
+from utils_singleton import singleton_get, singleton_initialize
+
+
+class TestWorldContext:
+    """测试世界上下文的隔离"""
+
+    def test_fixture_gives_fresh_world(self, world):
+        """每个测试有自己的世界、从 0 开始的 tick 和新的全局分配器"""
+        assert world.active
+        assert get_tick() == 0
+        assert rect_allocator_instance_get() is not None
+        assert rect_allocator_instance_get()["allocated"] == {}
+
+    def test_state_is_swapped(self):
+        move(East)
+        singleton_initialize("outer", 1)
+        outer_tick = get_tick()
+
+        with WorldContext(seed=3, world_size=8, inventory={Items.Hay: 5}) as ctx:
+            assert _world_state["pos_x"] == 0
+            assert get_world_size() == 8
+            assert get_tick() == 0
+            assert singleton_get("outer") is None
+            assert rect_allocator_instance_get() is None
+            move(North)
+            singleton_initialize("inner", 2)
+            inner_tick = get_tick()
+
+        # 退出后恢复外层的世界，内层的状态保留在 ctx 中
+        assert _world_state["pos_x"] == 1
+        assert get_world_size() == 100
+        assert get_tick() == outer_tick
+        assert singleton_get("inner") is None
+        assert singleton_get("outer") == 1
+        assert ctx.tick == inner_tick
+        assert ctx.world["pos_y"] == 1
+
+        with ctx:
+            assert get_tick() == inner_tick
+            assert get_inventory() == {Items.Hay: 5}
+            assert singleton_get("inner") == 2
+
+    def test_reset_inside_context(self):
+        """上下文中 reset_world 只影响该上下文"""
+        ctx = WorldContext()
+        with ctx:
+            reset_world(world_size=4)
+        assert get_world_size() == 100
+        assert ctx.world["world_size"] == 4
+
+    def test_no_reentry(self):
+        ctx = WorldContext()
+        with ctx:
+            with pytest.raises(RuntimeError):
+                with ctx:
+                    pass
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
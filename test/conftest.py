@@ -1,15 +1,52 @@
 """
 Pytest configuration and fixtures
+
+The simulator is set up here (not in run_tests.py) so that plain `pytest` and
+every pytest-xdist worker process get the same environment.
 """
 
+import os
+import sys
+from pathlib import Path
+
 import pytest
 
+_TEST_DIR = Path(__file__).parent
+_PROJECT_DIR = _TEST_DIR.parent
+for _path in (str(_PROJECT_DIR), str(_TEST_DIR)):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+from framework.number_ast_transformer import install_number_wrapper, NumberWrappingFinder
+
+# Transform area_, utils_, and test_ modules before anything imports them
+# (number wrapping, tick injection for pass statements and logical operators).
+# TICK_BACKEND=monitoring counts ticks through sys.monitoring instead (Python 3.12+);
+# TICK_UNBOXED=1 keeps numeric literals native instead of wrapping them in Number
+if not any(isinstance(f, NumberWrappingFinder) for f in sys.meta_path):
+    install_number_wrapper(
+        target_modules=["area_", "utils_", "cases.test_"],
+        tick_backend=os.environ.get("TICK_BACKEND", "ast"),
+        unboxed=os.environ.get("TICK_UNBOXED") == "1",
+    )
+
+from framework.game_builtins import setup_game_builtins, get_world_size
+
+setup_game_builtins()
+
+from framework.world_context import WorldContext
+from framework.tick_system import reset_tick
+from utils_rect_allocator import rect_allocator_instance_initialize
+
 
 @pytest.fixture(autouse=True)
-def reset_game_state():
+def world():
     """
-    Automatically reset game state before each test.
-    This ensures each test starts with a clean slate.
+    Run each test in a fresh world context: map, drone position, tick counter
+    and project singletons (including a new global rect allocator).
+    Nothing leaks between tests, so the suite can run under pytest-xdist.
     """
-    yield
-    # Cleanup after test if needed
+    with WorldContext() as context:
+        rect_allocator_instance_initialize(get_world_size())
+        reset_tick()
+        yield context
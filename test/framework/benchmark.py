@@ -0,0 +1,507 @@
+"""
+工具函数热点的 tick 开销基准
+
+每个基准用例在模拟器中运行一次项目函数，记录：
+- ticks: 模拟的游戏 tick（确定性，真正的生产预算）
+- wall: 宿主机耗时（多次重复取最小值）
+
+结果与 test/benchmark_baseline.json 比较，超过阈值即视为回归（见 test/benchmark.py）。
+回调函数（A* 的邻居/启发函数、排序比较函数、区域热循环的逐格读）按项目代码的规则做 AST 变换后执行，
+其 tick 开销与游戏内写法一致。
+"""
+
+import gc
+import json
+import platform
+import random as py_random
+import time
+from pathlib import Path
+
+_TEST_DIR = Path(__file__).parent.parent
+
+DEFAULT_BASELINE = _TEST_DIR / "benchmark_baseline.json"
+
+# tick 是确定性的：默认任何增长都算回归
+DEFAULT_TICK_THRESHOLD = 0.0
+# 宿主机耗时波动较大：增长超过 50% 且绝对值超过 2ms 才算回归
+DEFAULT_WALL_THRESHOLD = 0.5
+DEFAULT_WALL_SLACK = 0.002
+
+HAMILTONIAN_MODES = (
+    "snake_x",
+    "snake_y",
+    "spiral_outward_cw",
+    "spiral_outward_ccw",
+    "spiral_inward_cw",
+    "spiral_inward_ccw",
+)
+
+# 回调函数源码（以项目代码的方式变换后执行）
+_CALLBACK_SOURCE = '''
+def grid_neighbors(n, blocked):
+    def get_neighbors(node):
+        result = []
+        y, x = node
+        for dy, dx in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+            ny = y + dy
+            nx = x + dx
+            if ny >= 0 and ny < n and nx >= 0 and nx < n and (ny, nx) not in blocked:
+                result.append((ny, nx))
+        return result
+
+    return get_neighbors
+
+
+def manhattan_to(target):
+    def heuristic(node):
+        return abs(target[0] - node[0]) + abs(target[1] - node[1])
+
+    return heuristic
+
+
+def less_than(a, b):
+    return a < b
+
+
+def scan_by_index(index_map, values, points):
+    for p in points:
+        values[index_map[p]]
+'''
+
+_callbacks = {}
+
+
+def _get_callbacks():
+    """编译回调源码（模块名 benchmark_callbacks 在 tick 白名单中，tick 正常计数）"""
+    if not _callbacks:
+        from .number_ast_transformer import transform_source
+        from .number_wrapper import Number
+        from .tick_system import _add_ticks
+
+        tree = transform_source(_CALLBACK_SOURCE, "<benchmark-callbacks>")
+        namespace = {"__name__": "benchmark_callbacks", "Number": Number, "_add_ticks": _add_ticks}
+        exec(compile(tree, "<benchmark-callbacks>", "exec"), namespace)
+        _callbacks.update(namespace)
+    return _callbacks
+
+
+# ========== 用例 ==========
+# 每个用例的 setup() 准备输入（不计入测量），返回无参的 run 函数
+
+
+def _hamiltonian_case(mode, h, w):
+    def setup():
+        from utils_route import rect_get_hamiltonian_path
+
+        rect = (2, 3, h, w)
+        return lambda: rect_get_hamiltonian_path(rect, (2, 3), mode)
+
+    return setup
+
+
+def _hamiltonian_route_case(mode, h, w):
+    def setup():
+        from utils_route import rect_get_hamiltonian_route
+
+        rect = (2, 3, h, w)
+        return lambda: rect_get_hamiltonian_route(rect, (2, 3), mode)
+
+    return setup
+
+
+def _area_case(h, w):
+    """创建区域并取一次遍历 route（路径缓存已预热，同尺寸的区域）"""
+
+    def setup():
+        from utils_area import area, area_get_traverse_path
+
+        rect = (2, 3, h, w)
+        area_get_traverse_path(area(0, (40, 40, h, w)), (40, 40))
+        return lambda: area_get_traverse_path(area(1, rect), (2, 3))
+
+    return setup
+
+
+def _attr_case(n, op):
+    """n*n 区域的属性操作：init（初始化属性）/ set_all（整体重置）/ replace（按值替换）/
+    scan（逐格按点读）/ scan_index（热循环写法：取出下标映射与属性列表后逐格读）"""
+
+    def setup():
+        from utils_area import (
+            area,
+            area_init_attr,
+            area_set_all_attr,
+            area_get_attr,
+            area_set_attr_at,
+            area_get_index_map,
+            area_get_attr_list,
+            area_replace_all_attr,
+        )
+
+        a = area(0, (2, 3, n, n))
+        area_init_attr(a, "probe", False)
+        if op == "replace":
+            # 迷宫每轮的重置：隔格有墙（False），改回未知（None）
+            for i in range(0, n * n, 2):
+                area_set_attr_at(a, "probe", i, True)
+            return lambda: area_replace_all_attr(a, "probe", False, None)
+        if op == "init":
+            return lambda: area_init_attr(a, "fresh", None)
+        if op == "set_all":
+            return lambda: area_set_all_attr(a, "probe", True)
+        points = [(2 + dy, 3 + dx) for dy in range(n) for dx in range(n)]
+        if op == "scan_index":
+
+            scan_by_index = _get_callbacks()["scan_by_index"]
+            return lambda: scan_by_index(area_get_index_map(a), area_get_attr_list(a, "probe"), points)
+
+        def scan():
+            for p in points:
+                area_get_attr(a, "probe", p)
+
+        return scan
+
+    return setup
+
+
+def _vector_path_case(vec):
+    def setup():
+        from utils_route import vector_get_path
+
+        return lambda: vector_get_path(vec)
+
+    return setup
+
+
+def _point_path_case(current, target, wrap):
+    def setup():
+        from utils_route import point_get_path
+
+        return lambda: point_get_path(current, target, wrap)
+
+    return setup
+
+
+def _perfect_maze_area(n, seed):
+    """n*n 的完美迷宫区域（随机 DFS 打通墙壁），墙属性与 maze_area 相同"""
+    from framework.game_builtins import North, South, East, West
+    from utils_area import area, area_init_attr
+    from utils_maze import DIRECTIONS, maze_update_wall_pairly
+
+    a = area(1, (0, 0, n, n))
+    for d in DIRECTIONS:
+        area_init_attr(a, d, False)
+
+    steps = ((North, 1, 0), (South, -1, 0), (East, 0, 1), (West, 0, -1))
+    rng = py_random.Random(seed)
+    visited = {(0, 0)}
+    stack = [(0, 0)]
+    while stack:
+        y, x = stack[-1]
+        options = []
+        for d, dy, dx in steps:
+            p = (y + dy, x + dx)
+            if 0 <= p[0] < n and 0 <= p[1] < n and p not in visited:
+                options.append((d, p))
+        if not options:
+            stack.pop()
+            continue
+        d, p = options[rng.randrange(len(options))]
+        maze_update_wall_pairly(a, (y, x), d, True)
+        visited.add(p)
+        stack.append(p)
+    return a
+
+
+def _maze_search_case(n, use_dfs, explore_all):
+    def setup():
+        from utils_maze import maze_search
+
+        a = _perfect_maze_area(n, n)
+        return lambda: maze_search(a, 0, 0, n - 1, n - 1, False, explore_all, use_dfs)
+
+    return setup
+
+
+def _astar_case(n):
+    def setup():
+        from utils_route import route_astar_path
+
+        callbacks = _get_callbacks()
+        # 中间一堵竖墙，只在顶部留出缺口
+        blocked = set()
+        for y in range(n - 1):
+            blocked.add((y, n // 2))
+        target = (0, n - 1)
+        get_neighbors = callbacks["grid_neighbors"](n, blocked)
+        heuristic = callbacks["manhattan_to"](target)
+        return lambda: route_astar_path((0, 0), target, get_neighbors, heuristic)
+
+    return setup
+
+
+def _alloc_sizes(count, seed):
+    rng = py_random.Random(seed)
+    return [(rng.randint(2, 8), rng.randint(2, 8)) for _ in range(count)]
+
+
+def _alloc_case(world_size, count):
+    def setup():
+        from utils_rect_allocator import rect_allocator, rect_allocator_alloc
+
+        allocator = rect_allocator(world_size, world_size)
+        sizes = _alloc_sizes(count, world_size)
+
+        def run():
+            for h, w in sizes:
+                rect_allocator_alloc(allocator, h, w)
+
+        return run
+
+    return setup
+
+
+def _compact_case(world_size, count):
+    def setup():
+        from utils_rect_allocator import (
+            rect_allocator,
+            rect_allocator_alloc,
+            rect_allocator_free,
+            rect_allocator_compact,
+        )
+
+        allocator = rect_allocator(world_size, world_size)
+        ids = []
+        for h, w in _alloc_sizes(count, world_size):
+            result = rect_allocator_alloc(allocator, h, w)
+            if result is not None:
+                ids.append(result[0])
+        # 释放一半制造碎片
+        for rect_id in ids[::2]:
+            rect_allocator_free(allocator, rect_id)
+        return lambda: rect_allocator_compact(allocator)
+
+    return setup
+
+
+def _merge_case(n):
+    def setup():
+        from utils_rect_ex import rectangle_merge_all
+
+        # n*n 区域切成 2x2 小块，打乱顺序
+        rects = []
+        for y in range(0, n, 2):
+            for x in range(0, n, 2):
+                rects.append((y, x, 2, 2))
+        py_random.Random(n).shuffle(rects)
+        return lambda: rectangle_merge_all(rects)
+
+    return setup
+
+
+def _sort_case(n):
+    def setup():
+        from utils_list import list_sort_by
+
+        values = list(range(n))
+        py_random.Random(n).shuffle(values)
+        less_than = _get_callbacks()["less_than"]
+        return lambda: list_sort_by(values, less_than)
+
+    return setup
+
+
+def _build_cases():
+    cases = []
+    for mode in HAMILTONIAN_MODES:
+        for h, w in ((6, 6), (12, 16), (32, 32)):
+            cases.append(
+                ("rect_get_hamiltonian_path[%s,%dx%d]" % (mode, h, w), _hamiltonian_case(mode, h, w))
+            )
+            cases.append(
+                ("rect_get_hamiltonian_route[%s,%dx%d]" % (mode, h, w), _hamiltonian_route_case(mode, h, w))
+            )
+    for h, w in ((6, 6), (16, 16)):
+        cases.append(("area[%dx%d]" % (h, w), _area_case(h, w)))
+    for op in ("init", "set_all", "replace", "scan", "scan_index"):
+        cases.append(("area_attr[%s,16x16]" % op, _attr_case(16, op)))
+    for vec in ((7, -5), (-40, 60)):
+        cases.append(("vector_get_path[%d,%d]" % vec, _vector_path_case(vec)))
+    for wrap in (True, False):
+        cases.append(("point_get_path[wrap=%s]" % wrap, _point_path_case((5, 1), (95, 90), wrap)))
+    for n in (8, 16):
+        cases.append(("maze_search[bfs,%dx%d]" % (n, n), _maze_search_case(n, False, False)))
+        cases.append(("maze_search[dfs_all,%dx%d]" % (n, n), _maze_search_case(n, True, True)))
+    for n in (8, 16):
+        cases.append(("route_astar_path[%dx%d]" % (n, n), _astar_case(n)))
+    for world_size, count in ((16, 8), (32, 24)):
+        cases.append(
+            ("rect_allocator_alloc[%dx%d,n=%d]" % (world_size, world_size, count), _alloc_case(world_size, count))
+        )
+        cases.append(
+            ("rect_allocator_compact[%dx%d,n=%d]" % (world_size, world_size, count), _compact_case(world_size, count))
+        )
+    for n in (8, 16):
+        cases.append(("rectangle_merge_all[%dx%d]" % (n, n), _merge_case(n)))
+    for n in (10, 50, 200):
+        cases.append(("list_sort_by[n=%d]" % n, _sort_case(n)))
+    return cases
+
+
+BENCHMARK_CASES = _build_cases()
+
+
+def select_cases(pattern=None):
+    """按名称子串过滤用例"""
+    if not pattern:
+        return list(BENCHMARK_CASES)
+    return [case for case in BENCHMARK_CASES if pattern in case[0]]
+
+
+# ========== 测量 ==========
+
+
+def measure_case(setup, repeat=3):
+    """运行一个用例 repeat 次，返回 {"ticks": tick 开销, "wall": 最小耗时（秒）}
+
+    tick 开销每次必须相同，否则说明用例依赖了外部状态
+    """
+    from .tick_system import get_tick
+
+    ticks = None
+    best = None
+    for _ in range(repeat):
+        run = setup()
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            start_tick = get_tick()
+            start = time.perf_counter()
+            run()
+            wall = time.perf_counter() - start
+            spent = get_tick() - start_tick
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        if ticks is not None and spent != ticks:
+            raise RuntimeError("tick cost is not deterministic: %d != %d" % (spent, ticks))
+        ticks = spent
+        if best is None or wall < best:
+            best = wall
+    return {"ticks": ticks, "wall": best}
+
+
+def run_benchmarks(cases=None, repeat=3, progress=None):
+    """运行用例，返回 {名称: {"ticks", "wall"}}；progress(name, result) 每完成一个调用一次"""
+    if cases is None:
+        cases = BENCHMARK_CASES
+    results = {}
+    for name, setup in cases:
+        results[name] = measure_case(setup, repeat)
+        if progress is not None:
+            progress(name, results[name])
+    return results
+
+
+# ========== 基线 ==========
+
+
+def load_baseline(path=DEFAULT_BASELINE):
+    """读取基线文件，不存在时返回 None"""
+    path = Path(path)
+    if not path.exists():
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def make_baseline(results):
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cases": {name: dict(results[name]) for name in sorted(results)},
+    }
+
+
+def save_baseline(results, path=DEFAULT_BASELINE):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(make_baseline(results), f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare_results(
+    results,
+    baseline,
+    tick_threshold=DEFAULT_TICK_THRESHOLD,
+    wall_threshold=DEFAULT_WALL_THRESHOLD,
+    wall_slack=DEFAULT_WALL_SLACK,
+    check_wall=True,
+):
+    """与基线逐项比较
+
+    返回 [{"name", "ticks", "base_ticks", "wall", "base_wall", "status"}]，status 为：
+    - "ok" / "faster": 未回归 / tick 减少
+    - "new": 基线中没有该用例
+    - "tick regression": tick 超过 base * (1 + tick_threshold)
+    - "wall regression": 耗时超过 base * (1 + wall_threshold) + wall_slack
+    """
+    cases = (baseline or {}).get("cases", {})
+    rows = []
+    for name in sorted(results):
+        current = results[name]
+        base = cases.get(name)
+        row = {
+            "name": name,
+            "ticks": current["ticks"],
+            "wall": current["wall"],
+            "base_ticks": None,
+            "base_wall": None,
+        }
+        if base is None:
+            row["status"] = "new"
+        else:
+            row["base_ticks"] = base["ticks"]
+            row["base_wall"] = base["wall"]
+            if current["ticks"] > base["ticks"] * (1 + tick_threshold):
+                row["status"] = "tick regression"
+            elif check_wall and current["wall"] > base["wall"] * (1 + wall_threshold) + wall_slack:
+                row["status"] = "wall regression"
+            elif current["ticks"] < base["ticks"]:
+                row["status"] = "faster"
+            else:
+                row["status"] = "ok"
+        rows.append(row)
+    return rows
+
+
+def find_regressions(rows):
+    return [row for row in rows if row["status"].endswith("regression")]
+
+
+def _format_change(value, base):
+    if base is None:
+        return "-"
+    if base == 0:
+        return "+0.0%" if value == 0 else "+inf%"
+    return "%+.1f%%" % (100.0 * (value - base) / base)
+
+
+def format_rows(rows):
+    """格式化比较结果表格"""
+    width = max([len(row["name"]) for row in rows] + [len("case")])
+    header = "%-*s %10s %8s %10s %8s  %s" % (width, "case", "ticks", "Δticks", "wall(ms)", "Δwall", "status")
+    lines = [header, "-" * len(header)]
+    for row in rows:
+        lines.append(
+            "%-*s %10d %8s %10.3f %8s  %s"
+            % (
+                width,
+                row["name"],
+                row["ticks"],
+                _format_change(row["ticks"], row["base_ticks"]),
+                1000.0 * row["wall"],
+                _format_change(row["wall"], row["base_wall"]),
+                row["status"],
+            )
+        )
+    return "\n".join(lines)
@@ -0,0 +1,80 @@
+"""
+游戏操作开销表
+
+模拟器按开销表给游戏 API 计 tick，默认表为同目录的 game_costs.json：
+
+- operation: 变换后的代码每个运算计多少 tick（由 TickSystem 计数）
+- actions: {API 名: tick}，调用时（在生效前）推进时钟，0 表示不耗时
+- power: 有 Power 时 power.actions 中的动作提速 speedup 倍，每 actions_per_power 次消耗 1 个 Power
+- unlocks: {Unlocks 名: [等级 0 的速度倍率, 等级 1 的, ...]}，超出列表的等级取最后一项
+
+动作实际耗时 = ceil(actions[API] / (各解锁倍率之积 * 电力倍率))。
+
+自定义表可以是 .json，安装了 PyYAML 时也可以是 .yaml/.yml；只需写出要改的字段，其余取默认表。
+"""
+
+import copy
+import json
+from pathlib import Path
+
+DEFAULT_COSTS_PATH = Path(__file__).with_name("game_costs.json")
+
+_default_table = None
+
+
+def default_cost_table():
+    """默认开销表（每次返回新的副本）"""
+    global _default_table
+    if _default_table is None:
+        with open(DEFAULT_COSTS_PATH, encoding="utf-8") as f:
+            _default_table = json.load(f)
+    return copy.deepcopy(_default_table)
+
+
+def _read(path):
+    path = Path(path)
+    with open(path, encoding="utf-8") as f:
+        if path.suffix.lower() in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("读取 %s 需要 PyYAML：pip install pyyaml" % path) from None
+            return yaml.safe_load(f) or {}
+        return json.load(f)
+
+
+def merge_cost_table(overrides):
+    """把部分开销表合并到默认表上并校验，返回完整的表"""
+    table = default_cost_table()
+    for key, value in (overrides or {}).items():
+        if key not in table:
+            raise ValueError("unknown cost table key: %s" % key)
+        if isinstance(table[key], dict):
+            if not isinstance(value, dict):
+                raise ValueError("cost table key %s must be a mapping" % key)
+            table[key].update(value)
+        else:
+            table[key] = value
+
+    unknown = set(table["actions"]) - set(default_cost_table()["actions"])
+    unknown |= set(table["power"]["actions"]) - set(table["actions"])
+    if unknown:
+        raise ValueError("unknown game API in cost table: %s" % ", ".join(sorted(unknown)))
+    for name, ticks in table["actions"].items():
+        if not isinstance(ticks, int) or ticks < 0:
+            raise ValueError("cost of %s must be a non-negative integer" % name)
+    if not isinstance(table["operation"], int) or table["operation"] < 0:
+        raise ValueError("operation cost must be a non-negative integer")
+    if table["power"]["speedup"] <= 0 or table["power"]["actions_per_power"] <= 0:
+        raise ValueError("power speedup and actions_per_power must be positive")
+    for name, factors in table["unlocks"].items():
+        if not factors or any(f <= 0 for f in factors):
+            raise ValueError("speed factors of unlock %s must be positive" % name)
+    return table
+
+
+def load_cost_table(path=None):
+    """读取开销表文件（缺省为默认表），未写出的字段取默认值"""
+    if path is None:
+        return default_cost_table()
+    return merge_cost_table(_read(path))
@@ -0,0 +1,306 @@
+"""
+多无人机协作调度器
+
+游戏里每架无人机并行执行，各自消耗 tick。模拟器用线程承载每架无人机的调用栈，
+但同一时刻只让一架运行（接力棒式交接），因此结果完全确定：
+
+- 总是运行 tick 最小的无人机（相同 tick 时 id 小的优先）
+- 运行中的无人机 tick 超过其它就绪无人机的最小 tick 时让出（由 TickSystem 的让出阈值触发）
+- 切换时保存/恢复各自的坐标 (pos_x, pos_y) 与 tick，世界地图、物品栏和项目全局变量共享
+
+用法：
+    scheduler = DroneScheduler(max_drones=8)
+    scheduler.run(main_func, max_ticks=1_000_000)
+    scheduler.stats()
+"""
+
+import threading
+
+from .tick_system import TickSystem
+from . import game_builtins
+
+# 无人机状态
+READY = "ready"
+WAITING = "waiting"
+FINISHED = "finished"
+
+class SimulationStop(BaseException):
+    """预算耗尽时在各无人机线程内抛出，用于结束模拟（继承 BaseException，不会被业务代码吞掉）"""
+
+
+class _Drone:
+    """单架无人机的调度状态"""
+
+    def __init__(self, drone_id, func, tick, pos_x, pos_y, hat):
+        self.id = drone_id
+        self.func = func
+        self.tick = tick
+        self.pos_x = pos_x
+        self.pos_y = pos_y
+        self.hat = hat
+        self.state = READY
+        self.result = None
+        self.error = None
+        self.thread = None
+        self.resume = threading.Event()
+        # wait_for 的目标
+        self.waiting_for = None
+        # 统计
+        self.spawn_tick = tick
+        self.end_tick = None
+        self.idle_ticks = 0
+
+
+class DroneScheduler:
+    """确定性的多无人机调度器"""
+
+    def __init__(self, max_drones=1):
+        self.max_drones = max_drones
+        self.drones = []
+        self.current = None
+        self.max_ticks = None
+        self.stopping = False
+        self._back = threading.Event()
+
+    # ========== 对外接口 ==========
+
+    def run(self, func, max_ticks=None):
+        """以 func 作为主无人机运行，直到所有无人机结束或 tick 达到 max_ticks
+
+        返回主无人机的返回值；任一无人机抛出的异常会在这里重新抛出
+        """
+        self.max_ticks = max_ticks
+        world = game_builtins._world_state
+        main = self._add_drone(
+            func, TickSystem.get_tick(), world["pos_x"], world["pos_y"], world["hat"]
+        )
+
+        previous = world["scheduler"]
+        world["scheduler"] = self
+        try:
+            self._loop()
+        finally:
+            self._shutdown()
+            world["scheduler"] = previous
+            TickSystem.set_yield_point(None, None)
+            # 模拟结束后的时钟为最晚一架无人机的 tick，位置恢复为主无人机
+            TickSystem.set_tick(self.elapsed())
+            world["pos_x"] = main.pos_x
+            world["pos_y"] = main.pos_y
+            world["hat"] = main.hat
+
+        for drone in self.drones:
+            if drone.error is not None:
+                raise drone.error
+        return main.result
+
+    def elapsed(self):
+        """模拟经过的 tick（所有无人机的最大 tick）"""
+        return max([d.tick for d in self.drones] + [0])
+
+    def stats(self):
+        """每架无人机的统计：存活区间、空闲 tick（do_a_flip / wait_for）与利用率"""
+        result = []
+        end = self.elapsed()
+        for drone in self.drones:
+            drone_end = drone.end_tick if drone.end_tick is not None else end
+            lifetime = drone_end - drone.spawn_tick
+            busy = lifetime - drone.idle_ticks
+            result.append(
+                {
+                    "id": drone.id,
+                    "spawn_tick": drone.spawn_tick,
+                    "end_tick": drone_end,
+                    "finished": drone.state == FINISHED and drone.end_tick is not None,
+                    "busy_ticks": busy,
+                    "idle_ticks": drone.idle_ticks,
+                    "utilization": float(busy) / lifetime if lifetime > 0 else 0.0,
+                }
+            )
+        return result
+
+    def utilization(self):
+        """整体利用率：所有无人机忙碌 tick / (max_drones * 经过 tick)"""
+        end = self.elapsed()
+        if end <= 0 or self.max_drones <= 0:
+            return 0.0
+        busy = sum(s["busy_ticks"] for s in self.stats())
+        return float(busy) / (self.max_drones * end)
+
+    # ========== 游戏 API 实现（由 game_builtins 转发）==========
+
+    def spawn_drone(self, func):
+        """在当前无人机的位置生成新无人机，达到上限时返回 None"""
+        alive = [d for d in self.drones if d.state != FINISHED]
+        if len(alive) >= self.max_drones:
+            return None
+        parent = self.current
+        # 生成耗时取开销表的 actions.spawn_drone
+        game_builtins._charge("spawn_drone")
+        world = game_builtins._world_state
+        drone = self._add_drone(
+            func, TickSystem.get_tick(), world["pos_x"], world["pos_y"], world["hat"]
+        )
+        parent.tick = TickSystem.get_tick()
+        self._update_yield_point()
+        return drone.id
+
+    def has_finished(self, drone_id):
+        """目标无人机是否已经（在当前无人机的时间线上）结束"""
+        drone = self._get(drone_id)
+        if drone is None:
+            return True
+        if drone.state != FINISHED or drone.end_tick is None:
+            return False
+        return drone.end_tick <= TickSystem.get_tick()
+
+    def wait_for(self, drone_id):
+        """阻塞当前无人机直到目标结束，返回目标函数的返回值"""
+        drone = self._get(drone_id)
+        if drone is None:
+            return None
+        me = self.current
+        if drone.state != FINISHED:
+            me.state = WAITING
+            me.waiting_for = drone
+            self._yield_current()
+        end = drone.end_tick
+        now = TickSystem.get_tick()
+        if end is not None and end > now:
+            me.idle_ticks += end - now
+            TickSystem.set_tick(end)
+            me.tick = end
+            self._update_yield_point()
+        return drone.result
+
+    def stop(self):
+        """在无人机线程内调用：立即结束整个模拟（例如达到了物品预算）"""
+        self._save(self.current)
+        self.stopping = True
+        raise SimulationStop()
+
+    def num_drones(self):
+        return len([d for d in self.drones if d.state != FINISHED])
+
+    def note_idle(self, ticks):
+        """记录当前无人机的空闲 tick（do_a_flip）"""
+        if self.current is not None:
+            self.current.idle_ticks += ticks
+
+    # ========== 内部实现 ==========
+
+    def _add_drone(self, func, tick, pos_x, pos_y, hat):
+        drone = _Drone(len(self.drones), func, tick, pos_x, pos_y, hat)
+        self.drones.append(drone)
+        return drone
+
+    def _get(self, drone_id):
+        if drone_id is None or drone_id < 0 or drone_id >= len(self.drones):
+            return None
+        return self.drones[drone_id]
+
+    def _ready(self):
+        return [d for d in self.drones if d.state == READY]
+
+    def _pick(self):
+        ready = self._ready()
+        if not ready:
+            return None
+        return min(ready, key=lambda d: (d.tick, d.id))
+
+    def _loop(self):
+        while not self.stopping:
+            drone = self._pick()
+            if drone is None:
+                return
+            if self.max_ticks is not None and drone.tick >= self.max_ticks:
+                return
+            self._switch_to(drone)
+
+    def _update_yield_point(self):
+        """当前无人机的 tick 超过其它就绪无人机（或预算）时让出"""
+        me = self.current
+        limit = None
+        for drone in self.drones:
+            if drone is me or drone.state != READY:
+                continue
+            if limit is None or drone.tick < limit:
+                limit = drone.tick
+        if self.max_ticks is not None and (limit is None or self.max_ticks < limit):
+            limit = self.max_ticks
+        TickSystem.set_yield_point(limit, self._yield_current)
+
+    def _save(self, drone):
+        world = game_builtins._world_state
+        drone.tick = TickSystem.get_tick()
+        drone.pos_x = world["pos_x"]
+        drone.pos_y = world["pos_y"]
+        drone.hat = world["hat"]
+
+    def _restore(self, drone):
+        world = game_builtins._world_state
+        TickSystem.set_tick(drone.tick)
+        world["pos_x"] = drone.pos_x
+        world["pos_y"] = drone.pos_y
+        world["hat"] = drone.hat
+
+    def _switch_to(self, drone):
+        """把执行权交给 drone，直到它让出或结束"""
+        self.current = drone
+        self._restore(drone)
+        self._update_yield_point()
+        self._back.clear()
+        if drone.thread is None:
+            drone.thread = threading.Thread(
+                target=self._thread_main, args=(drone,), daemon=True
+            )
+            drone.thread.start()
+        drone.resume.set()
+        self._back.wait()
+        self.current = None
+
+    def _yield_current(self):
+        """在无人机线程内调用：保存状态并把执行权交回调度循环"""
+        drone = self.current
+        TickSystem.set_yield_point(None, None)
+        self._save(drone)
+        drone.resume.clear()
+        self._back.set()
+        drone.resume.wait()
+        if self.stopping:
+            raise SimulationStop()
+
+    def _thread_main(self, drone):
+        drone.resume.wait()
+        try:
+            if not self.stopping:
+                drone.result = drone.func()
+        except SimulationStop:
+            pass
+        except BaseException as e:
+            drone.error = e
+            self.stopping = True
+        finally:
+            TickSystem.set_yield_point(None, None)
+            if not self.stopping:
+                self._save(drone)
+                drone.end_tick = drone.tick
+            drone.state = FINISHED
+            for other in self.drones:
+                if other.state == WAITING and other.waiting_for is drone:
+                    other.state = READY
+                    other.waiting_for = None
+            self._back.set()
+
+    def _shutdown(self):
+        """结束时唤醒所有仍在运行中的无人机线程，让它们抛出 SimulationStop 退出"""
+        self.stopping = True
+        for drone in self.drones:
+            if drone.thread is None or drone.state == FINISHED:
+                continue
+            self._back.clear()
+            self.current = drone
+            drone.resume.set()
+            self._back.wait()
+            drone.thread.join()
+        self.current = None
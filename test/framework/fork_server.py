@@ -0,0 +1,138 @@
+"""
+fork-server：预热一次，每个场景 fork 一个写时复制的子进程
+
+普通的多进程扫描（multiprocessing，maxtasksperchild=1）每个场景都要付出：
+解释器启动、导入并 AST 变换全部项目模块、安装游戏内置函数。
+ForkServer 在父进程里把这些都做一次，然后每个场景 os.fork() 一个子进程：
+子进程直接从预热好的内存开始运行，结果 pickle 后经管道传回，父进程的状态不受影响。
+
+    server = ForkServer(jobs=8)
+    for result in server.imap_unordered(run_layout_job, jobs):
+        ...
+
+只在支持 os.fork 的平台（Linux / macOS）可用。
+"""
+
+import gc
+import os
+import pickle
+import select
+import signal
+import sys
+import traceback
+
+_READ_SIZE = 1 << 16
+
+
+def fork_available():
+    return hasattr(os, "fork")
+
+
+def _child_main(write_fd, func, args):
+    """子进程：运行 func(*args)，把 ("ok", 结果) 或 ("error", traceback) 写回管道"""
+    try:
+        try:
+            payload = ("ok", func(*args))
+            data = pickle.dumps(payload, pickle.HIGHEST_PROTOCOL)
+        except BaseException:
+            data = pickle.dumps(("error", traceback.format_exc()), pickle.HIGHEST_PROTOCOL)
+        view = memoryview(data)
+        while view:
+            written = os.write(write_fd, view)
+            view = view[written:]
+        os.close(write_fd)
+        sys.stdout.flush()
+        sys.stderr.flush()
+    finally:
+        # 不执行 atexit / 测试框架的清理，直接退出
+        os._exit(0)
+
+
+class ForkServer:
+    """在预热好的父进程中为每个场景 fork 子进程运行"""
+
+    def __init__(self, jobs=None, **transform_options):
+        if not fork_available():
+            raise RuntimeError("fork server needs os.fork (Linux / macOS)")
+        self.jobs = max(1, jobs or os.cpu_count() or 1)
+
+        from framework.scenario import setup_simulator
+
+        # 安装变换钩子并导入、变换全部项目模块（每个场景的世界由场景自己 reset_world）
+        setup_simulator(**transform_options)
+
+        # 把预热出的对象移出 GC 跟踪，子进程的垃圾回收不会触碰（复制）这些页
+        gc.collect()
+        if hasattr(gc, "freeze"):
+            gc.freeze()
+
+    def _spawn(self, func, args):
+        read_fd, write_fd = os.pipe()
+        # 父进程缓冲区里未写出的内容会被子进程继承并重复输出
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            _child_main(write_fd, func, args)
+        os.close(write_fd)
+        return pid, read_fd
+
+    def _finish(self, pid, job, chunks, on_error):
+        _, status = os.waitpid(pid, 0)
+        if not chunks:
+            message = "fork server child %d exited without a result (status %d)" % (pid, status)
+        else:
+            kind, value = pickle.loads(b"".join(chunks))
+            if kind == "ok":
+                return value
+            message = "scenario failed in fork server child:\n" + value
+        if on_error is None:
+            raise RuntimeError(message)
+        return on_error(job, message)
+
+    def imap_unordered(self, func, jobs, on_error=None):
+        """对每个参数元组 job 在子进程中运行 func(*job)，按完成顺序产出结果
+
+        同时最多运行 self.jobs 个子进程；func 不需要可 pickle，只有结果需要
+        on_error(job, message): 子进程失败时产出它的返回值代替结果，None 时抛出 RuntimeError
+        """
+        pending = iter(jobs)
+        running = {}  # read_fd -> (pid, job, [chunk, ...])
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(running) < self.jobs:
+                    try:
+                        job = next(pending)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    pid, read_fd = self._spawn(func, job)
+                    running[read_fd] = (pid, job, [])
+                if not running:
+                    return
+
+                ready, _, _ = select.select(list(running), [], [])
+                for read_fd in ready:
+                    chunk = os.read(read_fd, _READ_SIZE)
+                    if chunk:
+                        running[read_fd][2].append(chunk)
+                        continue
+                    os.close(read_fd)
+                    pid, job, chunks = running.pop(read_fd)
+                    yield self._finish(pid, job, chunks, on_error)
+        finally:
+            # 提前退出（异常或生成器被关闭）时回收剩余子进程
+            for read_fd, (pid, _, _) in running.items():
+                os.close(read_fd)
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except OSError:
+                    pass
+                os.waitpid(pid, 0)
+
+    def run(self, func, *args):
+        """在一个子进程中运行 func(*args) 并返回结果"""
+        for result in self.imap_unordered(func, [args]):
+            return result
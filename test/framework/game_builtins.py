@@ -1,6 +1,13 @@
+import copy
+import math
 import random as py_random
+import sys
 import builtins as python_builtins
+from array import array
+from collections import deque
 from .number_wrapper import Number
+from .costs import default_cost_table, load_cost_table, merge_cost_table
+from .tick_system import TickSystem, get_tick
 
 # Save original Python builtins before we override them
 _original_len = python_builtins.len
@@ -53,10 +60,13 @@ class Entities:
     Tree = GameEnum("Tree", "Entities")
     Carrot = GameEnum("Carrot", "Entities")
     Pumpkin = GameEnum("Pumpkin", "Entities")
+    Dead_Pumpkin = GameEnum("Dead_Pumpkin", "Entities")
     Sunflower = GameEnum("Sunflower", "Entities")
     Cactus = GameEnum("Cactus", "Entities")
     Maze = GameEnum("Maze", "Entities")
+    Hedge = GameEnum("Hedge", "Entities")
     Treasure = GameEnum("Treasure", "Entities")
+    Apple = GameEnum("Apple", "Entities")
 
 
 class Grounds:
@@ -64,58 +74,935 @@ class Grounds:
     Soil = GameEnum("Soil", "Grounds")
 
 
+class Items:
+    Hay = GameEnum("Hay", "Items")
+    Wood = GameEnum("Wood", "Items")
+    Carrot = GameEnum("Carrot", "Items")
+    Pumpkin = GameEnum("Pumpkin", "Items")
+    Power = GameEnum("Power", "Items")
+    Cactus = GameEnum("Cactus", "Items")
+    Gold = GameEnum("Gold", "Items")
+    Bone = GameEnum("Bone", "Items")
+    Weird_Substance = GameEnum("Weird_Substance", "Items")
+    Water = GameEnum("Water", "Items")
+    Fertilizer = GameEnum("Fertilizer", "Items")
+
+
+class Hats:
+    Straw_Hat = GameEnum("Straw_Hat", "Hats")
+    Dinosaur_Hat = GameEnum("Dinosaur_Hat", "Hats")
+
+
 class Unlocks:
     Sunflower = GameEnum("Sunflower", "Unlocks")
     Cactus = GameEnum("Cactus", "Unlocks")
     Companion = GameEnum("Companion", "Unlocks")
+    Polyculture = GameEnum("Polyculture", "Unlocks")
     Mazes = GameEnum("Mazes", "Unlocks")
+    Dinosaurs = GameEnum("Dinosaurs", "Unlocks")
+    Speed = GameEnum("Speed", "Unlocks")
 
 
 def get_world_size():
-    """Mock get_world_size function - returns a reasonable test world size"""
-    return 100
+    """Mock get_world_size function - returns the simulated world size (100 by default)"""
+    return _world_state["world_size"]
 
 
 def random():
     """Mock random function - returns a random float between 0 and 1"""
-    return py_random.random()
+    _spin_reset()
+    return _world_state["script_rng"].random()
 
 
 def num_unlocked(unlock_item):
-    """Mock num_unlocked function - returns 0 for testing"""
-    return 0
+    """Mock num_unlocked function - returns the level set by set_unlocked (0 by default)"""
+    return _world_state["unlocks"].get(unlock_item, 0)
+
+
+def set_unlocked(unlock_item, level):
+    """Set the unlock level reported by num_unlocked"""
+    _world_state["unlocks"][unlock_item] = level
+
+
+# Growth durations in ticks: entity -> (min_ticks, max_ticks)
+# Each planted tile draws its own duration uniformly from the range
+DEFAULT_GROWTH_TICKS = {
+    Entities.Grass: (400, 600),
+    Entities.Bush: (3200, 4800),
+    Entities.Tree: (5600, 8400),
+    Entities.Carrot: (4800, 7200),
+    Entities.Pumpkin: (1600, 2400),
+    Entities.Sunflower: (5600, 8400),
+    Entities.Cactus: (900, 1100),
+}
 
+# Entities that can only be planted on soil
+_SOIL_ONLY = {Entities.Carrot, Entities.Pumpkin, Entities.Sunflower, Entities.Cactus}
+
+# Entities that take part in polyculture (get_companion)
+_COMPANION_ENTITIES = [Entities.Grass, Entities.Bush, Entities.Tree, Entities.Carrot]
+
+# Plain yields: entity -> (item, amount)
+_SIMPLE_YIELDS = {
+    Entities.Grass: (Items.Hay, 1),
+    Entities.Bush: (Items.Wood, 1),
+    Entities.Tree: (Items.Wood, 5),
+    Entities.Carrot: (Items.Carrot, 1),
+}
+
+PUMPKIN_DEATH_CHANCE = 0.2
+COMPANION_BONUS = 5
+COMPANION_MAX_DISTANCE = 3
+SUNFLOWER_PETALS = (7, 15)
+SUNFLOWER_BONUS = 5
+SUNFLOWER_BONUS_MIN_COUNT = 10
+CACTUS_SIZES = (0, 9)
+# Each reuse of a maze (Weird_Substance on the treasure) removes this many random walls
+MAZE_WALLS_REMOVED_PER_REUSE = 1
+# A maze can be reused at most this many times before the treasure has to be harvested
+MAZE_MAX_REUSES = 300
+# Longest polling cycle (in observed API calls) the spin-wait fast-forward can detect
+SPIN_HISTORY_LIMIT = 4096
+
+# Entity codes stored in the map columns (0 means empty)
+_ENTITY_BY_CODE = [
+    None,
+    Entities.Grass,
+    Entities.Bush,
+    Entities.Tree,
+    Entities.Carrot,
+    Entities.Pumpkin,
+    Entities.Sunflower,
+    Entities.Cactus,
+    Entities.Hedge,
+    Entities.Treasure,
+    Entities.Apple,
+]
+_ENTITY_CODE = {entity: code for code, entity in enumerate(_ENTITY_BY_CODE)}
+
+_GROUND_BY_CODE = [Grounds.Grassland, Grounds.Soil]
+_GROUND_CODE = {ground: code for code, ground in enumerate(_GROUND_BY_CODE)}
+
+# measure column value meaning "no measure"
+_NO_MEASURE = -1
 
 # Position tracking and map system
 _world_state = {
     "pos_x": 0,
     "pos_y": 0,
     "world_size": 100,
-    "map": {},  # (x, y) -> {'entity': Entities.*, 'ground': Grounds.*}
+    # Map columns, tile (x, y) lives at index y * world_size + x, see _init_map()
+    "entity": bytearray(),
+    "ground": bytearray(),
+    "dead": bytearray(),
+    "planted_tick": array("q"),
+    "grow_ticks": array("q"),
+    "measure": array("h"),
+    "companion": {},  # index -> (plant_type, (x, y)), only for polyculture plants
+    "inventory": {},  # Items.* -> amount
+    "hat": Hats.Straw_Hat,
+    "growth_ticks": dict(DEFAULT_GROWTH_TICKS),
+    "sunflower_petals": {},  # petals -> number of planted sunflowers
+    "unlocks": {},  # Unlocks.* -> level
+    "world_rng": py_random.Random(),  # growth, dead pumpkins, measure, companions
+    "script_rng": py_random.Random(),  # random() called by the scripts
+    "scheduler": None,  # active DroneScheduler, see drone_scheduler.py
+    "maze": None,  # active maze, see _create_maze()
+    "dinosaur": None,  # dinosaur game while wearing Hats.Dinosaur_Hat, see _start_dinosaur()
+    "costs": None,  # compiled cost table, see set_cost_table()
+    "power_actions": 0,  # powered actions since the last Power was consumed
+    "fast_forward": True,  # skip spin-waits on growing plants, see _spin_observe()
+    "spin": {},  # drone -> polling history used by _spin_observe()
+    "fast_forwarded_ticks": 0,
 }
 
 
 def _init_map():
-    """Initialize the map with default values"""
+    """Reset the map to empty grassland (bulk allocation of zeroed columns)"""
+    n = _world_state["world_size"] * _world_state["world_size"]
+    _world_state["entity"] = bytearray(n)
+    _world_state["ground"] = bytearray(n)
+    _world_state["dead"] = bytearray(n)
+    _world_state["planted_tick"] = array("q", bytes(8 * n))
+    _world_state["grow_ticks"] = array("q", bytes(8 * n))
+    _world_state["measure"] = array("h", [_NO_MEASURE]) * n
+    _world_state["companion"] = {}
+    _world_state["sunflower_petals"] = {}
+    _world_state["maze"] = None
+    _world_state["dinosaur"] = None
+
+
+def reset_world(seed=None, world_size=100, inventory=None):
+    """Reset the whole simulated farm: map, drone position, hat, inventory and RNG.
+
+    seed makes growth durations, measure values, dead pumpkins and companions
+    reproducible; inventory is an optional {Items.*: amount} starting stock.
+    """
+    _world_state["pos_x"] = 0
+    _world_state["pos_y"] = 0
+    _world_state["world_size"] = world_size
+    _world_state["hat"] = Hats.Straw_Hat
+    _world_state["growth_ticks"] = dict(DEFAULT_GROWTH_TICKS)
+    _world_state["inventory"] = dict(inventory) if inventory else {}
+    _world_state["unlocks"] = {}
+    _world_state["world_rng"] = py_random.Random(seed)
+    _world_state["script_rng"] = py_random.Random(seed)
+    _world_state["scheduler"] = None
+    _world_state["spin"] = {}
+    _world_state["fast_forwarded_ticks"] = 0
+    set_cost_table(None)
+    _init_map()
+
+
+def set_growth_ticks(entity, min_ticks, max_ticks=None):
+    """Override the growth duration range of an entity (e.g. to speed up tests)"""
+    if max_ticks is None:
+        max_ticks = min_ticks
+    _world_state["growth_ticks"][entity] = (min_ticks, max_ticks)
+
+
+def set_cost_table(table):
+    """Charge game API calls from a cost table (see costs.py).
+
+    table is a path to a .json/.yaml file, a (partial) table dict, or None for
+    the default game_costs.json. reset_world goes back to the default table.
+    """
+    if table is None:
+        table = default_cost_table()
+    elif isinstance(table, dict):
+        table = merge_cost_table(table)
+    else:
+        table = load_cost_table(table)
+    unlocks = []
+    for name, factors in table["unlocks"].items():
+        unlock = getattr(Unlocks, name, None)
+        if not isinstance(unlock, GameEnum):
+            raise ValueError("unknown unlock in cost table: %s" % name)
+        unlocks.append((unlock, factors))
+    _world_state["costs"] = {
+        "table": table,
+        "actions": table["actions"],
+        "unlocks": unlocks,
+        "power_speedup": table["power"]["speedup"],
+        "power_actions": set(table["power"]["actions"]),
+        "actions_per_power": table["power"]["actions_per_power"],
+    }
+    _world_state["power_actions"] = 0
+    TickSystem.set_operation_ticks(table["operation"])
+
+
+def get_cost_table():
+    """Return a copy of the cost table in use"""
+    return copy.deepcopy(_world_state["costs"]["table"])
+
+
+def _powered(api):
+    """Whether api is sped up by Power right now"""
+    costs = _world_state["costs"]
+    return api in costs["power_actions"] and _world_state["inventory"].get(Items.Power, 0) > 0
+
+
+def _spend_power(actions):
+    """Account for powered actions, consuming one Power every actions_per_power of them"""
+    per_power = _world_state["costs"]["actions_per_power"]
+    spent = _world_state["power_actions"] + actions
+    _world_state["power_actions"] = spent % per_power
+    if spent >= per_power:
+        _add_item(Items.Power, -(spent // per_power))
+
+
+def _action_ticks(api):
+    """Ticks a call of api takes with the current unlocks and Power"""
+    costs = _world_state["costs"]
+    ticks = costs["actions"].get(api, 0)
+    if ticks == 0:
+        return 0
+    speed = 1
+    for unlock, factors in costs["unlocks"]:
+        level = _world_state["unlocks"].get(unlock, 0)
+        speed *= factors[_original_min(level, _original_len(factors) - 1)]
+    if _powered(api):
+        speed *= costs["power_speedup"]
+    if speed == 1:
+        return ticks
+    return int(math.ceil(ticks / speed))
+
+
+def _charge(api):
+    """Advance the clock by the cost of api (before its effect), returns the ticks charged"""
+    ticks = _action_ticks(api)
+    if ticks == 0:
+        return 0
+    if _powered(api):
+        _spend_power(1)
+    TickSystem.advance(ticks)
+    return ticks
+
+
+def get_inventory():
+    """Return a copy of the simulated inventory"""
+    return dict(_world_state["inventory"])
+
+
+def _add_item(item, amount):
+    inventory = _world_state["inventory"]
+    inventory[item] = inventory.get(item, 0) + amount
+
+
+def _tile_index(x, y):
+    """Index of tile (x, y) in the map columns"""
+    return y * _world_state["world_size"] + x
+
+
+def _current_index():
+    """Index of the tile at current position"""
+    return _world_state["pos_y"] * _world_state["world_size"] + _world_state["pos_x"]
+
+
+def _index_pos(i):
+    """(x, y) of a map column index"""
     world_size = _world_state["world_size"]
-    _world_state["map"] = {}
-    for x in range(world_size):
-        for y in range(world_size):
-            _world_state["map"][(x, y)] = {"entity": None, "ground": Grounds.Grassland}
+    return i % world_size, i // world_size
+
+
+def _neighbor_pos(x, y, direction):
+    """Position next to (x, y) in the given direction (toroidal world)"""
+    world_size = _world_state["world_size"]
+    if direction == North:
+        return x, (y + 1) % world_size
+    if direction == South:
+        return x, (y - 1) % world_size
+    if direction == East:
+        return (x + 1) % world_size, y
+    if direction == West:
+        return (x - 1) % world_size, y
+    return None
+
+
+def _get_measure(i):
+    value = _world_state["measure"][i]
+    if value == _NO_MEASURE:
+        return None
+    return value
+
+
+def _set_measure(i, value):
+    _world_state["measure"][i] = _NO_MEASURE if value is None else value
+
+
+def _raw_entity(i):
+    """Entity stored at index i, without the dead pumpkin view"""
+    return _ENTITY_BY_CODE[_world_state["entity"][i]]
+
+
+def _ready_tick(i):
+    """Tick at which the plant at index i is grown"""
+    return _world_state["planted_tick"][i] + _world_state["grow_ticks"][i]
+
+
+def _is_grown(i):
+    """Whether the plant at index i has finished growing.
+
+    Growth is never stepped tick by tick: planting fixes the tick the plant
+    will be grown at, reads only compare against it.
+    """
+    return get_tick() >= _ready_tick(i)
+
+
+def _entity_at(i):
+    """Entity currently visible at index i (grown dead pumpkins show up as Dead_Pumpkin)"""
+    entity = _ENTITY_BY_CODE[_world_state["entity"][i]]
+    if entity == Entities.Pumpkin and _world_state["dead"][i] and _is_grown(i):
+        return Entities.Dead_Pumpkin
+    return entity
+
+
+def _clear_at(i):
+    """Remove whatever grows at index i"""
+    if _world_state["entity"][i] == _ENTITY_CODE[Entities.Sunflower]:
+        petals = _world_state["sunflower_petals"]
+        value = _world_state["measure"][i]
+        petals[value] -= 1
+        if petals[value] == 0:
+            petals.pop(value)
+    _world_state["entity"][i] = 0
+    _world_state["planted_tick"][i] = 0
+    _world_state["grow_ticks"][i] = 0
+    _world_state["measure"][i] = _NO_MEASURE
+    _world_state["dead"][i] = 0
+    _world_state["companion"].pop(i, None)
+
+
+def _roll_companion(x, y, entity):
+    """Pick the (plant_type, (x, y)) a polyculture plant asks for"""
+    rng = _world_state["world_rng"]
+    world_size = _world_state["world_size"]
+    choices = [e for e in _COMPANION_ENTITIES if e != entity]
+    plant_type = choices[rng.randrange(_original_len(choices))]
+    while True:
+        dx = rng.randint(-COMPANION_MAX_DISTANCE, COMPANION_MAX_DISTANCE)
+        dy = rng.randint(-COMPANION_MAX_DISTANCE, COMPANION_MAX_DISTANCE)
+        if dx == 0 and dy == 0:
+            continue
+        if _original_abs(dx) + _original_abs(dy) > COMPANION_MAX_DISTANCE:
+            continue
+        cx = x + dx
+        cy = y + dy
+        if 0 <= cx < world_size and 0 <= cy < world_size:
+            return (plant_type, (cx, cy))
+
+
+def _plant_at(i, entity):
+    """Put a freshly planted entity at index i and roll its random properties"""
+    rng = _world_state["world_rng"]
+    min_ticks, max_ticks = _world_state["growth_ticks"][entity]
+    _world_state["entity"][i] = _ENTITY_CODE[entity]
+    _world_state["planted_tick"][i] = get_tick()
+    _world_state["grow_ticks"][i] = rng.randint(min_ticks, max_ticks)
+    _world_state["measure"][i] = _NO_MEASURE
+    _world_state["dead"][i] = 0
+    _world_state["companion"].pop(i, None)
+
+    if entity == Entities.Pumpkin:
+        _world_state["dead"][i] = rng.random() < PUMPKIN_DEATH_CHANCE
+    elif entity == Entities.Sunflower:
+        value = rng.randint(SUNFLOWER_PETALS[0], SUNFLOWER_PETALS[1])
+        _world_state["measure"][i] = value
+        petals = _world_state["sunflower_petals"]
+        petals[value] = petals.get(value, 0) + 1
+    elif entity == Entities.Cactus:
+        _world_state["measure"][i] = rng.randint(CACTUS_SIZES[0], CACTUS_SIZES[1])
+
+    if entity in _COMPANION_ENTITIES:
+        x, y = _index_pos(i)
+        _world_state["companion"][i] = _roll_companion(x, y, entity)
+
+
+def _companion_satisfied(i):
+    companion = _world_state["companion"].get(i)
+    if companion is None:
+        return False
+    plant_type, (cx, cy) = companion
+    return _entity_at(_tile_index(cx, cy)) == plant_type
+
+
+def _is_live_pumpkin(x, y):
+    i = _tile_index(x, y)
+    return (
+        _world_state["entity"][i] == _ENTITY_CODE[Entities.Pumpkin]
+        and not _world_state["dead"][i]
+        and _is_grown(i)
+    )
+
+
+def _harvest_pumpkin(x, y):
+    """Harvest the largest square of grown pumpkins that contains (x, y).
+
+    Grown pumpkins merge into giant square pumpkins; a k*k pumpkin yields
+    k*k*min(k, 6) pumpkins.
+    """
+    world_size = _world_state["world_size"]
+    best = (x, y, 1)
+    k = 2
+    while k <= world_size:
+        found = None
+        for x0 in range(_original_max(0, x - k + 1), _original_min(x, world_size - k) + 1):
+            for y0 in range(_original_max(0, y - k + 1), _original_min(y, world_size - k) + 1):
+                if all(
+                    _is_live_pumpkin(x0 + dx, y0 + dy)
+                    for dx in range(k)
+                    for dy in range(k)
+                ):
+                    found = (x0, y0, k)
+                    break
+            if found:
+                break
+        if found is None:
+            break
+        best = found
+        k += 1
+
+    x0, y0, k = best
+    for dx in range(k):
+        for dy in range(k):
+            _clear_at(_tile_index(x0 + dx, y0 + dy))
+    _add_item(Items.Pumpkin, k * k * _original_min(k, 6))
+
+
+def _cactus_in_order(i, direction, j):
+    """Whether two neighbouring cacti are sorted (north/east must not be smaller)"""
+    measures = _world_state["measure"]
+    if direction in (North, East):
+        return measures[j] >= measures[i]
+    return measures[j] <= measures[i]
+
+
+def _harvest_cactus(x, y):
+    """Harvest every grown cactus connected to (x, y) through sorted neighbours.
+
+    n cacti harvested together yield n*n cactus.
+    """
+    cactus_code = _ENTITY_CODE[Entities.Cactus]
+    entities = _world_state["entity"]
+    start = _tile_index(x, y)
+    seen = {start}
+    stack = [(x, y)]
+    while stack:
+        cx, cy = stack.pop()
+        i = _tile_index(cx, cy)
+        for direction in (North, South, East, West):
+            nx, ny = _neighbor_pos(cx, cy, direction)
+            j = _tile_index(nx, ny)
+            if j in seen:
+                continue
+            if entities[j] != cactus_code or not _is_grown(j):
+                continue
+            if not _cactus_in_order(i, direction, j):
+                continue
+            seen.add(j)
+            stack.append((nx, ny))
+
+    for i in seen:
+        _clear_at(i)
+    n = _original_len(seen)
+    _add_item(Items.Cactus, n * n)
+
+
+def _harvest_sunflower(i):
+    """Harvest a sunflower: the one with the most petals pays a bonus once enough bloom"""
+    petals = _world_state["sunflower_petals"]
+    total = sum(petals.values())
+    is_max = _world_state["measure"][i] >= _original_max(petals)
+    amount = 1
+    if is_max and total >= SUNFLOWER_BONUS_MIN_COUNT:
+        amount = SUNFLOWER_BONUS
+    _clear_at(i)
+    _add_item(Items.Power, amount)
+
+
+# ========== Mazes ==========
+# Walls of a maze cell are stored as bits, cells are indexed (y - y0) * size + (x - x0)
+_WALL_BITS = {North: 1, East: 2, South: 4, West: 8}
+_OPPOSITE = {North: South, South: North, East: West, West: East}
+_ALL_WALLS = 15
+
+
+def _maze_cell(maze, x, y):
+    """Index of (x, y) inside the maze, None when outside"""
+    dx = x - maze["x0"]
+    dy = y - maze["y0"]
+    size = maze["size"]
+    if 0 <= dx < size and 0 <= dy < size:
+        return dy * size + dx
+    return None
+
+
+def _maze_blocked(x, y, direction):
+    """Whether a maze wall (or the maze border) blocks moving from (x, y) in direction"""
+    maze = _world_state["maze"]
+    if maze is None:
+        return False
+    cell = _maze_cell(maze, x, y)
+    nx, ny = _neighbor_pos(x, y, direction)
+    target = _maze_cell(maze, nx, ny)
+    if cell is None and target is None:
+        return False
+    if cell is None or target is None:
+        return True
+    return (maze["walls"][cell] & _WALL_BITS[direction]) != 0
+
+
+def _maze_open_wall(maze, x, y, direction):
+    """Remove the wall between (x, y) and its neighbour in direction (both sides)"""
+    nx, ny = _neighbor_pos(x, y, direction)
+    walls = maze["walls"]
+    walls[_maze_cell(maze, x, y)] &= ~_WALL_BITS[direction]
+    walls[_maze_cell(maze, nx, ny)] &= ~_WALL_BITS[_OPPOSITE[direction]]
+
+
+def _maze_place_treasure(maze):
+    """Move the treasure to a random cell (different from the current one when possible)"""
+    rng = _world_state["world_rng"]
+    size = maze["size"]
+    old = maze["treasure"]
+    while True:
+        x = maze["x0"] + rng.randrange(size)
+        y = maze["y0"] + rng.randrange(size)
+        if (x, y) != old or size == 1:
+            break
+    if old is not None:
+        _world_state["entity"][_tile_index(old[0], old[1])] = _ENTITY_CODE[Entities.Hedge]
+    _world_state["entity"][_tile_index(x, y)] = _ENTITY_CODE[Entities.Treasure]
+    maze["treasure"] = (x, y)
+
+
+def _create_maze(x, y, size):
+    """Grow a size*size perfect maze (randomized DFS) around the drone standing at (x, y).
+
+    The drone ends up (size + 1) // 2 cells from the lower-left corner, like the
+    center computed by area_maze; the maze is shifted to stay inside the world.
+    """
+    world_size = _world_state["world_size"]
+    size = _original_min(size, world_size)
+    x0 = _original_min(_original_max(x - (size + 1) // 2, 0), world_size - size)
+    y0 = _original_min(_original_max(y - (size + 1) // 2, 0), world_size - size)
+    maze = {
+        "x0": x0,
+        "y0": y0,
+        "size": size,
+        "walls": bytearray([_ALL_WALLS]) * (size * size),
+        "treasure": None,
+        "reuses": 0,
+    }
+
+    rng = _world_state["world_rng"]
+    start = (x0 + rng.randrange(size), y0 + rng.randrange(size))
+    visited = {start}
+    stack = [start]
+    while stack:
+        cx, cy = stack[-1]
+        options = []
+        for direction in (North, East, South, West):
+            nx, ny = _neighbor_pos(cx, cy, direction)
+            if _maze_cell(maze, nx, ny) is not None and (nx, ny) not in visited:
+                options.append((direction, nx, ny))
+        if not options:
+            stack.pop()
+            continue
+        direction, nx, ny = options[rng.randrange(_original_len(options))]
+        _maze_open_wall(maze, cx, cy, direction)
+        visited.add((nx, ny))
+        stack.append((nx, ny))
+
+    hedge = _ENTITY_CODE[Entities.Hedge]
+    for dy in range(size):
+        for dx in range(size):
+            i = _tile_index(x0 + dx, y0 + dy)
+            _clear_at(i)
+            _world_state["entity"][i] = hedge
+    _world_state["maze"] = maze
+    _maze_place_treasure(maze)
+
+
+def _reuse_maze(maze):
+    """Relocate the treasure and knock down MAZE_WALLS_REMOVED_PER_REUSE random inner walls"""
+    rng = _world_state["world_rng"]
+    size = maze["size"]
+    candidates = []
+    for cell in range(size * size):
+        x = maze["x0"] + cell % size
+        y = maze["y0"] + cell // size
+        # 每面内墙只记一次（北墙和东墙）
+        if cell // size < size - 1 and maze["walls"][cell] & _WALL_BITS[North]:
+            candidates.append((x, y, North))
+        if cell % size < size - 1 and maze["walls"][cell] & _WALL_BITS[East]:
+            candidates.append((x, y, East))
+    for _ in range(_original_min(MAZE_WALLS_REMOVED_PER_REUSE, _original_len(candidates))):
+        x, y, direction = candidates.pop(rng.randrange(_original_len(candidates)))
+        _maze_open_wall(maze, x, y, direction)
+    maze["reuses"] += 1
+    _maze_place_treasure(maze)
+
+
+def _remove_maze():
+    """Harvesting the treasure makes the whole maze disappear"""
+    maze = _world_state["maze"]
+    for dy in range(maze["size"]):
+        for dx in range(maze["size"]):
+            _clear_at(_tile_index(maze["x0"] + dx, maze["y0"] + dy))
+    _world_state["maze"] = None
+
+
+def _harvest_treasure():
+    """Treasure pays size*size gold for every treasure found in this maze"""
+    maze = _world_state["maze"]
+    gold = maze["size"] * maze["size"] * (maze["reuses"] + 1)
+    _remove_maze()
+    _add_item(Items.Gold, gold)
+
+
+def _use_weird_substance(n):
+    """Weird_Substance on a bush grows a maze, on the treasure it reuses the maze.
+
+    The maze side is n / 2**(Mazes unlock level - 1), matching maze_area's cost.
+    Returns False when the substance cannot be used here.
+    """
+    i = _current_index()
+    entity = _raw_entity(i)
+    maze = _world_state["maze"]
+    if entity == Entities.Bush:
+        if maze is not None:
+            return False
+        level = num_unlocked(Unlocks.Mazes)
+        size = int(n * 2 ** (1 - level))
+        if size < 1:
+            return False
+        _create_maze(_world_state["pos_x"], _world_state["pos_y"], size)
+        return True
+    if entity == Entities.Treasure:
+        if maze["reuses"] >= MAZE_MAX_REUSES:
+            return False
+        _reuse_maze(maze)
+        return True
+    if entity == Entities.Hedge:
+        return False
+    return True
+
+
+# ========== Dinosaur ==========
+# While wearing Hats.Dinosaur_Hat the drone drags a tail: every move the tail follows
+# the head, leaving an apple makes the tail one tile longer.
+
+
+def _start_dinosaur():
+    """Putting the hat on spawns an apple under the drone"""
+    x = _world_state["pos_x"]
+    y = _world_state["pos_y"]
+    dino = {
+        "tail": deque(),  # tail tiles (x, y), the tail tip first
+        "cells": set(),  # same tiles as a set
+        "apple": (x, y),
+        "next_apple": None,  # rolled when first needed, see _dinosaur_next_apple()
+    }
+    i = _tile_index(x, y)
+    _clear_at(i)
+    _world_state["entity"][i] = _ENTITY_CODE[Entities.Apple]
+    _world_state["dinosaur"] = dino
+
+
+def _dinosaur_next_apple(dino, new_head=None):
+    """Position of the apple that appears once the current one is eaten (None when the farm is full)
+
+    The apple never spawns on the drone or the tail. The drone stands on the eaten apple, which
+    joins the tail on the next move; new_head is where that move lands. An apple rolled earlier
+    (measure() previews it) that collides with new_head is rolled again.
+    """
+    next_apple = dino["next_apple"]
+    if next_apple is not None and next_apple != new_head:
+        return next_apple
+    world_size = _world_state["world_size"]
+    head = (_world_state["pos_x"], _world_state["pos_y"])
+    free = world_size * world_size - _original_len(dino["cells"]) - 1
+    if new_head is not None:
+        free -= 1
+    if free <= 0:
+        dino["next_apple"] = None
+        return None
+    rng = _world_state["world_rng"]
+    while True:
+        p = (rng.randrange(world_size), rng.randrange(world_size))
+        if p != head and p != new_head and p != dino["apple"] and p not in dino["cells"]:
+            break
+    dino["next_apple"] = p
+    return p
+
+
+def _dinosaur_move(dino, direction):
+    """Move the head; fails at the farm edge and on the tail (except the tip when not growing)"""
+    x = _world_state["pos_x"]
+    y = _world_state["pos_y"]
+    nx, ny = _neighbor_pos(x, y, direction)
+    if _original_abs(nx - x) + _original_abs(ny - y) != 1:
+        return False
+
+    growing = dino["apple"] == (x, y)
+    tail = dino["tail"]
+    if (nx, ny) in dino["cells"] and (growing or (nx, ny) != tail[0]):
+        return False
+
+    if growing:
+        next_apple = _dinosaur_next_apple(dino, (nx, ny))
+        _clear_at(_tile_index(x, y))
+        dino["apple"] = next_apple
+        dino["next_apple"] = None
+        if next_apple is not None:
+            i = _tile_index(next_apple[0], next_apple[1])
+            _clear_at(i)
+            _world_state["entity"][i] = _ENTITY_CODE[Entities.Apple]
+    tail.append((x, y))
+    dino["cells"].add((x, y))
+    if not growing:
+        dino["cells"].discard(tail.popleft())
+
+    _world_state["pos_x"] = nx
+    _world_state["pos_y"] = ny
+    return True
 
 
-def _get_current_tile():
-    """Get the tile at current position"""
-    pos = (_world_state["pos_x"], _world_state["pos_y"])
-    if pos not in _world_state["map"]:
-        _world_state["map"][pos] = {"entity": None, "ground": Grounds.Grassland}
-    return _world_state["map"][pos]
+def _stop_dinosaur():
+    """Taking the hat off pays tail_length**2 bones and removes the apple"""
+    dino = _world_state["dinosaur"]
+    if dino["apple"] is not None:
+        _clear_at(_tile_index(dino["apple"][0], dino["apple"][1]))
+    tail_length = _original_len(dino["tail"])
+    _world_state["dinosaur"] = None
+    if tail_length > 0:
+        _add_item(Items.Bone, tail_length * tail_length)
+
+
+# ========== Spin-wait fast-forward ==========
+
+
+def set_fast_forward(enabled):
+    """Enable or disable the fast-forward of spin-waits (enabled by default)"""
+    _world_state["fast_forward"] = enabled
+    _world_state["spin"] = {}
+
+
+def get_fast_forwarded_ticks():
+    """Ticks skipped by the spin-wait fast-forward since reset_world"""
+    return _world_state["fast_forwarded_ticks"]
+
+
+def _spin_drone():
+    scheduler = _world_state["scheduler"]
+    if scheduler is None:
+        return None
+    return scheduler.current
+
+
+def _spin_reset():
+    """A state-changing action ends whatever the current drone was polling"""
+    spin = _world_state["spin"]
+    if spin:
+        spin.pop(_spin_drone(), None)
+
+
+def _spin_locals(frame):
+    """Summary of the caller's locals, used to tell a pure polling loop from one that counts"""
+    summary = []
+    for name, value in frame.f_locals.items():
+        if value is None or isinstance(value, (bool, int, float, str, tuple, GameEnum, Number)):
+            summary.append((name, value))
+        elif hasattr(value, "__len__"):
+            summary.append((name, type(value), _original_len(value)))
+        else:
+            summary.append((name, type(value)))
+    return summary
+
+
+def _spin_observe(key, i):
+    """Record a polling call of the current drone and fast-forward pure spin-waits.
+
+    key identifies the call (API name and arguments, position, result) and i is
+    the observed tile index (None when the call does not look at a tile). Once
+    the same sequence of calls has repeated twice with the same tick deltas,
+    the same call sites and unchanged caller locals, the drone is only waiting:
+    nothing it observes can change before the next plant in the cycle grows or
+    another drone gets to run. The clock then jumps over as many whole cycles
+    as fit before that event, charging exactly the ticks the loop would have
+    burnt. Profiling runs are never fast-forwarded so every tick keeps its stack.
+    """
+    if not _world_state["fast_forward"] or TickSystem._profile is not None:
+        return
+    frame = sys._getframe(2)
+    while frame is not None and frame.f_globals.get("__name__", "").startswith("framework."):
+        frame = frame.f_back
+    if frame is None:
+        return
+    key = (key, frame.f_code, frame.f_lineno)
+    tick = get_tick()
+
+    spin = _world_state["spin"]
+    drone = _spin_drone()
+    state = spin.get(drone)
+    if state is None or _original_len(state["keys"]) >= SPIN_HISTORY_LIMIT:
+        state = {"keys": [], "ticks": [], "tiles": [], "prev": [], "last": {}, "locals": {}}
+        spin[drone] = state
+    keys = state["keys"]
+    ticks = state["ticks"]
+    n = _original_len(keys)
+    p = state["last"].get(key)
+    keys.append(key)
+    ticks.append(tick)
+    state["tiles"].append(i)
+    state["prev"].append(p)
+    state["last"][key] = n
+    if p is None:
+        return
+    state["locals"][n] = _spin_locals(frame)
+
+    # Same call one cycle ago (p) and two cycles ago (q)
+    q = state["prev"][p]
+    period = tick - ticks[p]
+    if q is None or p - q != n - p or period <= 0 or ticks[p] - ticks[q] != period:
+        return
+    if keys[q:p] != keys[p:n] or state["locals"].get(p) != state["locals"][n]:
+        return
+    for j in _original_range(1, n - p):
+        if ticks[p + j] - ticks[q + j] != period:
+            return
+
+    # Each call of the cycle must still see the same tile when it comes round
+    # again after the skipped cycles, i.e. before that tile's plant is grown
+    cycles = None
+    for j in _original_range(p + 1, n + 1):
+        tile = state["tiles"][j]
+        if tile is None or _world_state["entity"][tile] == 0:
+            continue
+        ready = _ready_tick(tile)
+        if ready <= ticks[q]:
+            continue  # grown during both cycles already
+        next_tick = tick if j == n else ticks[j] + period
+        limit = (ready - next_tick - 1) // period
+        if cycles is None or limit < cycles:
+            cycles = limit
+    yield_at = TickSystem._yield_at
+    if cycles is None and yield_at == float("inf"):
+        return  # nothing will ever change, leave the loop to the script
+    if yield_at != float("inf"):
+        limit = int(yield_at - tick) // period
+        if cycles is None or limit < cycles:
+            cycles = limit
+    # Powered actions must not run out of Power halfway, or the cycle would slow down
+    apis = [keys[j][0][0] for j in _original_range(p, n)]
+    powered = sum(1 for api in apis if _powered(api))
+    if powered:
+        costs = _world_state["costs"]
+        left = num_items(Items.Power) * costs["actions_per_power"] - _world_state["power_actions"]
+        cycles = _original_min(cycles, left // powered)
+    if cycles <= 0:
+        return
+
+    skipped = cycles * period
+    flips = apis.count("do_a_flip")
+    scheduler = _world_state["scheduler"]
+    if flips and scheduler is not None:
+        scheduler.note_idle(cycles * flips * _action_ticks("do_a_flip"))
+    if powered:
+        _spend_power(cycles * powered)
+    TickSystem.set_tick(tick + skipped)
+    _world_state["fast_forwarded_ticks"] += skipped
+
+    # Keep the last two cycles, moved forward in time, so that the drone can
+    # fast-forward again on its next poll once the other drones have caught up
+    rebased = {"keys": keys[q:], "ticks": [], "tiles": state["tiles"][q:], "prev": [], "last": {}}
+    rebased["locals"] = {j - q: value for j, value in state["locals"].items() if j >= q}
+    for j, key in enumerate(rebased["keys"]):
+        rebased["ticks"].append(ticks[q + j] + skipped)
+        rebased["prev"].append(rebased["last"].get(key))
+        rebased["last"][key] = j
+    spin[drone] = rebased
 
 
 def move(direction):
     """Move in the specified direction, returns True on success, False on failure"""
+    if _world_state["dinosaur"] is None:
+        _spin_observe(("move", direction, _world_state["pos_x"], _world_state["pos_y"]), None)
+    else:
+        _spin_reset()
+    _charge("move")
     world_size = _world_state["world_size"]
 
+    if direction in _WALL_BITS and _maze_blocked(
+        _world_state["pos_x"], _world_state["pos_y"], direction
+    ):
+        return False
+
+    dino = _world_state["dinosaur"]
+    if dino is not None and direction in _WALL_BITS:
+        return _dinosaur_move(dino, direction)
+
     if direction == North:
         _world_state["pos_y"] = (_world_state["pos_y"] + 1) % world_size
     elif direction == South:
@@ -131,9 +1018,10 @@ def move(direction):
 
 
 def can_move(direction):
-    """Check if can move in the specified direction, always returns True for toroidal world"""
+    """Check if can move in the specified direction (the world is toroidal, only maze walls block)"""
+    _charge("can_move")
     if direction in (North, South, East, West):
-        return True
+        return not _maze_blocked(_world_state["pos_x"], _world_state["pos_y"], direction)
     return False
 
 
@@ -151,19 +1039,252 @@ def clear():
     """Move to (0, 0) and reset the entire map"""
     _world_state["pos_x"] = 0
     _world_state["pos_y"] = 0
+    _spin_reset()
     _init_map()
 
 
 def till():
     """Toggle ground type between Grassland and Soil at current position"""
-    tile = _get_current_tile()
-    if tile["ground"] == Grounds.Grassland:
-        tile["ground"] = Grounds.Soil
-    elif tile["ground"] == Grounds.Soil:
-        tile["ground"] = Grounds.Grassland
+    _spin_reset()
+    _charge("till")
+    i = _current_index()
+    _world_state["ground"][i] ^= 1
+    return True
+
+
+def get_ground_type():
+    """Get the ground type at current position"""
+    _charge("get_ground_type")
+    return _GROUND_BY_CODE[_world_state["ground"][_current_index()]]
+
+
+def get_entity_type():
+    """Get the entity at current position (None when empty)"""
+    _charge("get_entity_type")
+    i = _current_index()
+    entity = _entity_at(i)
+    _spin_observe(("get_entity_type", i, entity), i)
+    return entity
+
+
+def can_harvest():
+    """Whether the entity at current position is fully grown"""
+    _charge("can_harvest")
+    i = _current_index()
+    result = _can_harvest_at(i)
+    _spin_observe(("can_harvest", i, result), i)
+    return result
+
+
+def _can_harvest_at(i):
+    entity = _entity_at(i)
+    if entity is None or entity == Entities.Dead_Pumpkin or entity == Entities.Hedge:
+        return False
+    if entity == Entities.Treasure or entity == Entities.Apple:
+        return True
+    return _is_grown(i)
+
+
+def plant(entity):
+    """Plant entity at current position, returns False if the tile is occupied or the ground is wrong"""
+    _spin_reset()
+    _charge("plant")
+    i = _current_index()
+    if _world_state["entity"][i] != 0:
+        return False
+    if entity not in _world_state["growth_ticks"]:
+        return False
+    if entity in _SOIL_ONLY and _world_state["ground"][i] != _GROUND_CODE[Grounds.Soil]:
+        return False
+    _plant_at(i, entity)
+    return True
+
+
+def harvest():
+    """Harvest the entity at current position.
+
+    Grown plants are collected into the inventory and True is returned.
+    Anything else (growing plants, dead pumpkins) is removed and False is returned.
+    """
+    _spin_reset()
+    _charge("harvest")
+    x = _world_state["pos_x"]
+    y = _world_state["pos_y"]
+    i = _current_index()
+    entity = _entity_at(i)
+    if entity is None:
+        return False
+    if entity == Entities.Hedge:
+        return False
+
+    if not _can_harvest_at(i):
+        _clear_at(i)
+        return False
+
+    if entity == Entities.Treasure:
+        _harvest_treasure()
+    elif entity == Entities.Pumpkin:
+        _harvest_pumpkin(x, y)
+    elif entity == Entities.Cactus:
+        _harvest_cactus(x, y)
+    elif entity == Entities.Sunflower:
+        _harvest_sunflower(i)
+    elif entity in _SIMPLE_YIELDS:
+        item, amount = _SIMPLE_YIELDS[entity]
+        if _companion_satisfied(i):
+            amount *= COMPANION_BONUS
+        _clear_at(i)
+        _add_item(item, amount)
+    else:
+        _clear_at(i)
+    return True
+
+
+def measure(direction=None):
+    """Measure the entity at current position (or the neighbouring one in direction).
+
+    Sunflowers return their petal count and cacti their size. Inside a maze the
+    treasure position (x, y) is returned, on an apple the next apple's (x, y).
+    Anything else returns None.
+    """
+    _charge("measure")
+    x = _world_state["pos_x"]
+    y = _world_state["pos_y"]
+    maze = _world_state["maze"]
+    if direction is None and maze is not None and _maze_cell(maze, x, y) is not None:
+        return maze["treasure"]
+    dino = _world_state["dinosaur"]
+    if direction is None and dino is not None and dino["apple"] == (x, y):
+        return _dinosaur_next_apple(dino)
+    if direction is not None:
+        x, y = _neighbor_pos(x, y, direction)
+    return _get_measure(_tile_index(x, y))
+
+
+# Columns that move together when two tiles are swapped
+_SWAP_COLUMNS = ("entity", "planted_tick", "grow_ticks", "measure", "dead")
+
+
+def swap(direction):
+    """Swap the entity at current position with the neighbouring one in direction"""
+    _spin_reset()
+    _charge("swap")
+    x = _world_state["pos_x"]
+    y = _world_state["pos_y"]
+    nx, ny = _neighbor_pos(x, y, direction)
+    i = _tile_index(x, y)
+    j = _tile_index(nx, ny)
+    for name in _SWAP_COLUMNS:
+        column = _world_state[name]
+        column[i], column[j] = column[j], column[i]
+    companion = _world_state["companion"]
+    ci = companion.pop(i, None)
+    cj = companion.pop(j, None)
+    if cj is not None:
+        companion[i] = cj
+    if ci is not None:
+        companion[j] = ci
     return True
 
 
+def get_companion():
+    """Get the (plant_type, (x, y)) the plant at current position wants as companion"""
+    _charge("get_companion")
+    i = _current_index()
+    if _entity_at(i) not in _COMPANION_ENTITIES:
+        return None
+    return _world_state["companion"].get(i)
+
+
+def num_items(item):
+    """Get the amount of item in the inventory"""
+    return _world_state["inventory"].get(item, 0)
+
+
+def use_item(item, n=1):
+    """Consume n of item, returns False when there is not enough or it cannot be used here"""
+    _spin_reset()
+    _charge("use_item")
+    if num_items(item) < n:
+        return False
+    if item == Items.Weird_Substance and not _use_weird_substance(n):
+        return False
+    _add_item(item, -n)
+    return True
+
+
+def change_hat(hat):
+    """Put on another hat (Hats.Dinosaur_Hat starts the dinosaur game, taking it off pays bones)"""
+    _charge("change_hat")
+    _spin_reset()
+    if _world_state["dinosaur"] is not None and hat != Hats.Dinosaur_Hat:
+        _stop_dinosaur()
+    if _world_state["dinosaur"] is None and hat == Hats.Dinosaur_Hat:
+        _start_dinosaur()
+    _world_state["hat"] = hat
+
+
+def get_tick_count():
+    """Get the number of simulated ticks executed so far"""
+    _spin_reset()
+    return get_tick()
+
+
+def do_a_flip():
+    """Do a flip (its ticks are counted as idle time of the drone)"""
+    _spin_observe(("do_a_flip",), None)
+    ticks = _charge("do_a_flip")
+    scheduler = _world_state["scheduler"]
+    if scheduler is not None:
+        scheduler.note_idle(ticks)
+
+
+def spawn_drone(function):
+    """Spawn a drone at the current position running function().
+
+    Returns the drone handle, or None when the drone cap is reached
+    or no DroneScheduler is running.
+    """
+    _spin_reset()
+    scheduler = _world_state["scheduler"]
+    if scheduler is None:
+        return None
+    return scheduler.spawn_drone(function)
+
+
+def has_finished(drone):
+    """Whether the drone has finished its function"""
+    scheduler = _world_state["scheduler"]
+    if scheduler is None:
+        return True
+    return scheduler.has_finished(drone)
+
+
+def wait_for(drone):
+    """Wait until the drone has finished and return the result of its function"""
+    _spin_reset()
+    scheduler = _world_state["scheduler"]
+    if scheduler is None:
+        return None
+    return scheduler.wait_for(drone)
+
+
+def max_drones():
+    """Maximum number of drones that can exist at the same time (including this one)"""
+    scheduler = _world_state["scheduler"]
+    if scheduler is None:
+        return 1
+    return scheduler.max_drones
+
+
+def num_drones():
+    """Number of drones currently alive (including this one)"""
+    scheduler = _world_state["scheduler"]
+    if scheduler is None:
+        return 1
+    return scheduler.num_drones()
+
+
 # Game-style builtin functions that override Python defaults
 def len(c):
     """Game version of len() - returns length of collection"""
@@ -193,14 +1314,25 @@ def remove(c, item):
         raise TypeError(f"'{type(c).__name__}' object has no method 'remove'")
 
 
+# Console output of the game print functions, can be muted for long simulations
+_output = {"enabled": True}
+
+
+def set_output_enabled(enabled):
+    """Enable or mute the output of print() / quick_print() called by the scripts"""
+    _output["enabled"] = enabled
+
+
 def print(*args, **kwargs):
     """Game version of print() - prints to console"""
-    _original_print(*args, **kwargs)
+    if _output["enabled"]:
+        _original_print(*args, **kwargs)
 
 
 def quick_print(*args, **kwargs):
     """Game version of quick_print() - alias for print"""
-    _original_print(*args, **kwargs)
+    if _output["enabled"]:
+        _original_print(*args, **kwargs)
 
 
 def abs(x):
@@ -221,8 +1353,10 @@ def min(*args, **kwargs):
 def setup_game_builtins():
     """Setup all game built-in constants and functions into Python builtins"""
     # Initialize map on first setup
-    if not _world_state["map"]:
+    if not _world_state["entity"]:
         _init_map()
+    if _world_state["costs"] is None:
+        set_cost_table(None)
 
     python_builtins.North = North
     python_builtins.South = South
@@ -233,6 +1367,8 @@ def setup_game_builtins():
     python_builtins.get_world_size = get_world_size
     python_builtins.random = random
     python_builtins.Unlocks = Unlocks
+    python_builtins.Items = Items
+    python_builtins.Hats = Hats
     python_builtins.num_unlocked = num_unlocked
 
     # Movement and position functions
@@ -243,6 +1379,28 @@ def setup_game_builtins():
     python_builtins.clear = clear
     python_builtins.till = till
 
+    # Farming, inventory and misc game functions
+    python_builtins.get_ground_type = get_ground_type
+    python_builtins.get_entity_type = get_entity_type
+    python_builtins.can_harvest = can_harvest
+    python_builtins.plant = plant
+    python_builtins.harvest = harvest
+    python_builtins.measure = measure
+    python_builtins.swap = swap
+    python_builtins.get_companion = get_companion
+    python_builtins.num_items = num_items
+    python_builtins.use_item = use_item
+    python_builtins.change_hat = change_hat
+    python_builtins.get_tick_count = get_tick_count
+    python_builtins.do_a_flip = do_a_flip
+
+    # Multi-drone functions (backed by DroneScheduler)
+    python_builtins.spawn_drone = spawn_drone
+    python_builtins.has_finished = has_finished
+    python_builtins.wait_for = wait_for
+    python_builtins.max_drones = max_drones
+    python_builtins.num_drones = num_drones
+
     # Number wrapper for AST transformation
     python_builtins.Number = Number
 
@@ -6,8 +6,23 @@ from importlib.abc import Loader, MetaPathFinder
 from types import ModuleType
 from pathlib import Path
 
+try:
+    from . import transform_cache
+    from . import tick_monitoring
+except ImportError:
+    import transform_cache
+    import tick_monitoring
+
 _PROJECT_DIR = Path(__file__).parent.parent.parent
 
+# 变换器源码的哈希：修改变换器（或 tick_monitoring 的剥离规则）后磁盘缓存自动失效
+_TRANSFORMER_SOURCES = [
+    Path(__file__),
+    Path(tick_monitoring.__file__),
+    Path(transform_cache.__file__),
+]
+TRANSFORMER_DIGEST = transform_cache.sources_digest(_TRANSFORMER_SOURCES)
+
 # 调试输出控制
 _DEBUG_ENABLED = False
 
@@ -30,6 +45,9 @@ def _collect_project_symbols():
 
     function_names = set()
     module_names = set()
+    # 按文件缓存函数名，文件未改动时跳过 parse
+    cached_files = transform_cache.load_symbol_index(_PROJECT_DIR, TRANSFORMER_DIGEST)
+    files = {}
     for file in _PROJECT_DIR.glob("*.py"):
         if not file.is_file():
             continue
@@ -44,17 +62,29 @@ def _collect_project_symbols():
             continue
 
         try:
-            source = file.read_text(encoding="utf-8")
-            tree = ast.parse(source, str(file))
-            for node in tree.body:
-                if isinstance(node, ast.FunctionDef) and not node.name.startswith("_"):
-                    function_names.add(node.name)
+            stat = transform_cache.file_stat_key(file)
+            entry = cached_files.get(file.name)
+            if entry is None or entry["stat"] != stat:
+                source = file.read_text(encoding="utf-8")
+                tree = ast.parse(source, str(file))
+                names = []
+                for node in tree.body:
+                    if isinstance(node, ast.FunctionDef) and not node.name.startswith("_"):
+                        names.append(node.name)
+                entry = {"stat": stat, "functions": sorted(names)}
+            files[file.name] = entry
+            function_names.update(entry["functions"])
         except Exception:
             continue
+
+    if files != cached_files:
+        transform_cache.store_symbol_index(_PROJECT_DIR, TRANSFORMER_DIGEST, files)
     return function_names, module_names
 
 
 _PROJECT_FUNCTION_NAMES, _PROJECT_MODULE_NAMES = _collect_project_symbols()
+# 函数名索引参与缓存键：项目里增删公开函数会改变调用处的 tick 注入
+_PROJECT_SYMBOLS_DIGEST = tuple(sorted(_PROJECT_FUNCTION_NAMES))
 
 
 class SyntaxSugarTransformer(ast.NodeTransformer):
@@ -74,10 +104,15 @@ class SyntaxSugarTransformer(ast.NodeTransformer):
     注意：tick 计数统一由 AST 转换器处理，而不是由 Number 类的运算符重载处理
     """
 
-    def __init__(self, function_names, module_names):
+    def __init__(self, function_names, module_names, unboxed=False):
         super().__init__()
         self.function_names = function_names
         self.module_names = module_names
+        # unboxed 模式：数值字面量保持原生 int/float，不再包装为 Number
+        # 仅 // 的字面量操作数仍需装箱（见 visit_BinOp），提升为模块级常量
+        self.unboxed = unboxed
+        # {(类型名, 值): 常量名}
+        self.boxed_constants = {}
         self.bool_ops = {ast.And, ast.Or}
         # 需要注入 tick 的二元运算符
         self.bin_ops = {
@@ -94,6 +129,8 @@ class SyntaxSugarTransformer(ast.NodeTransformer):
 
     def visit_Constant(self, node):
         """将数值常量包装为 Number 类型"""
+        if self.unboxed:
+            return node
         if isinstance(node.value, (int, float)):
             _debug_print(f"[DEBUG TRANSFORMER] Wrapping constant: {node.value}")
             return ast.Call(
@@ -103,6 +140,8 @@ class SyntaxSugarTransformer(ast.NodeTransformer):
 
     def visit_Num(self, node):
         """将数值字面量包装为 Number 类型（兼容旧版本Python）"""
+        if self.unboxed:
+            return node
         return ast.Call(
             func=ast.Name(id="Number", ctx=ast.Load()), args=[node], keywords=[]
         )
@@ -211,11 +250,69 @@ class SyntaxSugarTransformer(ast.NodeTransformer):
         )
         return [tick_call, node]
 
+    def _boxed_constant(self, node):
+        """把数值字面量替换为模块级的 Number 常量引用"""
+        key = (type(node.value).__name__, node.value)
+        if key not in self.boxed_constants:
+            self.boxed_constants[key] = "_NUMBER_CONST_%d" % len(self.boxed_constants)
+        name = ast.Name(id=self.boxed_constants[key], ctx=ast.Load())
+        return ast.copy_location(name, node)
+
+    def _is_number_literal(self, node):
+        return (
+            isinstance(node, ast.Constant)
+            and isinstance(node.value, (int, float))
+            and not isinstance(node.value, bool)
+        )
+
+    def hoist_boxed_constants(self, tree):
+        """在模块开头（docstring 与 __future__ 导入之后）定义装箱常量"""
+        if not self.boxed_constants:
+            return tree
+        index = 0
+        body = tree.body
+        if (
+            body
+            and isinstance(body[0], ast.Expr)
+            and isinstance(body[0].value, ast.Constant)
+            and isinstance(body[0].value.value, str)
+        ):
+            index = 1
+        while (
+            index < len(body)
+            and isinstance(body[index], ast.ImportFrom)
+            and body[index].module == "__future__"
+        ):
+            index += 1
+
+        assigns = []
+        for (_, value), name in self.boxed_constants.items():
+            assigns.append(
+                ast.Assign(
+                    targets=[ast.Name(id=name, ctx=ast.Store())],
+                    value=ast.Call(
+                        func=ast.Name(id="Number", ctx=ast.Load()),
+                        args=[ast.Constant(value=value)],
+                        keywords=[],
+                    ),
+                )
+            )
+        tree.body = body[:index] + assigns + body[index:]
+        return tree
+
     def visit_BinOp(self, node):
         """为二元算术运算符注入 tick 计数"""
         # 先递归处理子节点
         self.generic_visit(node)
 
+        # unboxed 模式下，// 的字面量操作数仍然装箱：
+        # (random() * n) // 1 这类写法依赖结果可以直接作为下标（Number.__index__）
+        if self.unboxed and isinstance(node.op, ast.FloorDiv):
+            if self._is_number_literal(node.left):
+                node.left = self._boxed_constant(node.left)
+            if self._is_number_literal(node.right):
+                node.right = self._boxed_constant(node.right)
+
         # 检查是否是需要计数的二元运算符
         if type(node.op) in self.bin_ops:
             _debug_print(
@@ -357,9 +454,292 @@ class SyntaxSugarTransformer(ast.NodeTransformer):
         return node
 
 
+def _is_tick_call(node):
+    """是否为注入的 _add_ticks(n) 调用"""
+    return (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Name)
+        and node.func.id == "_add_ticks"
+        and len(node.args) == 1
+        and isinstance(node.args[0], ast.Constant)
+    )
+
+
+def _tick_wrapper_parts(node):
+    """若 node 为 (_add_ticks(n), expr)[-1] 包装，返回 (n, expr)，否则返回 None"""
+    if not isinstance(node, ast.Subscript) or not isinstance(node.value, ast.Tuple):
+        return None
+    elts = node.value.elts
+    if len(elts) != 2 or not _is_tick_call(elts[0]):
+        return None
+    return elts[0].args[0].value, elts[1]
+
+
+def _make_tick_stmt(amount, location):
+    stmt = ast.Expr(
+        value=ast.Call(
+            func=ast.Name(id="_add_ticks", ctx=ast.Load()),
+            args=[ast.Constant(value=amount)],
+            keywords=[],
+        )
+    )
+    ast.copy_location(stmt, location)
+    return ast.fix_missing_locations(stmt)
+
+
+def _is_side_call(node):
+    """是否为除 Number(...) / _add_ticks(...) 以外的调用（可能读取 tick 或切换无人机）"""
+    if not isinstance(node, ast.Call):
+        return False
+    func = node.func
+    return not (isinstance(func, ast.Name) and func.id in ("Number", "_add_ticks"))
+
+
+def _has_side_calls(node):
+    """是否含有除 Number(...) / _add_ticks(...) 以外的调用"""
+    return any(_is_side_call(child) for child in ast.walk(node))
+
+
+class _TickHoister(ast.NodeTransformer):
+    """按求值顺序剥掉一条语句中必定执行、且在第一个调用之前求值的 tick 包装，累加其静态开销
+
+    - 短路、条件分支、lambda 和推导式内部的包装执行次数不确定，原样保留
+    - 遇到调用后（调用的函数与参数仍在调用前求值），之后求值的包装原样保留：
+      被调用方读到的 tick 与不合并时一致
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.cost = 0
+        # 已经过了一个调用：之后求值的包装不能提前计数
+        self.blocked = False
+
+    def visit(self, node):
+        if self.blocked:
+            return node
+        return super().visit(node)
+
+    def _block_if_calls(self, nodes):
+        # 未展开的子表达式（短路分支等）里有调用时，之后的包装都可能在调用之后求值
+        for node in nodes:
+            if node is not None and _has_side_calls(node):
+                self.blocked = True
+
+    def visit_Subscript(self, node):
+        parts = _tick_wrapper_parts(node)
+        if parts is None:
+            return self.generic_visit(node)
+        amount, expr = parts
+        self.cost += amount
+        return self.visit(expr)
+
+    def visit_Call(self, node):
+        node = self.generic_visit(node)
+        if _is_side_call(node):
+            self.blocked = True
+        return node
+
+    def visit_BoolOp(self, node):
+        # 只有第一个操作数一定会求值
+        node.values[0] = self.visit(node.values[0])
+        self._block_if_calls(node.values[1:])
+        return node
+
+    def visit_Compare(self, node):
+        # 链式比较 a < b < c 中，b 之后的比较可能被短路
+        node.left = self.visit(node.left)
+        node.comparators[0] = self.visit(node.comparators[0])
+        self._block_if_calls(node.comparators[1:])
+        return node
+
+    def visit_IfExp(self, node):
+        node.test = self.visit(node.test)
+        self._block_if_calls([node.body, node.orelse])
+        return node
+
+    def visit_Lambda(self, node):
+        return node
+
+    def _visit_comprehension(self, node):
+        # 只有第一个 for 的可迭代对象求值一次
+        first = node.generators[0]
+        first.iter = self.visit(first.iter)
+        self._block_if_calls([node])
+        return node
+
+    visit_ListComp = _visit_comprehension
+    visit_SetComp = _visit_comprehension
+    visit_DictComp = _visit_comprehension
+    visit_GeneratorExp = _visit_comprehension
+
+
+class TickBatchingTransformer:
+    """把 SyntaxSugarTransformer 注入的逐表达式 tick 合并为按语句/基本块的 _add_ticks(n)
+
+    - 每条语句中必定执行、且在语句中第一个调用之前求值的 (_add_ticks(1), expr)[-1] 包装被剥掉，
+      开销累加后在语句前统一计数；调用之后求值的包装原样保留
+    - 连续的、不含调用的简单语句合并为一次 _add_ticks(n)；
+      遇到调用、复合语句或跳转语句后另起一段，保证调用时观察到的 tick 与逐个计数一致
+    - while 条件、短路/条件分支、lambda 和推导式内部仍保留逐表达式计数
+
+    总 tick 数与不合并时完全相同
+    """
+
+    # 语句中在语句开始时求值一次的表达式字段
+    _SIMPLE_STMTS = (
+        ast.Expr,
+        ast.Assign,
+        ast.AugAssign,
+        ast.AnnAssign,
+        ast.Return,
+        ast.Delete,
+        ast.Raise,
+    )
+    _JUMP_STMTS = (ast.Return, ast.Raise, ast.Break, ast.Continue)
+
+    def visit(self, tree):
+        tree.body = self._batch_block(tree.body)
+        return tree
+
+    def _hoist(self, field_owner, field):
+        """剥掉 field_owner.field（表达式或表达式列表）中必定执行的包装，返回开销"""
+        value = getattr(field_owner, field, None)
+        if not isinstance(value, (ast.AST, list)):
+            return 0
+        hoister = _TickHoister()
+        if isinstance(value, list):
+            setattr(
+                field_owner,
+                field,
+                [hoister.visit(v) if v is not None else None for v in value],
+            )
+        else:
+            setattr(field_owner, field, hoister.visit(value))
+        return hoister.cost
+
+    def _statement_cost(self, stmt):
+        """剥离语句头部的 tick 包装并返回其静态开销，同时递归处理子语句块"""
+        if isinstance(stmt, ast.Expr) and _is_tick_call(stmt.value):
+            return None  # 独立的 _add_ticks(n) 语句，由调用方合并
+
+        cost = 0
+        if isinstance(stmt, (ast.Assign, ast.AnnAssign)):
+            # 先求值右侧，再求值赋值目标；右侧有调用时目标中的包装不提前
+            hoister = _TickHoister()
+            stmt.value = hoister.visit(stmt.value) if stmt.value is not None else None
+            if isinstance(stmt, ast.Assign):
+                stmt.targets = [hoister.visit(target) for target in stmt.targets]
+            else:
+                stmt.target = hoister.visit(stmt.target)
+            cost += hoister.cost
+        elif isinstance(stmt, self._SIMPLE_STMTS):
+            hoister = _TickHoister()
+            for field in stmt._fields:
+                value = getattr(stmt, field, None)
+                if isinstance(value, list):
+                    setattr(stmt, field, [hoister.visit(v) if v is not None else None for v in value])
+                elif isinstance(value, ast.AST):
+                    setattr(stmt, field, hoister.visit(value))
+            cost += hoister.cost
+        elif isinstance(stmt, ast.Assert):
+            cost += self._hoist(stmt, "test")
+        elif isinstance(stmt, ast.If):
+            cost += self._hoist(stmt, "test")
+        elif isinstance(stmt, (ast.For, ast.AsyncFor)):
+            cost += self._hoist(stmt, "iter")
+        elif isinstance(stmt, (ast.With, ast.AsyncWith)):
+            for item in stmt.items:
+                cost += self._hoist(item, "context_expr")
+        elif isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            cost += self._hoist(stmt, "decorator_list")
+            cost += self._hoist(stmt.args, "defaults")
+            cost += self._hoist(stmt.args, "kw_defaults")
+        elif isinstance(stmt, ast.ClassDef):
+            cost += self._hoist(stmt, "decorator_list")
+            cost += self._hoist(stmt, "bases")
+        elif hasattr(ast, "Match") and isinstance(stmt, ast.Match):
+            cost += self._hoist(stmt, "subject")
+
+        # 子语句块各自独立合并
+        for field in ("body", "orelse", "finalbody"):
+            block = getattr(stmt, field, None)
+            if isinstance(block, list) and block and isinstance(block[0], ast.stmt):
+                setattr(stmt, field, self._batch_block(block))
+        for handler in getattr(stmt, "handlers", []):
+            handler.body = self._batch_block(handler.body)
+        for case in getattr(stmt, "cases", []):
+            case.body = self._batch_block(case.body)
+        return cost
+
+    def _batch_block(self, stmts):
+        result = []
+        # 当前可合并的 _add_ticks(n) 语句；None 表示下一段开销需要新建计数语句
+        anchor = None
+        for stmt in stmts:
+            had_calls = _has_side_calls(stmt)
+            cost = self._statement_cost(stmt)
+
+            if cost is None:
+                # 已有的独立 _add_ticks(n)（pass、解包赋值注入的）
+                amount = stmt.value.args[0].value
+                if anchor is not None:
+                    anchor.value.args[0].value += amount
+                    continue
+                anchor = stmt
+                result.append(stmt)
+                continue
+
+            if cost:
+                if anchor is not None:
+                    anchor.value.args[0].value += cost
+                else:
+                    anchor = _make_tick_stmt(cost, stmt)
+                    result.append(anchor)
+            result.append(stmt)
+
+            # 调用、复合语句和跳转之后，后续开销不能再提前到此处之前计数
+            if had_calls or not isinstance(stmt, self._SIMPLE_STMTS + (ast.Pass,)):
+                anchor = None
+            elif isinstance(stmt, self._JUMP_STMTS):
+                anchor = None
+        return result
+
+
+# 默认变换选项
+# batch_ticks: 按语句/基本块合并 tick 计数（TickBatchingTransformer）
+# unboxed: 数值字面量保持原生 int/float，省去每步运算的 Number 分配
+# tick_backend: "ast" 注入 _add_ticks 调用；"monitoring" 用 sys.monitoring 计数（见 tick_monitoring.py）
+DEFAULT_TRANSFORM_OPTIONS = {
+    "batch_ticks": True,
+    "unboxed": False,
+    "tick_backend": "ast",
+}
+
+
+def transform_source(source, filename="<string>", options=None):
+    """对源码做完整的 AST 变换，返回变换后的 ast.Module"""
+    if options is None:
+        options = DEFAULT_TRANSFORM_OPTIONS
+    tree = ast.parse(source, filename)
+    transformer = SyntaxSugarTransformer(
+        _PROJECT_FUNCTION_NAMES,
+        _PROJECT_MODULE_NAMES,
+        unboxed=options.get("unboxed", False),
+    )
+    tree = transformer.visit(tree)
+    tree = transformer.hoist_boxed_constants(tree)
+    if options.get("batch_ticks"):
+        tree = TickBatchingTransformer().visit(tree)
+    ast.fix_missing_locations(tree)
+    return tree
+
+
 class NumberWrappingLoader(Loader):
-    def __init__(self, original_loader):
+    def __init__(self, original_loader, options=None):
         self.original_loader = original_loader
+        if options is None:
+            options = DEFAULT_TRANSFORM_OPTIONS
+        self.options = options
 
     def exec_module(self, module):
         try:
@@ -371,13 +751,6 @@ class NumberWrappingLoader(Loader):
             return self.original_loader.exec_module(module)
 
         try:
-            tree = ast.parse(source, module.__file__)
-            transformer = SyntaxSugarTransformer(
-                _PROJECT_FUNCTION_NAMES, _PROJECT_MODULE_NAMES
-            )
-            transformed_tree = transformer.visit(tree)
-            ast.fix_missing_locations(transformed_tree)
-
             # Inject Number class and _add_ticks into module namespace
             # Use lazy import to avoid circular dependency issues
             if "Number" not in module.__dict__:
@@ -398,7 +771,7 @@ class NumberWrappingLoader(Loader):
                     # If tick_system is not available, skip injection
                     pass
 
-            code = compile(transformed_tree, module.__file__, "exec")
+            code = self._get_code(source, module.__file__, module.__name__)
             exec(code, module.__dict__)
         except Exception:
             import traceback
@@ -406,13 +779,45 @@ class NumberWrappingLoader(Loader):
             traceback.print_exc()
             return self.original_loader.exec_module(module)
 
+    def _get_code(self, source, filename, module_name=None):
+        """取变换后的 code object，优先读磁盘缓存"""
+        key = transform_cache.make_key(
+            source,
+            TRANSFORMER_DIGEST,
+            filename,
+            sorted(self.options.items()),
+            _PROJECT_SYMBOLS_DIGEST,
+        )
+        monitored = self.options.get("tick_backend", "ast") == "monitoring"
+        cached = transform_cache.load_code(filename, key)
+        if cached is not None:
+            _debug_print(f"[DEBUG LOADER] Cache hit: {filename}")
+            if monitored:
+                # 缓存内容为 (code, 各 code object 的 {偏移: tick})
+                code, tables = cached
+                tick_monitoring.register_code(code, tables, module_name)
+                return code
+            return cached
+
+        transformed_tree = transform_source(source, filename, self.options)
+        if monitored:
+            code, tables = tick_monitoring.compile_monitored(
+                transformed_tree, filename, module_name
+            )
+            transform_cache.store_code(filename, key, (code, tables))
+            return code
+        code = compile(transformed_tree, filename, "exec")
+        transform_cache.store_code(filename, key, code)
+        return code
+
     def create_module(self, spec):
         return None
 
 
 class NumberWrappingFinder(MetaPathFinder):
-    def __init__(self, target_modules):
+    def __init__(self, target_modules, options=None):
         self.target_modules = target_modules
+        self.options = options
 
     def find_spec(self, fullname, path, target=None):
         _debug_print(f"[DEBUG FINDER] find_spec called for: {fullname}")
@@ -425,6 +830,7 @@ class NumberWrappingFinder(MetaPathFinder):
             "number_ast_transformer",
             "framework.number_wrapper",
             "framework.number_ast_transformer",
+            "framework.transform_cache",
             "framework.tick_system",
             "framework.game_builtins",
         }:
@@ -458,7 +864,7 @@ class NumberWrappingFinder(MetaPathFinder):
                 _debug_print(
                     f"[DEBUG TRANSFORMER] Transforming module: {fullname} at {spec.origin}"
                 )
-                spec.loader = NumberWrappingLoader(spec.loader)
+                spec.loader = NumberWrappingLoader(spec.loader, self.options)
             except ValueError:
                 # module_path is not relative to _PROJECT_DIR
                 _debug_print(
@@ -472,11 +878,18 @@ def get_project_module_prefixes():
     return sorted(_PROJECT_MODULE_NAMES)
 
 
-def install_number_wrapper(target_modules=None):
+def install_number_wrapper(target_modules=None, **options):
+    """安装导入钩子；options 覆盖 DEFAULT_TRANSFORM_OPTIONS，例如 batch_ticks=False"""
     if target_modules is None:
         target_modules = get_project_module_prefixes()
 
-    finder = NumberWrappingFinder(target_modules)
+    merged = dict(DEFAULT_TRANSFORM_OPTIONS)
+    merged.update(options)
+    if merged["tick_backend"] == "monitoring":
+        tick_monitoring.install()
+    elif merged["tick_backend"] != "ast":
+        raise ValueError("unknown tick backend: %s" % merged["tick_backend"])
+    finder = NumberWrappingFinder(target_modules, merged)
     sys.meta_path.insert(0, finder)
 
     return finder
@@ -28,9 +28,6 @@ class Number(float):
     # Ensure arithmetic operations return Number instances
     # Note: tick counting is handled by AST transformer, not here
     def __add__(self, other):
-        print(
-            f"[DEBUG Number.__add__] self={self}, other={other}, type(other)={type(other)}"
-        )
         return Number(float.__add__(self, other))
 
     def __radd__(self, other):
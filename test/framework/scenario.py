@@ -0,0 +1,467 @@
+"""
+多区域布局场景：按给定的区域尺寸与分配顺序搭建农场，在模拟器中运行固定 tick 预算
+
+与 main.py 的结构一致：
+- 按 order 依次分配区域（maze 只分配矩形）
+- 每个普通区域生成一架无人机，生成失败的区域由主无人机轮询兜底
+- maze 最后生成无人机，完成后自动开下一局
+
+tick 系统、_world_state 和项目模块的全局变量都是进程级的，
+因此每个场景应在独立进程中运行（见 test/sweep.py）
+"""
+
+import importlib
+import sys
+from pathlib import Path
+
+_TEST_DIR = Path(__file__).parent.parent
+_PROJECT_DIR = _TEST_DIR.parent
+
+# main.py 中手工调好的布局
+DEFAULT_LAYOUT = {
+    "pumpkin": (6, 6),
+    "sunflower": (10, 10),
+    "cactus": (12, 12),
+    "companion": (6, 6),
+    "companion_entities": ("Grass", "Carrot", "Tree"),
+    "maze": (16, 16),
+    "maze_times": 300,
+    "order": ("maze", "pumpkin", "sunflower", "cactus", "companion"),
+}
+
+AREA_KINDS = ("maze", "pumpkin", "sunflower", "cactus", "companion")
+
+DEFAULT_MAX_DRONES = 16
+
+# run_script 的默认初始库存：与一个已解锁迷宫的存档相当，脚本消耗的物品都不会短缺
+# （空库存时 maze 无人机拿不到 Weird_Substance，初始化后直接退出）
+SAVE_INVENTORY = {"Weird_Substance": 1000000}
+
+_setup_done = {"done": False}
+
+# setup_simulator 预先导入的项目模块（顶层脚本 main.py / f*.py 导入即运行，不在其中）
+_PROJECT_MODULE_PREFIXES = ("area_", "utils_")
+
+
+def setup_simulator(**transform_options):
+    """安装 AST 变换钩子与游戏内置函数（每个进程只需一次）"""
+    if _setup_done["done"]:
+        return
+    for path in (str(_PROJECT_DIR), str(_TEST_DIR)):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+    from framework.number_ast_transformer import (
+        install_number_wrapper,
+        NumberWrappingFinder,
+    )
+
+    # 已经由 run_tests.py / conftest 安装过时不重复安装
+    if not any(isinstance(f, NumberWrappingFinder) for f in sys.meta_path):
+        install_number_wrapper(target_modules=["area_", "utils_"], **transform_options)
+
+    # game_builtins 会导入 number_wrapper -> utils_math，必须在安装钩子之后导入，
+    # 否则 utils_math 不经变换，sign/clamp 等不计 tick
+    from framework.game_builtins import setup_game_builtins
+
+    setup_game_builtins()
+    # 模块首次导入时执行的模块级代码也会计 tick；预先导入，让场景的 tick 与导入顺序无关
+    for name in project_module_names():
+        importlib.import_module(name)
+    _setup_done["done"] = True
+
+
+def project_module_names():
+    """项目根目录下的 area_* / utils_* 模块名"""
+    names = []
+    for prefix in _PROJECT_MODULE_PREFIXES:
+        names.extend(sorted(path.stem for path in _PROJECT_DIR.glob(prefix + "*.py")))
+    return names
+
+
+def make_layout(**overrides):
+    """在 DEFAULT_LAYOUT 基础上覆盖部分参数；尺寸为 None 或 (0, 0) 表示不建该区域"""
+    layout = dict(DEFAULT_LAYOUT)
+    layout.update(overrides)
+    return layout
+
+
+def _size_enabled(size):
+    return size is not None and size[0] > 0 and size[1] > 0
+
+
+def _create_areas(layout):
+    """按 order 分配区域，返回 (普通区域列表, maze 区域, 分配失败的区域名)"""
+    from area_pumpkin import pumpkin_area
+    from area_sunflower import sunflower_area
+    from area_cactus import cactus_area
+    from area_companion import companion_area
+    from area_maze import maze_area
+
+    areas = []
+    maze = None
+    failed = []
+    for kind in layout["order"]:
+        size = layout.get(kind)
+        if not _size_enabled(size):
+            continue
+        if kind == "maze":
+            maze = maze_area(size, layout["maze_times"])
+            if maze is None:
+                failed.append(kind)
+            continue
+        if kind == "companion":
+            for name in layout["companion_entities"]:
+                a = companion_area(size, getattr(Entities, name))
+                if a is None:
+                    failed.append("companion_" + name.lower())
+                else:
+                    areas.append(a)
+            continue
+
+        factory = {
+            "pumpkin": pumpkin_area,
+            "sunflower": sunflower_area,
+            "cactus": cactus_area,
+        }[kind]
+        a = factory(size)
+        if a is None:
+            failed.append(kind)
+        else:
+            areas.append(a)
+    return areas, maze, failed
+
+
+def _layout_main(layout, state):
+    """主无人机：与 main.py 的流程一致"""
+    from utils_rect_allocator import rect_allocator_instance_initialize, rect_allocator_free
+    from utils_drone import spawn_area_drone, spawn_maze_drone, area_step, run_maze_inline
+    from area_maze import maze_area
+
+    rect_allocator_instance_initialize(get_world_size())
+    areas, maze, failed = _create_areas(layout)
+    state["areas"] = list(areas)
+    state["failed"] = failed
+
+    fallback_areas = []
+    for a in areas:
+        if spawn_area_drone(a) is None:
+            fallback_areas.append(a)
+    state["fallback"] = len(fallback_areas)
+
+    maze_drone = None
+    if maze is not None:
+        state["areas"].append(maze)
+        maze_drone = spawn_maze_drone(maze)
+        if maze_drone is None:
+            run_maze_inline(maze)
+            maze = None
+
+    fallback_i = 0
+    while True:
+        if fallback_areas:
+            if fallback_i >= len(fallback_areas):
+                fallback_i = 0
+            area_step(fallback_areas[fallback_i], False)
+            fallback_i += 1
+
+        if maze_drone is not None and has_finished(maze_drone):
+            wait_for(maze_drone)
+            rect_allocator_free(maze["allocator"], maze["rect_id"])
+            maze = maze_area(layout["maze"], layout["maze_times"])
+            maze_drone = None
+            if maze is not None:
+                state["areas"].append(maze)
+                maze_drone = spawn_maze_drone(maze)
+
+        do_a_flip()
+
+
+def _inventory_items(inventory):
+    """{Items 名称: 数量} 转为 reset_world 使用的 {Items.*: 数量}"""
+    return {getattr(Items, name): amount for name, amount in (inventory or {}).items()}
+
+
+def _plain_amount(amount):
+    """库存数量转为内置数值：use_item 的数量可能是 Number，主进程反序列化时无法导入 number_wrapper"""
+    amount = float(amount)
+    return int(amount) if amount.is_integer() else amount
+
+
+def run_layout(
+    layout,
+    max_ticks,
+    max_drones=DEFAULT_MAX_DRONES,
+    seed=0,
+    unlocks=None,
+    costs=None,
+    inventory=None,
+):
+    """在当前进程中运行一个布局，返回可 pickle 的结果字典
+
+    items 为结束时的库存（含初始库存），harvested 只累计运行中入账的物品，
+    items_per_tick 由 harvested 计算，不受初始库存影响
+    unlocks: {Unlocks 名称: 等级}，例如 {"Mazes": 1}
+    costs: 开销表文件路径或（部分）开销表字典，None 为默认表，见 framework/costs.py
+    inventory: 初始库存 {Items 名称: 数量}，例如 {"Weird_Substance": 100000}；
+               迷宫需要 Weird_Substance，库存为空时 maze 区域不会生成迷宫
+    """
+    setup_simulator()
+
+    from framework import game_builtins
+    from framework.game_builtins import (
+        reset_world,
+        set_unlocked,
+        set_output_enabled,
+        set_cost_table,
+        get_inventory,
+    )
+    from framework.tick_system import reset_tick
+    from framework.drone_scheduler import DroneScheduler
+
+    reset_world(seed=seed, inventory=_inventory_items(inventory))
+    reset_tick()
+    set_output_enabled(False)
+    set_cost_table(costs)
+    for name, level in (unlocks or {}).items():
+        set_unlocked(getattr(Unlocks, name), level)
+
+    state = {}
+    scheduler = DroneScheduler(max_drones=max_drones)
+    harvested = {}
+    original_add_item = game_builtins._add_item
+
+    def __add_item(item, amount):
+        # 只累计入账的物品（收获、宝箱、骨头），use_item 消耗的初始库存不计
+        original_add_item(item, amount)
+        if amount > 0:
+            harvested[str(item)] = harvested.get(str(item), 0) + _plain_amount(amount)
+
+    error = None
+    game_builtins._add_item = __add_item
+    try:
+        scheduler.run(lambda: _layout_main(layout, state), max_ticks=max_ticks)
+    except Exception as e:
+        error = "%s: %s" % (type(e).__name__, e)
+    finally:
+        game_builtins._add_item = original_add_item
+
+    ticks = scheduler.elapsed()
+    items = {}
+    for item, amount in get_inventory().items():
+        items[str(item)] = _plain_amount(amount)
+    total = sum(harvested.values())
+
+    return {
+        "layout": layout,
+        "seed": seed,
+        "ticks": ticks,
+        "items": items,
+        "harvested": harvested,
+        "items_per_tick": float(total) / ticks if ticks else 0.0,
+        "utilization": scheduler.utilization(),
+        "drones": len(scheduler.drones),
+        "failed_areas": state.get("failed", []),
+        "fallback_areas": state.get("fallback", 0),
+        "error": error,
+    }
+
+
+# ========== 顶层脚本（main.py / f0.py） ==========
+
+
+def _install_script_transform(name):
+    """让顶层脚本也经过 AST 变换（其模块名需在 TickSystem 白名单中）"""
+    from framework.number_ast_transformer import NumberWrappingFinder
+
+    for finder in sys.meta_path:
+        if isinstance(finder, NumberWrappingFinder) and name not in finder.target_modules:
+            finder.target_modules = list(finder.target_modules) + [name]
+
+
+def _find_areas(namespace):
+    """从脚本的全局变量中找出区域对象（区域字典，或区域字典的列表）"""
+    found = {}
+
+    def __add(value):
+        if isinstance(value, dict) and "rect" in value and "last_process_harvest" in value:
+            found[(int(value["rect_id"]), _int_rect(value["rect"]))] = value
+
+    for value in list(namespace.values()):
+        if isinstance(value, (list, tuple)):
+            for item in value:
+                __add(item)
+        else:
+            __add(value)
+    return sorted(found.values(), key=lambda a: a["rect_id"])
+
+
+def _int_rect(rect):
+    return tuple(int(v) for v in rect)
+
+
+def _rect_contains(rect, x, y):
+    ry, rx, h, w = rect
+    return ry <= y < ry + h and rx <= x < rx + w
+
+
+def _area_reports(areas, tile_items, ticks):
+    """按区域汇总收获：每次 harvest 的物品增量按无人机所在格子归到区域"""
+    reports = []
+    for a in areas:
+        reports.append(
+            {
+                "rect_id": int(a["rect_id"]),
+                "type": a.get("area_type", "unknown"),
+                "rect": _int_rect(a["rect"]),
+                "items": {},
+                "items_per_tick": 0.0,
+                "last_process_tick": int(a["last_process_tick"]),
+                "last_process_harvest": {
+                    str(k): int(v) for k, v in a["last_process_harvest"].items()
+                },
+            }
+        )
+    outside = {}
+    for (x, y), items in tile_items.items():
+        target = outside
+        for report in reports:
+            if _rect_contains(report["rect"], x, y):
+                target = report["items"]
+                break
+        for item, amount in items.items():
+            target[item] = target.get(item, 0) + amount
+    for report in reports:
+        total = sum(report["items"].values())
+        report["items_per_tick"] = float(total) / ticks if ticks else 0.0
+    return reports, outside
+
+
+def _allocator_layout(areas):
+    """区域所用分配器的布局：已分配矩形、空闲矩形与利用率"""
+    if not areas or "allocator" not in areas[0]:
+        return None
+    allocator = areas[0]["allocator"]
+    total_h = int(allocator["total_h"])
+    total_w = int(allocator["total_w"])
+    total = total_h * total_w
+    allocated = {
+        int(rect_id): _int_rect(rect) for rect_id, rect in allocator["allocated"].items()
+    }
+    used = sum(rect[2] * rect[3] for rect in allocated.values())
+    return {
+        "size": (total_h, total_w),
+        "allocated": allocated,
+        "free_rects": [_int_rect(rect) for rect in allocator["free_rects"]],
+        "utilization": float(used) / total if total else 0.0,
+    }
+
+
+def run_script(
+    script,
+    max_ticks=None,
+    max_items=None,
+    max_drones=DEFAULT_MAX_DRONES,
+    seed=0,
+    unlocks=None,
+    costs=None,
+    inventory=None,
+):
+    """在模拟器中运行顶层脚本（如 main.py / f0.py），返回可 pickle 的结果字典
+
+    脚本以 while True 结尾，必须给出 tick 预算 max_ticks 或物品预算 max_items
+    （累计收获的物品数），达到任一预算即结束所有无人机。
+    inventory: 初始库存 {Items 名称: 数量}，None 为 SAVE_INVENTORY，{} 为空库存
+    结果包括每个区域的收获与 items/tick、每架无人机的利用率和分配器布局。
+    """
+    if max_ticks is None and max_items is None:
+        raise ValueError("run_script needs max_ticks or max_items")
+
+    script = Path(script)
+    name = script.stem
+    setup_simulator()
+    if str(script.parent.resolve()) not in [str(Path(p).resolve()) for p in sys.path if p]:
+        sys.path.insert(0, str(script.parent))
+    _install_script_transform(name)
+
+    import importlib.util
+
+    from framework import game_builtins
+    from framework.game_builtins import (
+        reset_world,
+        set_unlocked,
+        set_output_enabled,
+        set_cost_table,
+        get_inventory,
+    )
+    from framework.tick_system import reset_tick
+    from framework.drone_scheduler import DroneScheduler
+
+    if inventory is None:
+        inventory = SAVE_INVENTORY
+    reset_world(seed=seed, inventory=_inventory_items(inventory))
+    reset_tick()
+    set_output_enabled(False)
+    set_cost_table(costs)
+    for unlock, level in (unlocks or {}).items():
+        set_unlocked(getattr(Unlocks, unlock), level)
+
+    scheduler = DroneScheduler(max_drones=max_drones)
+    world = game_builtins._world_state
+    tile_items = {}
+    harvested = {"total": 0}
+    original_add_item = game_builtins._add_item
+
+    def __add_item(item, amount):
+        # 收获（以及宝箱、骨头等）入账时按当前无人机所在格子记账
+        original_add_item(item, amount)
+        if amount <= 0:
+            return
+        pos = (world["pos_x"], world["pos_y"])
+        amount = _plain_amount(amount)
+        gained = tile_items.setdefault(pos, {})
+        gained[str(item)] = gained.get(str(item), 0) + amount
+        harvested["total"] += amount
+        if max_items is not None and harvested["total"] >= max_items:
+            scheduler.stop()
+
+    # 脚本不会正常结束，导入失败时 sys.modules 里的模块会被移除，这里自己持有模块对象
+    holder = {}
+
+    def __main():
+        spec = importlib.util.find_spec(name)
+        module = importlib.util.module_from_spec(spec)
+        holder["module"] = module
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+
+    error = None
+    game_builtins._add_item = __add_item
+    try:
+        scheduler.run(__main, max_ticks=max_ticks)
+    except Exception as e:
+        error = "%s: %s" % (type(e).__name__, e)
+    finally:
+        game_builtins._add_item = original_add_item
+        set_output_enabled(True)
+
+    module = holder.get("module")
+    areas = _find_areas(vars(module)) if module is not None else []
+    ticks = scheduler.elapsed()
+    reports, outside = _area_reports(areas, tile_items, ticks)
+    items = {str(item): _plain_amount(amount) for item, amount in get_inventory().items()}
+
+    return {
+        "script": str(script),
+        "seed": seed,
+        "ticks": ticks,
+        "items": items,
+        "harvested": harvested["total"],
+        "items_per_tick": float(harvested["total"]) / ticks if ticks else 0.0,
+        "areas": reports,
+        "unattributed_items": outside,
+        "utilization": scheduler.utilization(),
+        "drones": scheduler.stats(),
+        "allocator": _allocator_layout(areas),
+        "error": error,
+    }
@@ -0,0 +1,247 @@
+"""
+基于 sys.monitoring（PEP 669，Python 3.12+）的 tick 计数后端
+
+AST 后端在每个计数的运算处注入 `(_add_ticks(1), expr)[-1]`，每次运算都多一次 Python 调用。
+本后端仍由 SyntaxSugarTransformer 决定哪些表达式计数（二元运算、比较、and/or、下标、打包、
+解包、项目函数调用），但把注入的计数剥掉，只记下被计数表达式的源码位置；
+编译后把每个位置映射到该表达式最先执行的那条字节码，
+在这些字节码上用 sys.monitoring 的 INSTRUCTION 事件计 tick。
+其余位置的事件第一次触发时即返回 DISABLE，之后以原生速度运行，tick 总数与 AST 后端相同。
+
+仍然保留的改写：
+- 方法调用语法糖 a.f(...) -> f(a, ...) 与数值装箱（这些改变语义，不只是计数）
+- 紧挨着 pass 的 _add_ticks(n)：pass 不产生字节码，没有可以挂事件的位置
+
+TickBatchingTransformer 合并出的语句级 _add_ticks(n) 同样剥掉，计数挂在下一条语句的第一条指令上。
+
+同一段源码被编译器复制的情况（while 条件、finally 块）按相同位置的指令一起计数。
+"""
+
+import ast
+import dis
+import sys
+
+try:
+    from .tick_system import TickSystem, _add_ticks
+except ImportError:
+    from tick_system import TickSystem, _add_ticks
+
+MONITORING_AVAILABLE = sys.version_info >= (3, 12)
+
+_TOOL_NAME = "tick-monitoring"
+
+# 不可能是表达式第一条指令的辅助字节码
+_SKIP_OPNAMES = {"CACHE", "EXTENDED_ARG", "RESUME"}
+
+# {id(code): ({offset: ticks}, 是否白名单模块的代码)}；_codes 持有 code object，保证 id 不被复用
+_offset_ticks = {}
+_codes = []
+_state = {"tool": None}
+
+
+# ========== 剥离注入的计数 ==========
+
+
+def _span(node):
+    return (node.lineno, node.col_offset, node.end_lineno, node.end_col_offset)
+
+
+def _is_tick_call(node):
+    return (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Name)
+        and node.func.id == "_add_ticks"
+        and len(node.args) == 1
+        and isinstance(node.args[0], ast.Constant)
+    )
+
+
+def _emits_code(stmt):
+    """语句是否一定产生字节码（pass 与常量表达式语句会被编译器丢掉）"""
+    if isinstance(stmt, ast.Pass):
+        return False
+    return not (isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Constant))
+
+
+class _TickStripper(ast.NodeTransformer):
+    """剥掉 (_add_ticks(n), expr)[-1] 包装，记录 (expr 的源码位置, n)"""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def visit_Subscript(self, node):
+        value = node.value
+        if (
+            isinstance(value, ast.Tuple)
+            and len(value.elts) == 2
+            and _is_tick_call(value.elts[0])
+            and isinstance(node.slice, ast.Constant)
+            and node.slice.value == -1
+        ):
+            expr = value.elts[1]
+            self.records.append((_span(expr), value.elts[0].args[0].value))
+            return self.visit(expr)
+        return self.generic_visit(node)
+
+    def generic_visit(self, node):
+        node = super().generic_visit(node)
+        for field, block in ast.iter_fields(node):
+            if isinstance(block, list) and block and isinstance(block[0], ast.stmt):
+                setattr(node, field, self._strip_block(block))
+        return node
+
+    def _strip_block(self, stmts):
+        # 独立的 _add_ticks(n) 语句（解包、合并后的语句开销）改为记录在下一条语句上
+        result = []
+        for i, stmt in enumerate(stmts):
+            if isinstance(stmt, ast.Expr) and _is_tick_call(stmt.value) and i + 1 < len(stmts):
+                following = stmts[i + 1]
+                if _emits_code(following):
+                    self.records.append((_span(following), stmt.value.args[0].value))
+                    continue
+            result.append(stmt)
+        return result
+
+
+def strip_tick_calls(tree):
+    """剥掉 transform_source 注入的计数，返回 (tree, [(源码位置, ticks)])"""
+    stripper = _TickStripper()
+    tree = stripper.visit(tree)
+    ast.fix_missing_locations(tree)
+    return tree, stripper.records
+
+
+# ========== 源码位置 -> 字节码偏移 ==========
+
+
+def iter_code_objects(code):
+    """深度优先遍历 code 及其嵌套的 code object，产出 (code, 嵌套深度)"""
+    stack = [(code, 0)]
+    while stack:
+        current, depth = stack.pop()
+        yield current, depth
+        nested = [c for c in current.co_consts if hasattr(c, "co_code")]
+        for child in reversed(nested):
+            stack.append((child, depth + 1))
+
+
+def _instructions_by_line(code):
+    """{行号: [(offset, opname, positions)]}，跳过没有位置信息的指令"""
+    by_line = {}
+    for ins in dis.get_instructions(code):
+        pos = ins.positions
+        if ins.opname in _SKIP_OPNAMES or pos is None or pos.lineno is None or pos.col_offset is None:
+            continue
+        entry = (ins.offset, ins.opname, tuple(pos))
+        for line in range(pos.lineno, pos.end_lineno + 1):
+            by_line.setdefault(line, []).append(entry)
+    return by_line
+
+
+def _within(pos, span):
+    lineno, end_lineno, col, end_col = pos
+    return (lineno, col) >= (span[0], span[1]) and (end_lineno, end_col) <= (span[2], span[3])
+
+
+def compute_offset_ticks(code, records):
+    """把 (源码位置, ticks) 映射到字节码偏移，返回按 iter_code_objects 顺序的 [{offset: ticks}]
+
+    表达式在位置范围内有指令的最外层 code object 中求值，计数落在其中偏移最小（最先执行）的指令上；
+    编译器复制出的同位置同操作码指令一起计数
+    """
+    codes = list(iter_code_objects(code))
+    lines = [_instructions_by_line(c) for c, _ in codes]
+    tables = [{} for _ in codes]
+    for span, ticks in records:
+        best = None
+        for index, (_, depth) in enumerate(codes):
+            if best is not None and depth >= codes[best[0]][1]:
+                continue
+            candidates = {}
+            for line in range(span[0], span[2] + 1):
+                for entry in lines[index].get(line, ()):
+                    if _within(entry[2], span):
+                        candidates[entry[0]] = entry
+            if candidates:
+                best = (index, candidates[min(candidates)])
+        if best is None:
+            continue  # 被编译器优化掉的死代码
+        index, (_, opname, pos) = best
+        table = tables[index]
+        for offset, other_opname, other_pos in lines[index][pos[0]]:
+            if other_opname == opname and other_pos == pos:
+                table[offset] = table.get(offset, 0) + ticks
+    return tables
+
+
+# ========== sys.monitoring ==========
+
+
+def _on_instruction(code, offset):
+    entry = _offset_ticks.get(id(code))
+    if entry is not None:
+        amount = entry[0].get(offset)
+        if amount is not None:
+            if entry[1] and TickSystem._profile is None:
+                # 白名单模块自己的代码一定计数，省去 _add_ticks 的调用栈检查
+                TickSystem._tick += amount * TickSystem._operation_ticks
+                if TickSystem._tick > TickSystem._yield_at:
+                    TickSystem._yield_hook()
+            else:
+                _add_ticks(amount)
+            return None
+    return sys.monitoring.DISABLE
+
+
+def install():
+    """注册 sys.monitoring 工具（重复调用无副作用）"""
+    if not MONITORING_AVAILABLE:
+        raise RuntimeError("sys.monitoring tick backend needs Python 3.12+")
+    if _state["tool"] is not None:
+        return _state["tool"]
+    monitoring = sys.monitoring
+    for tool in (monitoring.PROFILER_ID, 3, 4):
+        if monitoring.get_tool(tool) is None:
+            break
+    else:
+        raise RuntimeError("no free sys.monitoring tool id")
+    monitoring.use_tool_id(tool, _TOOL_NAME)
+    monitoring.register_callback(tool, monitoring.events.INSTRUCTION, _on_instruction)
+    _state["tool"] = tool
+    return tool
+
+
+def uninstall():
+    """注销工具并清空已登记的 code object"""
+    tool = _state["tool"]
+    if tool is None:
+        return
+    for code in _codes:
+        sys.monitoring.set_local_events(tool, code, 0)
+    sys.monitoring.register_callback(tool, sys.monitoring.events.INSTRUCTION, None)
+    sys.monitoring.free_tool_id(tool)
+    _state["tool"] = None
+    _offset_ticks.clear()
+    _codes.clear()
+
+
+def register_code(code, tables, module_name=None):
+    """为模块 module_name 的 code 及其嵌套 code object 开启计数事件（tables 来自 compute_offset_ticks）"""
+    tool = install()
+    whitelisted = module_name in TickSystem._module_whitelist
+    for (current, _), table in zip(iter_code_objects(code), tables):
+        if not table:
+            continue
+        _offset_ticks[id(current)] = (table, whitelisted)
+        _codes.append(current)
+        sys.monitoring.set_local_events(tool, current, sys.monitoring.events.INSTRUCTION)
+
+
+def compile_monitored(tree, filename, module_name=None):
+    """编译已剥离计数的 tree 并登记事件，返回 (code, tables)"""
+    tree, records = strip_tick_calls(tree)
+    code = compile(tree, filename, "exec")
+    tables = compute_offset_ticks(code, records)
+    register_code(code, tables, module_name)
+    return code, tables
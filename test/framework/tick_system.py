@@ -2,8 +2,7 @@
 Singleton tick system for game time tracking
 """
 
-import inspect
-import threading
+import sys
 
 
 class TickSystem:
@@ -12,8 +11,16 @@ class TickSystem:
     _instance = None
     _tick = 0
 
-    # 线程局部变量，用于防止在检查调用栈时触发 tick 计数
-    _checking_stack = threading.local()
+    # profiling 模式：{(根帧标签, ..., 叶帧标签): ticks}，None 表示未开启
+    _profile = None
+
+    # 多无人机调度：tick 超过 _yield_at 时调用 _yield_hook 让出执行权
+    # 没有调度器时 _yield_at 为无穷大，热路径只多一次比较
+    _yield_at = float("inf")
+    _yield_hook = None
+
+    # 变换后的代码每个运算计的 tick 数（开销表的 operation，见 costs.py）
+    _operation_ticks = 1
 
     # 模块白名单：只有这些模块的调用才会计数 tick
     # 包含 Save0 根目录下的所有项目代码模块
@@ -52,6 +59,8 @@ class TickSystem:
         "utils_route",
         "utils_singleton",
         "utils_user",
+        # 测试框架：benchmark 编译的回调源码
+        "benchmark_callbacks",
     }
 
     def __new__(cls):
@@ -67,31 +76,73 @@ class TickSystem:
         return cls._tick
 
     @classmethod
-    def _should_count_tick(cls):
+    def _should_count_tick(cls, depth=2):
         """检查调用栈，判断是否应该计数 tick
         只有当调用来自白名单模块时才返回 True
+
+        depth: 从哪一层栈帧开始检查（默认跳过 _should_count_tick 和它的调用者）
+        直接沿 f_back 向上走，不构造 FrameInfo，通常第一帧就是项目代码，O(1) 返回
         """
-        # 防止在检查调用栈时触发 tick 计数（避免无限递归）
-        if getattr(cls._checking_stack, "active", False):
+        whitelist = cls._module_whitelist
+        try:
+            frame = sys._getframe(depth)
+        except ValueError:
             return False
 
+        while frame is not None:
+            # 获取模块名（从 frame 的 globals 中获取 __name__）
+            if frame.f_globals.get("__name__") in whitelist:
+                return True
+            frame = frame.f_back
+
+        return False
+
+    @classmethod
+    def _project_stack(cls, depth):
+        """收集调用栈中的项目帧标签（"模块.函数"），从根到叶排列"""
+        whitelist = cls._module_whitelist
+        labels = []
         try:
-            cls._checking_stack.active = True
-            # 获取调用栈
-            stack = inspect.stack()
+            frame = sys._getframe(depth + 1)
+        except ValueError:
+            return labels
 
-            # 从栈顶往下找（跳过当前函数和 add_ticks）
-            for frame_info in stack[2:]:  # 跳过 _should_count_tick 和 add_ticks
-                # 获取模块名（从 frame 的 globals 中获取 __name__）
-                module_name = frame_info.frame.f_globals.get("__name__", "")
+        while frame is not None:
+            module_name = frame.f_globals.get("__name__")
+            if module_name in whitelist:
+                labels.append(module_name + "." + frame.f_code.co_name)
+            frame = frame.f_back
+        labels.reverse()
+        return labels
 
-                # 检查是否在白名单中
-                if module_name in cls._module_whitelist:
-                    return True
+    @classmethod
+    def _profile_add(cls, amount, depth=2, leaf=None):
+        """profiling 模式下计数：把 tick 记到当前项目调用栈上
 
+        返回是否计数（与 _should_count_tick 的判定一致）
+        leaf: 额外的叶子标签（如模拟器的游戏 API 名），会接在项目栈之后
+        """
+        labels = cls._project_stack(depth)
+        if not labels and leaf is None:
             return False
-        finally:
-            cls._checking_stack.active = False
+        if leaf is not None:
+            labels.append(leaf)
+        key = tuple(labels)
+        profile = cls._profile
+        profile[key] = profile.get(key, 0) + amount
+        return True
+
+    @classmethod
+    def start_profile(cls):
+        """开启 profiling 模式（清空之前的记录）"""
+        cls._profile = {}
+
+    @classmethod
+    def stop_profile(cls):
+        """关闭 profiling 模式，返回 {调用栈元组: ticks}"""
+        profile = cls._profile
+        cls._profile = None
+        return profile if profile is not None else {}
 
     @classmethod
     def add_ticks(cls, amount):
@@ -100,8 +151,53 @@ class TickSystem:
             cls._instance = cls()
 
         # 检查调用栈，只有项目代码调用时才计数
-        if cls._should_count_tick():
-            cls._tick += amount
+        amount *= cls._operation_ticks
+        if cls._profile is not None:
+            if cls._profile_add(amount):
+                cls._commit(amount)
+        elif cls._should_count_tick():
+            cls._commit(amount)
+
+    @classmethod
+    def _commit(cls, amount):
+        """计入 tick，并在超过让出阈值时交给调度器切换无人机"""
+        cls._tick += amount
+        if cls._tick > cls._yield_at:
+            cls._yield_hook()
+
+    @classmethod
+    def set_yield_point(cls, yield_at, hook):
+        """设置让出阈值与回调（供无人机调度器使用）；yield_at=None 表示取消"""
+        if yield_at is None:
+            cls._yield_at = float("inf")
+            cls._yield_hook = None
+        else:
+            cls._yield_at = yield_at
+            cls._yield_hook = hook
+
+    @classmethod
+    def set_operation_ticks(cls, ticks):
+        """设置每个运算计的 tick 数（默认 1）"""
+        cls._operation_ticks = ticks
+
+    @classmethod
+    def set_tick(cls, value):
+        """直接设置 tick 值（调度器切换无人机时恢复各自的时钟）"""
+        if cls._instance is None:
+            cls._instance = cls()
+        cls._tick = value
+
+    @classmethod
+    def advance(cls, amount):
+        """无条件推进 tick（供模拟器的游戏 API 使用，不检查调用栈）"""
+        if cls._instance is None:
+            cls._instance = cls()
+        if cls._profile is not None:
+            # 叶子标记为调用 advance 的游戏 API，例如 game_builtins.move
+            caller = sys._getframe(2)
+            module_name = caller.f_globals.get("__name__", "").rsplit(".", 1)[-1]
+            cls._profile_add(amount, 2, module_name + "." + caller.f_code.co_name)
+        cls._commit(amount)
 
     @classmethod
     def reset(cls):
@@ -112,8 +208,13 @@ class TickSystem:
 
     @classmethod
     def tick_and_return(cls, value):
-        """增加 1 tick 并返回值（用于下标访问）"""
-        cls.add_ticks(1)
+        """增加一个运算的 tick 并返回值（用于下标访问）"""
+        amount = cls._operation_ticks
+        if cls._profile is not None:
+            if cls._profile_add(amount):
+                cls._commit(amount)
+        elif cls._should_count_tick():
+            cls._commit(amount)
         return value
 
 
@@ -124,8 +225,19 @@ def get_tick():
 
 
 def _add_ticks(amount):
-    """增加 tick 值"""
-    TickSystem.add_ticks(amount)
+    """增加 tick 值
+
+    热路径：变换后的代码在每个运算处都会调用，这里直接检查调用者所在栈帧，
+    少一层 classmethod 转发
+    """
+    amount *= TickSystem._operation_ticks
+    if TickSystem._profile is not None:
+        if TickSystem._profile_add(amount):
+            TickSystem._commit(amount)
+    elif TickSystem._should_count_tick():
+        TickSystem._tick += amount
+        if TickSystem._tick > TickSystem._yield_at:
+            TickSystem._yield_hook()
 
 
 def _tick_and_return(value):
@@ -133,6 +245,86 @@ def _tick_and_return(value):
     return TickSystem.tick_and_return(value)
 
 
+def advance_ticks(amount):
+    """无条件推进 tick（模拟器内部使用）"""
+    TickSystem.advance(amount)
+
+
 def reset_tick():
     """重置 tick 值"""
     TickSystem.reset()
+
+
+# ========== profiling ==========
+
+
+def start_tick_profile():
+    """开启 tick profiling：之后每次计数都会记到当前项目调用栈上"""
+    TickSystem.start_profile()
+
+
+def stop_tick_profile():
+    """关闭 tick profiling，返回 {(根帧, ..., 叶帧): ticks}"""
+    return TickSystem.stop_profile()
+
+
+def format_collapsed_stacks(profile):
+    """转换为 collapsed-stack 格式（每行 "a;b;c ticks"），可直接交给 flamegraph.pl / speedscope"""
+    lines = []
+    for stack, ticks in sorted(profile.items()):
+        lines.append("%s %d" % (";".join(stack), ticks))
+    return "\n".join(lines) + ("\n" if lines else "")
+
+
+def write_collapsed_stacks(profile, path):
+    """把 collapsed-stack 输出写入文件"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(format_collapsed_stacks(profile))
+
+
+def summarize_tick_profile(profile):
+    """统计每个函数的 self / total tick
+
+    self: 该函数位于栈顶时消耗的 tick
+    total: 该函数出现在栈上时消耗的 tick（递归时只算一次）
+    返回 [(函数, self, total)]，按 total 降序
+    """
+    self_ticks = {}
+    total_ticks = {}
+    for stack, ticks in profile.items():
+        leaf = stack[-1]
+        self_ticks[leaf] = self_ticks.get(leaf, 0) + ticks
+        for label in set(stack):
+            total_ticks[label] = total_ticks.get(label, 0) + ticks
+
+    rows = []
+    for label, total in total_ticks.items():
+        rows.append((label, self_ticks.get(label, 0), total))
+    rows.sort(key=lambda row: (-row[2], -row[1], row[0]))
+    return rows
+
+
+def format_tick_table(profile, limit=30):
+    """格式化 self/total tick 表格"""
+    rows = summarize_tick_profile(profile)
+    grand_total = sum(profile.values())
+    if limit is not None:
+        rows = rows[:limit]
+
+    width = max([len(row[0]) for row in rows] + [len("function")])
+    lines = [
+        "%-*s %12s %7s %12s %7s" % (width, "function", "self", "self%", "total", "total%")
+    ]
+    for label, self_tick, total in rows:
+        lines.append(
+            "%-*s %12d %6.1f%% %12d %6.1f%%"
+            % (
+                width,
+                label,
+                self_tick,
+                100.0 * self_tick / grand_total if grand_total else 0.0,
+                total,
+                100.0 * total / grand_total if grand_total else 0.0,
+            )
+        )
+    return "\n".join(lines)
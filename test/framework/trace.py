@@ -0,0 +1,518 @@
+"""
+游戏 API 调用的二进制轨迹记录与确定性回放
+
+记录（TraceRecorder）：包装 builtins 中的游戏 API，每次调用追加一条紧凑的二进制记录：
+    API、无人机 id、调用时的 tick 与坐标、参数、返回值，以及调用期间世界随机数的抽取
+    （生长时间、枯死、花瓣、仙人掌大小、伴生需求、迷宫、苹果……）
+
+回放（TraceReplayer）：把记录中的随机抽取按 (API, 坐标, 该坐标上第几次调用) 作为 key 喂回给模拟器，
+脚本的 random() 按无人机顺序喂回。同一份代码会完整重现原来的运行；两个版本的
+area_companion / area_maze 只要在同一格做同样的事，就会拿到相同的世界随机性。
+抽取对不上（例如种了不同的作物）时改用 fallback 随机数，并计入 stats()。
+
+文件格式（可追加，每次 start() 写一个段）：
+    段头:  MAGIC  API 名称表(varint 个数 + 字符串)
+    事件:  api:u8  drone:varint  tick 增量:zigzag  x:varint  y:varint
+           参数个数:u8  参数...  返回值  抽取个数:varint  抽取(方法:u8 参数个数:u8 参数... 结果)...
+    值:    类型标签:u8 + 内容，枚举第一次出现时写全名，之后写编号
+
+用法：
+    with TraceRecorder("run.trace"):
+        scheduler.run(main, max_ticks=1_000_000)
+
+    with TraceReplayer("run.trace") as replayer:
+        scheduler.run(other_main, max_ticks=1_000_000)
+    replayer.stats()
+"""
+
+import builtins as python_builtins
+import random as py_random
+import struct
+from pathlib import Path
+
+from . import game_builtins
+from .tick_system import TickSystem
+
+MAGIC = b"TFWRTRC1"
+
+# 被记录的游戏 API（写入每个段头，读取时按段头解析）
+TRACED_APIS = (
+    "move",
+    "can_move",
+    "till",
+    "plant",
+    "harvest",
+    "can_harvest",
+    "measure",
+    "swap",
+    "get_companion",
+    "get_entity_type",
+    "get_ground_type",
+    "use_item",
+    "change_hat",
+    "clear",
+    "do_a_flip",
+    "spawn_drone",
+    "random",
+)
+
+# 世界随机数上会被调用的方法
+_DRAW_METHODS = ("randint", "randrange", "random")
+
+# 值的类型标签
+_NONE = 0
+_FALSE = 1
+_TRUE = 2
+_INT = 3
+_FLOAT = 4
+_ENUM_REF = 5
+_ENUM_NEW = 6
+_TUPLE = 7
+_STR = 8
+
+_DOUBLE = struct.Struct("<d")
+
+# 缓冲超过这个大小时写盘
+_FLUSH_SIZE = 1 << 16
+
+
+# ========== 编码 ==========
+
+
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, pos):
+    result = 0
+    shift = 0
+    while True:
+        b = data[pos]
+        pos += 1
+        result |= (b & 0x7F) << shift
+        if b < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _zigzag(value):
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value):
+    return value >> 1 if value % 2 == 0 else -((value + 1) >> 1)
+
+
+def _write_str(out, text):
+    raw = text.encode("utf-8")
+    _write_varint(out, len(raw))
+    out += raw
+
+
+def _read_str(data, pos):
+    length, pos = _read_varint(data, pos)
+    return data[pos : pos + length].decode("utf-8"), pos + length
+
+
+def _enum_registry():
+    """repr -> GameEnum，例如 "Entities.Grass" / "Direction.North" """
+    registry = {}
+    for value in vars(game_builtins).values():
+        if isinstance(value, game_builtins.GameEnum):
+            registry[repr(value)] = value
+        elif isinstance(value, type):
+            for member in vars(value).values():
+                if isinstance(member, game_builtins.GameEnum):
+                    registry[repr(member)] = member
+    return registry
+
+
+class _Encoder:
+    """一个段内的值编码器（枚举编号在段内有效）"""
+
+    def __init__(self):
+        self.enum_ids = {}
+
+    def value(self, out, value):
+        if value is None:
+            out.append(_NONE)
+        elif value is True:
+            out.append(_TRUE)
+        elif value is False:
+            out.append(_FALSE)
+        elif isinstance(value, game_builtins.GameEnum):
+            index = self.enum_ids.get(value)
+            if index is None:
+                self.enum_ids[value] = len(self.enum_ids)
+                out.append(_ENUM_NEW)
+                _write_str(out, repr(value))
+            else:
+                out.append(_ENUM_REF)
+                _write_varint(out, index)
+        elif isinstance(value, float) and not value.is_integer():
+            out.append(_FLOAT)
+            out += _DOUBLE.pack(value)
+        elif isinstance(value, (int, float)):
+            out.append(_INT)
+            _write_varint(out, _zigzag(int(value)))
+        elif isinstance(value, (tuple, list)):
+            out.append(_TUPLE)
+            _write_varint(out, len(value))
+            for item in value:
+                self.value(out, item)
+        elif isinstance(value, str):
+            out.append(_STR)
+            _write_str(out, value)
+        else:
+            # 函数等不可回放的值只记名字
+            out.append(_STR)
+            _write_str(out, getattr(value, "__name__", repr(value)))
+
+
+class _Decoder:
+    def __init__(self, registry):
+        self.registry = registry
+        self.enums = []
+
+    def value(self, data, pos):
+        tag = data[pos]
+        pos += 1
+        if tag == _NONE:
+            return None, pos
+        if tag == _FALSE:
+            return False, pos
+        if tag == _TRUE:
+            return True, pos
+        if tag == _INT:
+            raw, pos = _read_varint(data, pos)
+            return _unzigzag(raw), pos
+        if tag == _FLOAT:
+            return _DOUBLE.unpack_from(data, pos)[0], pos + _DOUBLE.size
+        if tag == _ENUM_REF:
+            index, pos = _read_varint(data, pos)
+            return self.enums[index], pos
+        if tag == _ENUM_NEW:
+            name, pos = _read_str(data, pos)
+            value = self.registry.get(name, name)
+            self.enums.append(value)
+            return value, pos
+        if tag == _TUPLE:
+            count, pos = _read_varint(data, pos)
+            items = []
+            for _ in range(count):
+                item, pos = self.value(data, pos)
+                items.append(item)
+            return tuple(items), pos
+        if tag == _STR:
+            return _read_str(data, pos)
+        raise ValueError("bad trace value tag %d at %d" % (tag, pos - 1))
+
+
+# ========== 读取 ==========
+
+
+def read_trace(path):
+    """解析轨迹文件，返回事件列表
+
+    每个事件为 {"api", "drone", "tick", "pos": (x, y), "args", "result", "draws"}，
+    draws 为 [(方法名, 参数元组, 结果)]
+    """
+    data = Path(path).read_bytes()
+    registry = _enum_registry()
+    events = []
+    pos = 0
+    while pos < len(data):
+        if data[pos : pos + len(MAGIC)] != MAGIC:
+            raise ValueError("bad trace segment header at %d" % pos)
+        pos += len(MAGIC)
+        count, pos = _read_varint(data, pos)
+        apis = []
+        for _ in range(count):
+            name, pos = _read_str(data, pos)
+            apis.append(name)
+        decoder = _Decoder(registry)
+        tick = 0
+        while pos < len(data) and data[pos : pos + len(MAGIC)] != MAGIC:
+            api = apis[data[pos]]
+            drone, pos = _read_varint(data, pos + 1)
+            delta, pos = _read_varint(data, pos)
+            tick += _unzigzag(delta)
+            x, pos = _read_varint(data, pos)
+            y, pos = _read_varint(data, pos)
+            argc = data[pos]
+            pos += 1
+            args = []
+            for _ in range(argc):
+                arg, pos = decoder.value(data, pos)
+                args.append(arg)
+            result, pos = decoder.value(data, pos)
+            drawc, pos = _read_varint(data, pos)
+            draws = []
+            for _ in range(drawc):
+                method = _DRAW_METHODS[data[pos]]
+                nargs = data[pos + 1]
+                pos += 2
+                draw_args = []
+                for _ in range(nargs):
+                    arg, pos = decoder.value(data, pos)
+                    draw_args.append(arg)
+                draw_value, pos = decoder.value(data, pos)
+                draws.append((method, tuple(draw_args), draw_value))
+            events.append(
+                {
+                    "api": api,
+                    "drone": drone,
+                    "tick": tick,
+                    "pos": (x, y),
+                    "args": tuple(args),
+                    "result": result,
+                    "draws": draws,
+                }
+            )
+    return events
+
+
+# ========== 包装 ==========
+
+
+def _current_drone():
+    scheduler = game_builtins._world_state["scheduler"]
+    if scheduler is None or scheduler.current is None:
+        return 0
+    return scheduler.current.id
+
+
+class _DrawRandom:
+    """替换 _world_state["world_rng"]：所有抽取都经过 owner.draw()"""
+
+    def __init__(self, owner):
+        self.owner = owner
+
+    def randint(self, a, b):
+        return self.owner.draw("randint", (a, b))
+
+    def randrange(self, n):
+        return self.owner.draw("randrange", (n,))
+
+    def random(self):
+        return self.owner.draw("random", ())
+
+
+class _ApiHook:
+    """把 TRACED_APIS 包装一层：调用前后通知 owner.before_call / after_call"""
+
+    def __init__(self):
+        self.originals = {}
+        self.proxy = _DrawRandom(self)
+        self.saved_rng = None
+        # 每架无人机正在进行的调用（调用中可能因 tick 让出而切换无人机）
+        self.calls = {}
+
+    def start(self):
+        if self.originals:
+            return
+        self._install_rng()
+        for name in TRACED_APIS:
+            original = getattr(python_builtins, name)
+            self.originals[name] = original
+            setattr(python_builtins, name, self._wrap(name, original))
+
+    def stop(self):
+        for name, original in self.originals.items():
+            setattr(python_builtins, name, original)
+        self.originals = {}
+        if game_builtins._world_state["world_rng"] is self.proxy:
+            game_builtins._world_state["world_rng"] = self.saved_rng
+        self.saved_rng = None
+
+    def _install_rng(self):
+        """把世界随机数换成代理（reset_world 会换掉它，所以每次调用前都检查）"""
+        world = game_builtins._world_state
+        if world["world_rng"] is not self.proxy:
+            self.saved_rng = world["world_rng"]
+            world["world_rng"] = self.proxy
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+        return False
+
+    def _wrap(self, name, original):
+        def traced(*args):
+            self._install_rng()
+            drone = _current_drone()
+            world = game_builtins._world_state
+            call = {
+                "api": name,
+                "drone": drone,
+                "tick": TickSystem.get_tick(),
+                "pos": (world["pos_x"], world["pos_y"]),
+                "args": args,
+                "draws": [],
+            }
+            outer = self.calls.get(drone)
+            self.calls[drone] = call
+            try:
+                self.before_call(call)
+                result = original(*args)
+                call["result"] = result
+                self.after_call(call)
+            finally:
+                self.calls[drone] = outer
+            return result
+
+        traced.__name__ = name
+        return traced
+
+    def _current_call(self):
+        return self.calls.get(_current_drone())
+
+    def before_call(self, call):
+        pass
+
+    def after_call(self, call):
+        pass
+
+    def draw(self, method, args):
+        raise NotImplementedError
+
+
+# ========== 记录 ==========
+
+
+class TraceRecorder(_ApiHook):
+    """把游戏 API 调用追加写入二进制轨迹文件"""
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = Path(path)
+        self.buffer = bytearray()
+        self.encoder = None
+        self.last_tick = 0
+        self.events = 0
+        self.file = None
+
+    def start(self):
+        if self.file is not None:
+            return
+        self.file = open(self.path, "ab")
+        self.encoder = _Encoder()
+        self.last_tick = 0
+        self.buffer += MAGIC
+        _write_varint(self.buffer, len(TRACED_APIS))
+        for name in TRACED_APIS:
+            _write_str(self.buffer, name)
+        super().start()
+
+    def stop(self):
+        super().stop()
+        if self.file is not None:
+            self.flush()
+            self.file.close()
+            self.file = None
+
+    def flush(self):
+        self.file.write(self.buffer)
+        self.file.flush()
+        self.buffer = bytearray()
+
+    def draw(self, method, args):
+        value = getattr(self.saved_rng, method)(*args)
+        call = self._current_call()
+        if call is not None:
+            call["draws"].append((method, args, value))
+        return value
+
+    def after_call(self, call):
+        out = self.buffer
+        encoder = self.encoder
+        out.append(TRACED_APIS.index(call["api"]))
+        _write_varint(out, call["drone"])
+        _write_varint(out, _zigzag(call["tick"] - self.last_tick))
+        self.last_tick = call["tick"]
+        _write_varint(out, int(call["pos"][0]))
+        _write_varint(out, int(call["pos"][1]))
+        out.append(len(call["args"]))
+        for arg in call["args"]:
+            encoder.value(out, arg)
+        encoder.value(out, call["result"])
+        _write_varint(out, len(call["draws"]))
+        for method, args, value in call["draws"]:
+            out.append(_DRAW_METHODS.index(method))
+            out.append(len(args))
+            for arg in args:
+                encoder.value(out, arg)
+            encoder.value(out, value)
+        self.events += 1
+        if len(out) >= _FLUSH_SIZE:
+            self.flush()
+
+
+# ========== 回放 ==========
+
+
+class TraceReplayer(_ApiHook):
+    """把轨迹中的随机性喂回模拟器
+
+    世界随机抽取按 (API, 坐标, 该 API 在该坐标的第几次调用) 取出，方法和参数一致时使用记录值；
+    脚本的 random() 按每架无人机的调用顺序取出。取不到时使用 fallback 随机数（fallback_seed）。
+    """
+
+    def __init__(self, path, fallback_seed=0):
+        super().__init__()
+        self.draws = {}
+        self.randoms = {}
+        for event in read_trace(path):
+            if event["api"] == "random":
+                self.randoms.setdefault(event["drone"], []).append(event["result"])
+            elif event["draws"]:
+                key = (event["api"],) + event["pos"]
+                self.draws.setdefault(key, []).append(list(event["draws"]))
+        self.occurrences = {}
+        self.fallback = py_random.Random(fallback_seed)
+        self.matched = 0
+        self.fallbacks = 0
+
+    def start(self):
+        super().start()
+        self._original_random = self.originals.get("random")
+        python_builtins.random = self._replay_random
+
+    def before_call(self, call):
+        key = (call["api"],) + call["pos"]
+        occurrence = self.occurrences.get(key, 0)
+        self.occurrences[key] = occurrence + 1
+        recorded = self.draws.get(key)
+        if recorded is not None and occurrence < len(recorded):
+            call["pending"] = list(recorded[occurrence])
+        else:
+            call["pending"] = []
+
+    def draw(self, method, args):
+        call = self._current_call()
+        pending = call["pending"] if call is not None else []
+        if pending and pending[0][0] == method and pending[0][1] == tuple(args):
+            self.matched += 1
+            return pending.pop(0)[2]
+        # 对不上之后这次调用剩下的记录都不再可信
+        del pending[:]
+        self.fallbacks += 1
+        return getattr(self.fallback, method)(*args)
+
+    def _replay_random(self):
+        queue = self.randoms.get(_current_drone())
+        if queue:
+            self.matched += 1
+            return queue.pop(0)
+        self.fallbacks += 1
+        return self._original_random()
+
+    def stats(self):
+        """{"matched": 使用记录值的次数, "fallback": 使用 fallback 随机数的次数}"""
+        return {"matched": self.matched, "fallback": self.fallbacks}
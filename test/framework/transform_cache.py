@@ -0,0 +1,140 @@
+"""
+AST 变换结果的磁盘缓存（仿照 __pycache__）
+
+- 变换后的 code object 用 marshal 存到源文件同级的 __pycache__ 目录
+- 缓存键 = 源码哈希 + 变换器源码哈希 + 变换选项 + 项目函数名索引哈希 + Python 字节码版本
+- 项目函数名索引按文件 (mtime_ns, size) 缓存，文件未改动时无需重新 parse
+
+设置环境变量 TICK_TRANSFORM_CACHE=0 可关闭缓存
+"""
+
+import hashlib
+import importlib.util
+import json
+import marshal
+import os
+import sys
+from pathlib import Path
+
+_CACHE_DIR_NAME = "__pycache__"
+_CACHE_TAG = "tick-transform"
+
+# 文件头：标识 + 缓存键（固定长度 sha256 摘要）
+_HEADER_MAGIC = b"TTC1"
+_KEY_SIZE = 32
+
+
+def cache_enabled():
+    """是否启用缓存（默认启用）"""
+    return os.environ.get("TICK_TRANSFORM_CACHE", "1") != "0"
+
+
+def _python_tag():
+    return sys.implementation.cache_tag or "py%d%d" % sys.version_info[:2]
+
+
+def make_key(source, *parts):
+    """计算缓存键：源码与所有影响变换结果的因素一起哈希"""
+    h = hashlib.sha256()
+    if isinstance(source, str):
+        source = source.encode("utf-8")
+    h.update(importlib.util.MAGIC_NUMBER)
+    h.update(hashlib.sha256(source).digest())
+    for part in parts:
+        h.update(b"\0")
+        h.update(repr(part).encode("utf-8"))
+    return h.digest()
+
+
+def sources_digest(paths):
+    """若干源文件内容的哈希（十六进制），用于让缓存随变换器代码的修改自动失效"""
+    h = hashlib.sha256()
+    for path in paths:
+        path = Path(path)
+        h.update(path.name.encode("utf-8"))
+        h.update(b"\0")
+        h.update(path.read_bytes())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _code_cache_path(source_path):
+    source_path = Path(source_path)
+    name = "%s.%s.%s.bin" % (source_path.stem, _CACHE_TAG, _python_tag())
+    return source_path.parent / _CACHE_DIR_NAME / name
+
+
+def _atomic_write(path, data):
+    """先写临时文件再 rename，避免并发进程读到半个文件"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name("%s.%d.tmp" % (path.name, os.getpid()))
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def load_code(source_path, key):
+    """读取缓存的 code object，缓存不存在或键不匹配时返回 None"""
+    if not cache_enabled():
+        return None
+    try:
+        data = _code_cache_path(source_path).read_bytes()
+    except OSError:
+        return None
+
+    head_size = len(_HEADER_MAGIC) + _KEY_SIZE
+    if len(data) < head_size or not data.startswith(_HEADER_MAGIC):
+        return None
+    if data[len(_HEADER_MAGIC) : head_size] != key:
+        return None
+    try:
+        return marshal.loads(data[head_size:])
+    except (EOFError, ValueError, TypeError):
+        return None
+
+
+def store_code(source_path, key, code):
+    """写入 code object 缓存，写失败（如只读目录）时静默忽略"""
+    if not cache_enabled():
+        return
+    try:
+        _atomic_write(
+            _code_cache_path(source_path), _HEADER_MAGIC + key + marshal.dumps(code)
+        )
+    except OSError:
+        pass
+
+
+def _symbol_index_path(project_dir):
+    name = "project_symbols.%s.%s.json" % (_CACHE_TAG, _python_tag())
+    return Path(project_dir) / _CACHE_DIR_NAME / name
+
+
+def load_symbol_index(project_dir, version):
+    """读取函数名索引缓存：{文件名: {"stat": [mtime_ns, size], "functions": [...]}}"""
+    if not cache_enabled():
+        return {}
+    try:
+        data = json.loads(_symbol_index_path(project_dir).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != version:
+        return {}
+    return data.get("files", {})
+
+
+def store_symbol_index(project_dir, version, files):
+    """写入函数名索引缓存"""
+    if not cache_enabled():
+        return
+    data = json.dumps({"version": version, "files": files}, sort_keys=True)
+    try:
+        _atomic_write(_symbol_index_path(project_dir), data.encode("utf-8"))
+    except OSError:
+        pass
+
+
+def file_stat_key(path):
+    """文件的 (mtime_ns, size)，用于判断索引条目是否过期"""
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
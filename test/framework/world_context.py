@@ -0,0 +1,102 @@
+"""
+世界上下文
+
+模拟器的状态是进程级的全局变量：
+- game_builtins._world_state：地图、位置、背包、随机数、调度器、开销表……
+- TickSystem 的时钟、让出阈值、每运算 tick 数与 profiling 记录
+- utils_singleton 的单例表（全局 rect allocator 就保存在这里）
+
+WorldContext 把这些状态收拢成一个对象，进入时换入、退出时换出，测试之间互不影响：
+
+    with WorldContext(seed=1, world_size=8) as ctx:
+        ...              # 在 ctx 的世界中运行
+    ctx.tick             # 退出后仍可读取
+
+换入换出只交换字典的内容而不替换对象，
+因此 `from framework.game_builtins import _world_state` 拿到的引用始终指向当前上下文。
+同一个上下文可以多次进入，但不能嵌套进入自身。
+"""
+
+from framework import game_builtins
+from framework.tick_system import TickSystem
+
+_TICK_FIELDS = ("_tick", "_yield_at", "_yield_hook", "_operation_ticks", "_profile")
+
+
+def _singleton_store():
+    """utils_singleton 的单例表（模块级的 __store，不受名字改写影响）"""
+    import utils_singleton
+
+    return vars(utils_singleton)["__store"]
+
+
+def _capture():
+    """取出当前全局状态（浅拷贝，容器本身归属于该状态）"""
+    return {
+        "world": dict(game_builtins._world_state),
+        "output": dict(game_builtins._output),
+        "tick": {name: getattr(TickSystem, name) for name in _TICK_FIELDS},
+        "singletons": dict(_singleton_store()),
+    }
+
+
+def _restore(state):
+    """把 state 换入全局变量"""
+    for target, key in (
+        (game_builtins._world_state, "world"),
+        (game_builtins._output, "output"),
+        (_singleton_store(), "singletons"),
+    ):
+        target.clear()
+        target.update(state[key])
+    for name, value in state["tick"].items():
+        setattr(TickSystem, name, value)
+
+
+class WorldContext:
+    """一份独立的模拟世界：地图与无人机状态、tick 时钟和项目单例"""
+
+    def __init__(self, seed=None, world_size=100, inventory=None):
+        saved = _capture()
+        try:
+            game_builtins.reset_world(seed=seed, world_size=world_size, inventory=inventory)
+            game_builtins._output["enabled"] = True
+            TickSystem.reset()
+            TickSystem.set_yield_point(None, None)
+            TickSystem._profile = None
+            _singleton_store().clear()
+            self._state = _capture()
+        finally:
+            _restore(saved)
+        self._saved = None
+
+    @property
+    def active(self):
+        return self._saved is not None
+
+    @property
+    def tick(self):
+        """该世界的 tick（进入期间为实时值）"""
+        if self.active:
+            return TickSystem._tick
+        return self._state["tick"]["_tick"]
+
+    @property
+    def world(self):
+        """该世界的 _world_state 内容（进入期间即全局字典本身）"""
+        if self.active:
+            return game_builtins._world_state
+        return self._state["world"]
+
+    def __enter__(self):
+        if self.active:
+            raise RuntimeError("world context is already active")
+        self._saved = _capture()
+        _restore(self._state)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._state = _capture()
+        _restore(self._saved)
+        self._saved = None
+        return False
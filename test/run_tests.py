@@ -13,24 +13,7 @@ import pytest
 parent_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(parent_dir))
 
-# Define game built-in constants for testing environment
-# These constants are available globally in the game but need to be defined for Python tests
-# Install number wrapper for automatic Number class wrapping
-# Transform area_, utils_, and test_ modules
-# This also handles tick injection for pass statements and logical operators
-from framework.number_ast_transformer import install_number_wrapper
-
-install_number_wrapper(target_modules=["area_", "utils_", "cases.test_"])
-
-# Setup game built-in environment
-from framework.game_builtins import setup_game_builtins, get_world_size
-
-setup_game_builtins()
-
-# Initialize rect allocator for testing
-from utils_rect_allocator import rect_allocator_instance_initialize
-
-rect_allocator_instance_initialize(get_world_size())
+# 模拟器（AST 变换钩子、游戏内置函数）在 conftest.py 中安装，每个测试运行在独立的世界上下文中
 
 
 def run_tests():
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+无界面运行顶层脚本
+把 main.py / f0.py 这类以 while True 结尾的脚本经 AST 变换后放进模拟器，
+跑到 tick 预算或物品预算后结束所有无人机，输出各区域的 items/tick、无人机利用率与分配器布局。
+
+布局改动的标准验收基准：
+
+    python simulate.py main.py --ticks 2000000
+    python simulate.py f0.py --items 50000 --drones 16 --json f0.json
+
+初始库存默认为 SAVE_INVENTORY（见 framework/scenario.py），--inventory 给出时替换默认库存。
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from framework.scenario import DEFAULT_MAX_DRONES, SAVE_INVENTORY, run_script
+
+_PROJECT_DIR = Path(__file__).parent.parent
+
+
+def _format_items(items):
+    return ", ".join("%s=%d" % (k, v) for k, v in sorted(items.items())) or "-"
+
+
+def _format_rect(rect):
+    return "(%d,%d %dx%d)" % rect
+
+
+def format_report(result):
+    """把 run_script 的结果排成文本报告"""
+    lines = []
+    lines.append(
+        "%s: %d tick, 收获 %d 个物品, items/tick=%.5f"
+        % (Path(result["script"]).name, result["ticks"], result["harvested"], result["items_per_tick"])
+    )
+    if result["error"]:
+        lines.append("ERROR " + result["error"])
+
+    lines.append("")
+    header = "%4s %-10s %-16s %10s %9s  %s" % (
+        "id",
+        "area",
+        "rect (y,x hxw)",
+        "items/tick",
+        "last tick",
+        "items",
+    )
+    lines.append(header)
+    lines.append("-" * len(header))
+    for area in result["areas"]:
+        lines.append(
+            "%4d %-10s %-16s %10.5f %9d  %s"
+            % (
+                area["rect_id"],
+                area["type"],
+                _format_rect(area["rect"]),
+                area["items_per_tick"],
+                area["last_process_tick"],
+                _format_items(area["items"]),
+            )
+        )
+    if result["unattributed_items"]:
+        lines.append("区域外: " + _format_items(result["unattributed_items"]))
+
+    lines.append("")
+    lines.append("无人机利用率 %.1f%%" % (100.0 * result["utilization"]))
+    header = "%4s %10s %10s %10s %10s %6s" % ("id", "spawn", "end", "busy", "idle", "util")
+    lines.append(header)
+    lines.append("-" * len(header))
+    for drone in result["drones"]:
+        lines.append(
+            "%4d %10d %10d %10d %10d %5.1f%%"
+            % (
+                drone["id"],
+                drone["spawn_tick"],
+                drone["end_tick"],
+                drone["busy_ticks"],
+                drone["idle_ticks"],
+                100.0 * drone["utilization"],
+            )
+        )
+
+    allocator = result["allocator"]
+    if allocator is not None:
+        lines.append("")
+        lines.append(
+            "分配器 %dx%d，已分配 %d 块，利用率 %.1f%%"
+            % (
+                allocator["size"][0],
+                allocator["size"][1],
+                len(allocator["allocated"]),
+                100.0 * allocator["utilization"],
+            )
+        )
+        for rect_id, rect in sorted(allocator["allocated"].items()):
+            lines.append("  #%d %s" % (rect_id, _format_rect(rect)))
+        free = sorted(allocator["free_rects"], key=lambda r: -r[2] * r[3])
+        lines.append("  空闲 %d 块: %s" % (len(free), " ".join(_format_rect(r) for r in free)))
+    return "\n".join(lines)
+
+
+def make_parser():
+    parser = argparse.ArgumentParser(description="在模拟器中运行 main.py / f0.py 并输出产量报告")
+    parser.add_argument("script", nargs="?", default="main.py", help="顶层脚本（默认 main.py）")
+    parser.add_argument("--ticks", type=int, default=None, help="模拟 tick 预算")
+    parser.add_argument("--items", type=int, default=None, help="物品预算（累计收获的物品数）")
+    parser.add_argument("--drones", type=int, default=DEFAULT_MAX_DRONES, help="max_drones")
+    parser.add_argument("--seed", type=int, default=0, help="世界随机种子")
+    parser.add_argument(
+        "--unlock",
+        action="append",
+        default=[],
+        help="解锁等级，例如 Mazes=1（可重复）",
+    )
+    parser.add_argument(
+        "--inventory",
+        action="append",
+        default=[],
+        help="初始库存，例如 Weird_Substance=1000000（可重复，替换默认的 %s）"
+        % ",".join("%s=%d" % item for item in sorted(SAVE_INVENTORY.items())),
+    )
+    parser.add_argument("--costs", default=None, help="开销表文件（.json/.yaml）")
+    parser.add_argument("--json", default=None, help="把完整结果写入 JSON 文件")
+    return parser
+
+
+def main(argv=None):
+    parser = make_parser()
+    args = parser.parse_args(argv)
+    if args.ticks is None and args.items is None:
+        parser.error("需要 --ticks 或 --items")
+
+    script = Path(args.script)
+    if not script.exists() and (_PROJECT_DIR / script).exists():
+        script = _PROJECT_DIR / script
+    unlocks = {}
+    for item in args.unlock:
+        name, level = item.split("=")
+        unlocks[name] = int(level)
+    inventory = None
+    if args.inventory:
+        inventory = {}
+        for item in args.inventory:
+            name, amount = item.split("=")
+            inventory[name] = int(amount)
+
+    result = run_script(
+        script,
+        max_ticks=args.ticks,
+        max_items=args.items,
+        max_drones=args.drones,
+        seed=args.seed,
+        unlocks=unlocks,
+        costs=args.costs,
+        inventory=inventory,
+    )
+    print(format_report(result))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    return 1 if result["error"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
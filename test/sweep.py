@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+布局参数扫描
+对区域尺寸与分配顺序的组合逐一在模拟器中运行固定 tick 预算，输出按 items/tick 排名的表格
+
+每个配置在独立的工作进程中运行（tick 系统与 _world_state 都是进程级全局状态），
+默认使用全部 CPU 核心。--fork-server 改为在预热好的父进程中为每个配置 fork 子进程（见 framework/fork_server.py），
+省去每个配置的解释器启动与模块变换。
+
+示例：
+    python sweep.py --pumpkin 6x6,8x8 --cactus 12x12,14x14 --ticks 2000000
+    python sweep.py --order maze,pumpkin,sunflower,cactus,companion \\
+                    --order pumpkin,cactus,sunflower,companion,maze --json result.json
+    python sweep.py --pumpkin 4x4,6x6,8x8 --ticks 200000 --fork-server
+    python sweep.py --maze 8x8,16x16 --maze-times 1,300 --inventory Weird_Substance=1000000
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from framework.scenario import DEFAULT_LAYOUT, DEFAULT_MAX_DRONES, AREA_KINDS, make_layout
+
+
+def parse_sizes(text):
+    """解析 "6x6,8x8" 为 [(6, 6), (8, 8)]；"0" 表示不建该区域"""
+    sizes = []
+    for part in text.split(","):
+        part = part.strip().lower()
+        if part in ("0", "none", "off"):
+            sizes.append(None)
+            continue
+        h, w = part.split("x")
+        sizes.append((int(h), int(w)))
+    return sizes
+
+
+def parse_order(text):
+    order = tuple(kind.strip() for kind in text.split(",") if kind.strip())
+    for kind in order:
+        if kind not in AREA_KINDS:
+            raise argparse.ArgumentTypeError("unknown area kind: %s" % kind)
+    return order
+
+
+def parse_ints(text):
+    return [int(v) for v in text.split(",")]
+
+
+def build_grid(args):
+    """所有参数组合的笛卡尔积"""
+    axes = {}
+    for kind in AREA_KINDS:
+        value = getattr(args, kind)
+        axes[kind] = value if value is not None else [DEFAULT_LAYOUT[kind]]
+    axes["maze_times"] = args.maze_times or [DEFAULT_LAYOUT["maze_times"]]
+    axes["order"] = args.order or [DEFAULT_LAYOUT["order"]]
+
+    keys = list(axes.keys())
+    layouts = []
+    for values in itertools.product(*[axes[k] for k in keys]):
+        overrides = dict(zip(keys, values))
+        if args.companion_entities:
+            overrides["companion_entities"] = tuple(args.companion_entities.split(","))
+        layouts.append(make_layout(**overrides))
+    return layouts
+
+
+def _run_config(job):
+    """工作进程入口（maxtasksperchild=1，每个配置一个全新进程）"""
+    from framework.scenario import run_layout
+
+    layout, max_ticks, max_drones, seed, unlocks, costs, inventory = job
+    start = time.time()
+    result = run_layout(layout, max_ticks, max_drones, seed, unlocks, costs, inventory)
+    result["wall_time"] = time.time() - start
+    return result
+
+
+def _error_result(job, message):
+    """fork 子进程失败时该配置的结果：与 run_layout 的结果同形，error 记录失败原因"""
+    (layout, max_ticks, max_drones, seed, unlocks, costs, inventory), = job
+    return {
+        "layout": layout,
+        "seed": seed,
+        "ticks": 0,
+        "items": {},
+        "harvested": {},
+        "items_per_tick": 0.0,
+        "utilization": 0.0,
+        "drones": 0,
+        "failed_areas": [],
+        "fallback_areas": 0,
+        "error": message,
+        "wall_time": 0.0,
+    }
+
+
+def _imap_configs(jobs, processes, fork_server=False):
+    """按完成顺序产出每个配置的结果（失败的配置也产出结果，见 result["error"]）"""
+    if fork_server:
+        from framework.fork_server import ForkServer
+
+        server = ForkServer(jobs=processes)
+        yield from server.imap_unordered(_run_config, [(job,) for job in jobs], on_error=_error_result)
+        return
+    with multiprocessing.Pool(processes=processes, maxtasksperchild=1) as pool:
+        yield from pool.imap_unordered(_run_config, jobs)
+
+
+def _format_size(size):
+    if size is None:
+        return "-"
+    return "%dx%d" % (size[0], size[1])
+
+
+def format_table(results, limit=None):
+    """按 items/tick 降序排名"""
+    ranked = sorted(results, key=lambda r: -r["items_per_tick"])
+    if limit is not None:
+        ranked = ranked[:limit]
+
+    header = "%4s %10s %6s %8s %8s %8s %8s %8s %6s %6s  %s" % (
+        "rank",
+        "items/tick",
+        "util",
+        "pumpkin",
+        "sunflwr",
+        "cactus",
+        "compan",
+        "maze",
+        "times",
+        "fail",
+        "order",
+    )
+    lines = [header, "-" * len(header)]
+    for i, r in enumerate(ranked):
+        layout = r["layout"]
+        lines.append(
+            "%4d %10.5f %5.1f%% %8s %8s %8s %8s %8s %6d %6d  %s%s"
+            % (
+                i + 1,
+                r["items_per_tick"],
+                100.0 * r["utilization"],
+                _format_size(layout["pumpkin"]),
+                _format_size(layout["sunflower"]),
+                _format_size(layout["cactus"]),
+                _format_size(layout["companion"]),
+                _format_size(layout["maze"]),
+                layout["maze_times"],
+                len(r["failed_areas"]),
+                ",".join(layout["order"]),
+                "  ERROR " + r["error"] if r["error"] else "",
+            )
+        )
+    return "\n".join(lines)
+
+
+def make_parser():
+    parser = argparse.ArgumentParser(description="布局参数扫描（多进程）")
+    for kind in AREA_KINDS:
+        parser.add_argument(
+            "--" + kind,
+            type=parse_sizes,
+            default=None,
+            help="%s 区域尺寸列表，例如 6x6,8x8（0 表示不建），默认 %s"
+            % (kind, _format_size(DEFAULT_LAYOUT[kind])),
+        )
+    parser.add_argument("--maze-times", type=parse_ints, default=None, help="MAZE_TIMES 列表")
+    parser.add_argument(
+        "--companion-entities",
+        default=None,
+        help="companion 区的主作物，例如 Grass,Carrot,Tree",
+    )
+    parser.add_argument(
+        "--order",
+        type=parse_order,
+        action="append",
+        default=None,
+        help="分配顺序，可重复指定多个，例如 maze,pumpkin,sunflower,cactus,companion",
+    )
+    parser.add_argument("--ticks", type=int, default=1000000, help="每个配置的模拟 tick 预算")
+    parser.add_argument("--drones", type=int, default=DEFAULT_MAX_DRONES, help="max_drones")
+    parser.add_argument("--seed", type=int, default=0, help="世界随机种子")
+    parser.add_argument(
+        "--unlock",
+        action="append",
+        default=[],
+        help="解锁等级，例如 Mazes=1（可重复）",
+    )
+    parser.add_argument(
+        "--inventory",
+        action="append",
+        default=[],
+        help="初始库存，例如 Weird_Substance=1000000（可重复）；迷宫需要 Weird_Substance",
+    )
+    parser.add_argument(
+        "--costs",
+        default=None,
+        help="开销表文件（.json/.yaml），默认 framework/game_costs.json",
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=os.cpu_count() or 1, help="工作进程数（默认全部核心）"
+    )
+    parser.add_argument(
+        "--fork-server",
+        action="store_true",
+        help="预热一次后为每个配置 fork 子进程（需要 os.fork）",
+    )
+    parser.add_argument("--top", type=int, default=None, help="只显示前 N 名")
+    parser.add_argument("--json", default=None, help="把全部结果写入 JSON 文件")
+    return parser
+
+
+def main(argv=None):
+    args = make_parser().parse_args(argv)
+    unlocks = {}
+    for item in args.unlock:
+        name, level = item.split("=")
+        unlocks[name] = int(level)
+    inventory = {}
+    for item in args.inventory:
+        name, amount = item.split("=")
+        inventory[name] = int(amount)
+
+    layouts = build_grid(args)
+    jobs = [
+        (layout, args.ticks, args.drones, args.seed, unlocks, args.costs, inventory)
+        for layout in layouts
+    ]
+    print("扫描 %d 个配置，%d 个工作进程，每个 %d tick" % (len(jobs), args.jobs, args.ticks))
+
+    start = time.time()
+    results = []
+    for result in _imap_configs(jobs, args.jobs, args.fork_server):
+        results.append(result)
+        print(
+            "[%d/%d] items/tick=%.5f (%.1fs)"
+            % (len(results), len(jobs), result["items_per_tick"], result["wall_time"])
+        )
+
+    print()
+    print(format_table(results, args.top))
+    print()
+    print("总耗时 %.1fs" % (time.time() - start))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
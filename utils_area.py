@@ -2,9 +2,9 @@
 # 通用区域管理工具
 
 from utils_rect import rectangle_contains_point
-from utils_route import rect_get_hamiltonian_path, vector_get_path
+from utils_route import rect_get_hamiltonian_route_cached, point_get_path
 from utils_move import route_move_along_with_hook, route_move_along, path_move_along
-from utils_point import point_subtract
+from utils_point import point_subtract, vector_len, vector_warp
 from utils_list import list_sort_by_yx
 from utils_rect_allocator import rect_allocator_instance_get, rect_allocator_alloc
 
@@ -41,87 +41,143 @@ def area(rect_id, rect):
     a = {}
     a["rect_id"] = rect_id
     a["rect"] = rect
+    # 属性：attr_name -> 扁平列表（下标见 area_point_to_index），attr_name -> {value: 数量}
     a["attrs"] = {}
+    a["attr_counts"] = {}
+    # 点 -> 下标与按下标排列的点列表，所有属性共用，首次使用时构造
+    a["index_map"] = None
+    a["points"] = None
 
     # 处理器函数（由具体实现设置）
     a["area_init"] = None
     a["area_processor"] = None
 
-    # 预计算四个角的遍历路径（优化性能）
-    y, x, h, w = rect
-    a["corner_paths"] = {}
+    # 遍历路径不预先计算：area_get_traverse_path 首次使用时经全局路径缓存生成，
+    # 同尺寸的区域共用同一份
 
-    # 左下角 (y, x)
-    a["corner_paths"][(y, x)] = rect_get_hamiltonian_path(rect, (y, x), "snake_y")
+    return a
 
-    # 右下角 (y, x + w - 1)
-    a["corner_paths"][(y, x + w - 1)] = rect_get_hamiltonian_path(
-        rect, (y, x + w - 1), "snake_y"
-    )
 
-    # 左上角 (y + h - 1, x)
-    a["corner_paths"][(y + h - 1, x)] = rect_get_hamiltonian_path(
-        rect, (y + h - 1, x), "snake_y"
-    )
+def __area_build_index_map(area):
+    # 构造点 -> 下标的映射：(py - y) * w + (px - x)，按行优先
+    y, x, h, w = area["rect"]
+    index_map = {}
+    points = []
+    i = 0
+    for dy in range(h):
+        for dx in range(w):
+            block = (y + dy, x + dx)
+            index_map[block] = i
+            points.append(block)
+            i += 1
+    area["index_map"] = index_map
+    area["points"] = points
 
-    # 右上角 (y + h - 1, x + w - 1)
-    a["corner_paths"][(y + h - 1, x + w - 1)] = rect_get_hamiltonian_path(
-        rect, (y + h - 1, x + w - 1), "snake_y"
-    )
 
-    return a
+def area_get_points(area):
+    # 区域内所有点，按属性下标顺序（共享列表，不要修改）
+    if area["points"] == None:
+        __area_build_index_map(area)
+    return area["points"]
+
+
+def area_get_index_map(area):
+    # 点 -> 属性下标（共享字典，不要修改）
+    # 热循环中先取出，每格只做一次查找，再用 *_at 或 area_get_attr_list 按下标读写
+    if area["index_map"] == None:
+        __area_build_index_map(area)
+    return area["index_map"]
+
+
+def area_get_attr_list(area, attr_name):
+    # 属性的扁平列表（共享，只读；修改必须经 area_set_attr_at 以维护 value_counts）
+    # 整体重置是原地进行的，取出的列表在区域的整个生命周期内有效
+    return area["attrs"][attr_name]
 
 
 def area_init_attr(area, attr_name, default_value=None):
-    # 初始化属性
+    # 初始化属性（扁平列表 + value_counts 缓存）
+    if area["index_map"] == None:
+        __area_build_index_map(area)
+
     y, x, h, w = area["rect"]
+    block_count = h * w
 
-    # 属性数据字典
-    attr_dict = {}
+    data = []
+    for _ in range(block_count):
+        data.append(default_value)
 
     # value_counts 缓存（优化 count 操作）
     value_counts = {}
-    block_count = h * w
     value_counts[default_value] = block_count
 
-    for dy in range(h):
-        for dx in range(w):
-            block = (y + dy, x + dx)
-            attr_dict[block] = default_value
+    area["attrs"][attr_name] = data
+    area["attr_counts"][attr_name] = value_counts
 
-    # 存储属性字典和缓存
-    area["attrs"][attr_name] = {"data": attr_dict, "value_counts": value_counts}
+
+def area_point_to_index(area, point):
+    # 点 -> 属性列表下标（点必须在区域内）
+    return area["index_map"][point]
+
+
+def area_index_to_point(area, index):
+    # 属性列表下标 -> 点
+    y, x, h, w = area["rect"]
+    return (y + index // w, x + index % w)
 
 
 def area_get_attr(area, attr_name, block):
     # 获取方块属性
-    return area["attrs"][attr_name]["data"][block]
+    return area["attrs"][attr_name][area["index_map"][block]]
+
+
+def area_get_attr_at(area, attr_name, index):
+    # 按下标获取方块属性（少一次点 -> 下标的查找）
+    return area["attrs"][attr_name][index]
 
 
 def area_set_attr(area, attr_name, block, value):
     # 设置方块属性（并更新 value_counts）
-    attr_info = area["attrs"][attr_name]
-    attr_dict = attr_info["data"]
-    value_counts = attr_info["value_counts"]
+    data = area["attrs"][attr_name]
+    index = area["index_map"][block]
 
-    old_value = attr_dict[block]
+    old_value = data[index]
 
     if old_value == value:
         return
 
     # 更新 value_counts
+    value_counts = area["attr_counts"][attr_name]
     value_counts[old_value] -= 1
     if value not in value_counts:
         value_counts[value] = 0
     value_counts[value] += 1
 
     # 更新属性值
-    attr_dict[block] = value
+    data[index] = value
+
+
+def area_set_attr_at(area, attr_name, index, value):
+    # 按下标设置方块属性（并更新 value_counts）
+    data = area["attrs"][attr_name]
+
+    old_value = data[index]
+
+    if old_value == value:
+        return
+
+    value_counts = area["attr_counts"][attr_name]
+    value_counts[old_value] -= 1
+    if value not in value_counts:
+        value_counts[value] = 0
+    value_counts[value] += 1
+
+    data[index] = value
 
 
 def area_count_attr(area, attr_name, value):
     # 统计特定值的方块数量（O(1) 时间复杂度）
-    value_counts = area["attrs"][attr_name]["value_counts"]
+    value_counts = area["attr_counts"][attr_name]
     if value not in value_counts:
         return 0
     return value_counts[value]
@@ -129,33 +185,77 @@ def area_count_attr(area, attr_name, value):
 
 def area_set_all_attr(area, attr_name, value):
     # 批量设置属性（并更新 value_counts）
-    attr_info = area["attrs"][attr_name]
-    attr_dict = attr_info["data"]
-
-    y, x, h, w = area["rect"]
-    block_count = h * w
+    data = area["attrs"][attr_name]
+    block_count = len(data)
 
     # 重置 value_counts（重新创建字典）
-    attr_info["value_counts"] = {}
-    attr_info["value_counts"][value] = block_count
+    value_counts = {}
+    value_counts[value] = block_count
+    area["attr_counts"][attr_name] = value_counts
 
     # 批量设置
-    for dy in range(h):
-        for dx in range(w):
-            block = (y + dy, x + dx)
-            attr_dict[block] = value
+    for i in range(block_count):
+        data[i] = value
 
 
-def area_get_traverse_path(area, start_point):
-    # 获取从当前位置开始的遍历路径
-    # 优先使用预计算的四个角路径
-    if start_point in area["corner_paths"]:
-        return area["corner_paths"][start_point]
+def area_replace_all_attr(area, attr_name, old_value, new_value):
+    # 把所有值为 old_value 的方块改为 new_value（并更新 value_counts）
+    # 由 value_counts 得知数量：没有 old_value 时 O(1) 返回，否则改完即停止扫描
+    value_counts = area["attr_counts"][attr_name]
+    if old_value == new_value or old_value not in value_counts:
+        return
+    remaining = value_counts[old_value]
+    if remaining == 0:
+        return
 
-    # 如果不是四个角，动态计算遍历路径
-    rect = area["rect"]
-    route = rect_get_hamiltonian_path(rect, start_point, "snake_y")
-    return route
+    value_counts[old_value] = 0
+    if new_value not in value_counts:
+        value_counts[new_value] = 0
+    value_counts[new_value] += remaining
+
+    data = area["attrs"][attr_name]
+    for i in range(len(data)):
+        if data[i] == old_value:
+            data[i] = new_value
+            remaining -= 1
+            if remaining == 0:
+                break
+
+
+def area_reset_attr(area, attr_name, value=None):
+    # 把属性重置为 value：已存在时原地重置（不重新分配），否则初始化
+    # 由 value_counts 得知不等于 value 的方块数：没有时 O(1) 返回，否则改完最后一个即停止扫描
+    # 扫描长度取决于最后一个要改的方块的位置，最坏（它在列表末尾时）仍为 O(h*w)
+    if attr_name not in area["attrs"]:
+        area_init_attr(area, attr_name, value)
+        return
+
+    data = area["attrs"][attr_name]
+    block_count = len(data)
+    value_counts = area["attr_counts"][attr_name]
+    remaining = block_count
+    if value in value_counts:
+        remaining -= value_counts[value]
+    if remaining == 0:
+        return
+
+    value_counts = {}
+    value_counts[value] = block_count
+    area["attr_counts"][attr_name] = value_counts
+
+    for i in range(block_count):
+        if data[i] != value:
+            data[i] = value
+            remaining -= 1
+            if remaining == 0:
+                break
+
+
+def area_get_traverse_path(area, start_point):
+    # 获取从 start_point 开始的遍历 route（snake_y，RLE 形式）
+    # 从角出发时 route 起点即该角；否则先就位到最近的角
+    # segments 来自全局路径缓存（按尺寸和相对起点共享）
+    return rect_get_hamiltonian_route_cached(area["rect"], start_point, "snake_y")
 
 
 def area_traverse_with_hook(area, hook, hook_arg=None):
@@ -177,10 +277,11 @@ def area_contains_point(area, point):
     return rectangle_contains_point(area["rect"], point)
 
 
-def area_move_to_corner(area, corner="bottom_left"):
+def area_move_to_corner(area, corner="bottom_left", wrap=True):
     # 移动到区域的指定角
     # 坐标系：y向上，x向右
     # corner: 'bottom_left', 'bottom_right', 'top_left', 'top_right'
+    # wrap: 是否允许越过世界边界走环面最短路径（已在区域内时不越界，见 __area_commute_wrap）
     y, x, h, w = area["rect"]
 
     if corner == "bottom_left":
@@ -195,19 +296,30 @@ def area_move_to_corner(area, corner="bottom_left"):
         target = (y, x)
 
     current = (get_pos_y(), get_pos_x())
-    vec = point_subtract(target, current)
-    path = vector_get_path(vec)
+    path = point_get_path(current, target, __area_commute_wrap(area, current, wrap))
     path_move_along(path)
 
     return target
 
 
-def area_move_to_nearest_corner(area):
+def __area_commute_wrap(area, current, wrap):
+    # 区域内的移动不越过世界边界：两点都在区域内时，不越界的路径只走两点之间的矩形，
+    # 一定不离开区域；越界的路径只在某一轴距离超过半个世界时才更短，
+    # 而那时它会穿出区域（区域贴着世界边界且超过半个世界宽）
+    # 只有从区域外赶来（commute）时才按环面取最短
+    if wrap and area_contains_point(area, current):
+        return False
+    return wrap
+
+
+def area_move_to_nearest_corner(area, wrap=True):
     # 移动到区域的最近角落
+    # wrap: 是否允许越过世界边界（距离也按环面计算；已在区域内时不越界）
     # 返回：目标角落坐标
     y, x, h, w = area["rect"]
-    current_y = get_pos_y()
-    current_x = get_pos_x()
+    current = (get_pos_y(), get_pos_x())
+    world_size = get_world_size()
+    wrap = __area_commute_wrap(area, current, wrap)
 
     # 四个角的坐标
     corners = [(y, x), (y, x + w - 1), (y + h - 1, x), (y + h - 1, x + w - 1)]
@@ -217,15 +329,16 @@ def area_move_to_nearest_corner(area):
     nearest_corner = None
 
     for corner in corners:
-        cy, cx = corner
-        dist = abs(current_y - cy) + abs(current_x - cx)
+        vec = point_subtract(corner, current)
+        if wrap:
+            vec = vector_warp(vec, world_size)
+        dist = vector_len(vec)
         if min_dist == None or dist < min_dist:
             min_dist = dist
             nearest_corner = corner
 
     # 移动到最近角落
-    vec = point_subtract(nearest_corner, (current_y, current_x))
-    path = vector_get_path(vec)
+    path = point_get_path(current, nearest_corner, wrap)
     path_move_along(path)
 
     return nearest_corner
@@ -250,12 +363,9 @@ def area_wait_until_all_satisfy(
 
     # 初始化 pending_check：收集所有不满足的点
     pending_check = set()
-    y, x, h, w = area["rect"]
-    for dy in range(h):
-        for dx in range(w):
-            block = (y + dy, x + dx)
-            if area_get_attr(area, attr_name, block) != target_value:
-                pending_check.add(block)
+    for i in range(total_blocks):
+        if area_get_attr_at(area, attr_name, i) != target_value:
+            pending_check.add(area_index_to_point(area, i))
 
     while len(pending_check) > 0:
         if len(pending_check) > threshold:
@@ -271,7 +381,7 @@ def area_wait_until_all_satisfy(
                         if point in pending_check:
                             pending_check.remove(point)
 
-            route = area["corner_paths"][(get_pos_y(), get_pos_x())]
+            route = area_get_traverse_path(area, (get_pos_y(), get_pos_x()))
             route_move_along_with_hook(route, wrapper_hook, hook_arg, True)
         else:
             # 策略2：逐点访问
@@ -290,11 +400,7 @@ def area_wait_until_all_satisfy(
                 if point not in pending_check:
                     continue
 
-                py, px = point
-                current_pos = (get_pos_y(), get_pos_x())
-                vec = point_subtract((py, px), current_pos)
-                path = vector_get_path(vec)
-                path_move_along(path)
+                area_move_to_point(point, False)
 
                 # 处理这个点
                 process_hook(point, pending_check, hook_arg)
@@ -305,11 +411,12 @@ def area_wait_until_all_satisfy(
                         pending_check.remove(point)
 
 
-def area_move_to_point(target_point):
+def area_move_to_point(target_point, wrap=True):
     # 移动到指定点（不触发遍历 hook）
+    # wrap: 是否允许越过世界边界走环面最短路径
+    # 起点与目标都在同一区域内时必须传 False（越界的路径可能穿出区域，见 __area_commute_wrap）
     current = (get_pos_y(), get_pos_x())
-    vec = point_subtract(target_point, current)
-    path = vector_get_path(vec)
+    path = point_get_path(current, target_point, wrap)
     path_move_along(path)
 
 
@@ -328,7 +435,7 @@ def area_visit_points(area, points_dict, visit_func):
     if point_count > threshold:
         # 从最近顶点开始，减少无谓走位（area 之间不相交时更划算）
         area_move_to_nearest_corner(area)
-        route = area["corner_paths"][(get_pos_y(), get_pos_x())]
+        route = area_get_traverse_path(area, (get_pos_y(), get_pos_x()))
 
         def hook(point, arg):
             if point in points_dict:
@@ -349,7 +456,7 @@ def area_visit_points(area, points_dict, visit_func):
 
     points = list_sort_by_yx(points, get_y, get_x)
     for p in points:
-        area_move_to_point(p)
+        area_move_to_point(p, False)
         visit_func(p)
 
 
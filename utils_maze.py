@@ -1,7 +1,13 @@
 # maze_utils.py
 # 迷宫相关工具函数
 
-from utils_area import area_get_attr, area_set_attr, area_contains_point
+from utils_area import (
+    area_set_attr,
+    area_get_attr_at,
+    area_set_attr_at,
+    area_point_to_index,
+    area_contains_point,
+)
 from utils_direction import direction_to_vector2d, direction_negate
 from utils_point import point_add, point_subtract, vector_len
 
@@ -93,18 +99,20 @@ def maze_search(area, sy, sx, ty, tx, embodied, explore_all, use_dfs):
             curr_point = q.pop(0)
 
         cl = node_len_dir_from[curr_point][0]
+        # 四个方向共用同一个属性下标
+        ci = area_point_to_index(area, curr_point)
 
         if curr_point == (ty, tx):
             if not explore_all:
                 break
 
         for d in DIRECTIONS:
-            move_attr = area_get_attr(area, d, curr_point)
+            move_attr = area_get_attr_at(area, d, ci)
 
             if embodied and move_attr == None:
                 # 检查本轮是否已观测过该格子
-                if area_get_attr(area, "probed_this_round", curr_point):
-                    move_attr = area_get_attr(area, d, curr_point)
+                if area_get_attr_at(area, "probed_this_round", ci):
+                    move_attr = area_get_attr_at(area, d, ci)
                 else:
                     # 走到 curr_point，观测四向
                     path_to_here = maze_get_path(
@@ -124,8 +132,8 @@ def maze_search(area, sy, sx, ty, tx, embodied, explore_all, use_dfs):
                         if m != None:
                             maze_update_wall_pairly(area, curr_point, dd, m)
 
-                    area_set_attr(area, "probed_this_round", curr_point, True)
-                    move_attr = area_get_attr(area, d, curr_point)
+                    area_set_attr_at(area, "probed_this_round", ci, True)
+                    move_attr = area_get_attr_at(area, d, ci)
 
             if move_attr == True:
                 next_point = maze_get_next_position(curr_point, d)
@@ -2,8 +2,7 @@
 # 移动和路径执行工具
 
 from utils_direction import direction_to_vector2d
-from utils_point import point_subtract
-from utils_route import vector_get_path
+from utils_route import point_get_path
 
 
 def path_move_along(path):
@@ -12,33 +11,57 @@ def path_move_along(path):
         move(d)
 
 
+def segments_move_along(segments):
+    # 沿 RLE 段 [(direction, count), ...] 移动
+    for d, count in segments:
+        for _ in range(count):
+            move(d)
+
+
 def __move_to_point_no_hook(target_point):
     # 无 hook 地移动到目标点
     # 注意：这是“就位移动”，不应触发遍历 hook
     current = (get_pos_y(), get_pos_x())
-    vec = point_subtract(target_point, current)
-    pre_path = vector_get_path(vec)
+    pre_path = point_get_path(current, target_point)
     path_move_along(pre_path)
 
 
 def route_move_along(route):
-    # route: (path, start_point)
-    path, start_point = route
-    __move_to_point_no_hook(start_point)
-    path_move_along(path)
+    # route: (path, start_point) 或 RLE 形式 ("rle", segments, start_point)
+    if route[0] == "rle":
+        __move_to_point_no_hook(route[2])
+        segments_move_along(route[1])
+        return
+    __move_to_point_no_hook(route[1])
+    path_move_along(route[0])
 
 
 def route_move_along_with_hook(route, hook, hook_arg=None, hook_for_start=True):
-    # route: (path, start_point)
+    # route: (path, start_point) 或 RLE 形式 ("rle", segments, start_point)
     # hook 仅在到达 start_point 之后开始触发
-    path, start_point = route
+    is_rle = route[0] == "rle"
+    if is_rle:
+        start_point = route[2]
+    else:
+        start_point = route[1]
     __move_to_point_no_hook(start_point)
 
     y, x = start_point
     if hook_for_start:
         hook((y, x), hook_arg)
 
-    for d in path:
+    if is_rle:
+        # 每段只查一次方向向量
+        for d, count in route[1]:
+            dy, dx = direction_to_vector2d(d)
+            for _ in range(count):
+                move(d)
+                y += dy
+                x += dx
+                hook((y, x), hook_arg)
+        return
+
+    for d in route[0]:
         move(d)
         dy, dx = direction_to_vector2d(d)
         y += dy
@@ -13,7 +13,13 @@ from utils_rect import (
     rectangle_center,
     rectangle_nearest_vertex,
 )
-from utils_point import point_subtract, point_add
+from utils_point import point_subtract, point_add, vector_warp
+from utils_singleton import singleton_initialize, singleton_get
+
+__SINGLETON_KEY_ROUTE_CACHE = "route_cache"
+
+# 路径缓存默认容量（条目数），超出时淘汰最久未使用的
+ROUTE_CACHE_CAPACITY = 64
 
 # 螺旋方向向量：(outward/inward, clockwise/counterclockwise) -> [(dy, dx), ...]
 __SPIRAL_DIRECTION_VECTORS = {
@@ -63,7 +69,53 @@ def vector_get_path(vec):
     return path
 
 
-def __rect_append_hamiltonian_path_snake_x(rect, path, start_point):
+# ========== RLE route ==========
+# 普通 route：(path, start_point)，path 为逐格方向列表
+# RLE route：("rle", segments, start_point)，segments 为 [(direction, count), ...]
+# 以开头的 "rle" 标记区分两者（普通 route 的第一项是方向列表），utils_move 中的 route 执行器都接受两种形式
+
+
+def segments_get_path(segments):
+    # 展开为逐格方向列表
+    path = []
+    for d, count in segments:
+        for _ in range(count):
+            path.append(d)
+    return path
+
+
+def route_get_path(route):
+    # 取出 route 的逐格路径（RLE route 会被展开）
+    if route[0] == "rle":
+        return segments_get_path(route[1])
+    return route[0]
+
+
+def point_get_path(current, target, wrap=True):
+    # 从 current 走到 target 的路径（先 y 后 x）
+    # wrap=True：世界是环面，每个轴取较短的方向（可能越过世界边界）
+    # wrap=False：只走两点之间的矩形内（不能离开区域时使用）
+    vec = point_subtract(target, current)
+    if wrap:
+        vec = vector_warp(vec, get_world_size())
+    return vector_get_path(vec)
+
+
+def __snake_append_segments(segments, forward, backward, turn, turns):
+    # 蛇形：forward，然后 turns 次 (turn, 交替的 backward/forward)
+    # 各段元组预先构造好，按两行一组追加，循环体内没有运算
+    segments.append(forward)
+    for _ in range(turns // 2):
+        segments.append(turn)
+        segments.append(backward)
+        segments.append(turn)
+        segments.append(forward)
+    if turns % 2 == 1:
+        segments.append(turn)
+        segments.append(backward)
+
+
+def __rect_append_hamiltonian_segments_snake_x(rect, segments, start_point):
     path_start = rectangle_nearest_vertex(rect, start_point)
     opposite = rectangle_opposite_vertex(rect, path_start)
     vec = point_subtract(opposite, path_start)
@@ -73,18 +125,18 @@ def __rect_append_hamiltonian_path_snake_x(rect, path, start_point):
     dx = x.sign().vector1d_x_to_direction()
     x_abs = abs(x)
 
-    for _ in range(x_abs):
-        path.append(dx)
-    for _ in range(abs(y)):
-        path.append(dy)
-        dx = dx.direction_negate()
-        for _ in range(x_abs):
-            path.append(dx)
+    if x_abs == 0:
+        # 单列：一段走完
+        if y != 0:
+            segments.append((dy, abs(y)))
+        return path_start
+
+    __snake_append_segments(segments, (dx, x_abs), (dx.direction_negate(), x_abs), (dy, 1), abs(y))
 
     return path_start
 
 
-def __rect_append_hamiltonian_path_snake_y(rect, path, start_point):
+def __rect_append_hamiltonian_segments_snake_y(rect, segments, start_point):
     path_start = rectangle_nearest_vertex(rect, start_point)
     opposite = rectangle_opposite_vertex(rect, path_start)
     vec = point_subtract(opposite, path_start)
@@ -94,13 +146,13 @@ def __rect_append_hamiltonian_path_snake_y(rect, path, start_point):
     dx = x.sign().vector1d_x_to_direction()
     y_abs = abs(y)
 
-    for _ in range(y_abs):
-        path.append(dy)
-    for _ in range(abs(x)):
-        path.append(dx)
-        dy = dy.direction_negate()
-        for _ in range(y_abs):
-            path.append(dy)
+    if y_abs == 0:
+        # 单行：一段走完
+        if x != 0:
+            segments.append((dx, abs(x)))
+        return path_start
+
+    __snake_append_segments(segments, (dy, y_abs), (dy.direction_negate(), y_abs), (dx, 1), abs(x))
 
     return path_start
 
@@ -172,7 +224,7 @@ def __rect_spiral_peel_segments(rect, start_corner, mode_key):
     return segments, (py, px)
 
 
-def __rect_append_hamiltonian_path_spiral_outward(rect, path, start_point, mode):
+def __rect_append_hamiltonian_segments_spiral_outward(rect, segments, start_point, mode):
     # outward：走到中心后，严格不重复走满整个 rect（Hamiltonian path）
     # 性能敏感：用“段”反向输出，不构造整条 inward 路径
     y, x, h, w = rect
@@ -182,14 +234,14 @@ def __rect_append_hamiltonian_path_spiral_outward(rect, path, start_point, mode)
     if h == 1:
         # 1xN 线性图无法从中心作为 Hamiltonian 起点而不重复
         # 这里选择从左端点开始扫满
-        for _ in range(w - 1):
-            path.append(East)
+        if w > 1:
+            segments.append((East, w - 1))
         return (y, x)
     if w == 1:
         # Nx1 线性图无法从中心作为 Hamiltonian 起点而不重复
         # 这里选择从下端点开始扫满
-        for _ in range(h - 1):
-            path.append(North)
+        if h > 1:
+            segments.append((North, h - 1))
         return (y, x)
 
     # outward 的旋向与 inward 反转后的旋向相反：outward_cw = reverse(inward_ccw)
@@ -223,9 +275,7 @@ def __rect_append_hamiltonian_path_spiral_outward(rect, path, start_point, mode)
     seg_len = len(chosen_segments)
     for i in range(seg_len - 1, -1, -1):
         d, cnt = chosen_segments[i]
-        nd = d.direction_negate()
-        for _ in range(cnt):
-            path.append(nd)
+        segments.append((d.direction_negate(), cnt))
 
     return chosen_end
 
@@ -251,7 +301,7 @@ def __spiral_inward_rotation_offset(vy, vx):
             return 1
 
 
-def __rect_append_hamiltonian_path_spiral_inward(rect, path, start_point, mode):
+def __rect_append_hamiltonian_segments_spiral_inward(rect, segments, start_point, mode):
     path_start = rectangle_nearest_vertex(rect, start_point)
     opposite = rectangle_opposite_vertex(rect, path_start)
     vec = point_subtract(opposite, path_start)
@@ -294,8 +344,8 @@ def __rect_append_hamiltonian_path_spiral_inward(rect, path, start_point, mode):
             else:
                 cnt = py - min_y
 
-            for _ in range(cnt):
-                path.append(d)
+            if cnt > 0:
+                segments.append((d, cnt))
 
             py = py + dy * cnt
             px = px + dx * cnt
@@ -319,23 +369,85 @@ def __rect_append_hamiltonian_path_spiral_inward(rect, path, start_point, mode):
 
 
 __RECT_MODE_HANDLERS = {
-    "snake_x": __rect_append_hamiltonian_path_snake_x,
-    "snake_y": __rect_append_hamiltonian_path_snake_y,
-    "spiral_outward_cw": __rect_append_hamiltonian_path_spiral_outward,
-    "spiral_outward_ccw": __rect_append_hamiltonian_path_spiral_outward,
-    "spiral_inward_cw": __rect_append_hamiltonian_path_spiral_inward,
-    "spiral_inward_ccw": __rect_append_hamiltonian_path_spiral_inward,
+    "snake_x": __rect_append_hamiltonian_segments_snake_x,
+    "snake_y": __rect_append_hamiltonian_segments_snake_y,
+    "spiral_outward_cw": __rect_append_hamiltonian_segments_spiral_outward,
+    "spiral_outward_ccw": __rect_append_hamiltonian_segments_spiral_outward,
+    "spiral_inward_cw": __rect_append_hamiltonian_segments_spiral_inward,
+    "spiral_inward_ccw": __rect_append_hamiltonian_segments_spiral_inward,
 }
 
 
-def rect_get_hamiltonian_path(rect, start_point, mode="snake_x"):
-    path = []
+def rect_get_hamiltonian_route(rect, start_point, mode="snake_x"):
+    # 与 rect_get_hamiltonian_path 相同的遍历，返回 RLE route：("rle", segments, route_start_point)
+    # 构造 O(h+w)，不生成逐格路径
+    segments = []
     handler = __RECT_MODE_HANDLERS[mode]
     if mode == "snake_x" or mode == "snake_y":
-        route_start = handler(rect, path, start_point)
+        route_start = handler(rect, segments, start_point)
+    else:
+        route_start = handler(rect, segments, start_point, mode)
+    return ("rle", segments, route_start)
+
+
+def rect_get_hamiltonian_path(rect, start_point, mode="snake_x"):
+    _, segments, route_start = rect_get_hamiltonian_route(rect, start_point, mode)
+    return (segments_get_path(segments), route_start)
+
+
+# ========== 平移不变的路径缓存 ==========
+# 哈密顿 route 的段序列只取决于 (h, w, 起点相对矩形左下角的位置, mode)，与矩形的位置无关，
+# 同尺寸的区域共用同一份 segments。缓存保存在单例中（key: "route_cache"），首次使用时创建。
+
+
+def route_cache_initialize(capacity=ROUTE_CACHE_CAPACITY):
+    # 创建（或重置）全局路径缓存并返回
+    cache = {}
+    cache["capacity"] = capacity
+    cache["entries"] = {}  # key -> (segments, 相对的 route 起点)
+    cache["order"] = []  # key 按使用先后排列，最久未使用在前（不依赖字典的遍历顺序）
+    cache["hits"] = 0
+    cache["misses"] = 0
+    return singleton_initialize(__SINGLETON_KEY_ROUTE_CACHE, cache)
+
+
+def route_cache_get():
+    # 获取全局路径缓存（未初始化时按默认容量创建）
+    cache = singleton_get(__SINGLETON_KEY_ROUTE_CACHE)
+    if cache == None:
+        cache = route_cache_initialize()
+    return cache
+
+
+def rect_get_hamiltonian_route_cached(rect, start_point, mode="snake_x"):
+    # 与 rect_get_hamiltonian_route 相同，但 segments 来自全局缓存（LRU）
+    # 返回的 segments 为共享对象，不要修改
+    y, x, h, w = rect
+    sy = start_point[0] - y
+    sx = start_point[1] - x
+    key = (h, w, sy, sx, mode)
+
+    cache = route_cache_get()
+    entries = cache["entries"]
+    order = cache["order"]
+    if key in entries:
+        # 移到末尾，标记为最近使用
+        entry = entries[key]
+        order.remove(key)
+        order.append(key)
+        cache["hits"] += 1
     else:
-        route_start = handler(rect, path, start_point, mode)
-    return (path, route_start)
+        _, segments, route_start = rect_get_hamiltonian_route((0, 0, h, w), (sy, sx), mode)
+        entry = (segments, route_start)
+        entries[key] = entry
+        order.append(key)
+        cache["misses"] += 1
+        if len(order) > cache["capacity"]:
+            # 淘汰最久未使用的（第一个）
+            entries.pop(order.pop(0))
+
+    ry, rx = entry[1]
+    return ("rle", entry[0], (y + ry, x + rx))
 
 
 def __rect_get_hamiltonian_cycle_even_w(rect):